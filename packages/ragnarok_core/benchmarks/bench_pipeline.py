@@ -0,0 +1,289 @@
+"""
+micro benchmarks of the pipeline engine itself, over synthetic components doing no real work,
+so that the time measured is the scheduling overhead of run_async and run_node_async.
+
+    python packages/ragnarok_core/benchmarks/bench_pipeline.py --sizes 10 100 1000 5000 --output bench.json
+
+compare with a former result file by --baseline, the run exits with 1 on a regression of the per node overhead
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
+
+from ragnarok_core.pipeline.pipeline_entity import PipelineEntity
+from ragnarok_core.pipeline.pipeline_node import PipelineNode
+from ragnarok_toolkit.component import (
+    ComponentInputTypeOption,
+    ComponentIOType,
+    ComponentOutputTypeOption,
+    RagnarokComponent,
+)
+
+# max num of upstream nodes of a synthetic node
+MAX_FAN_IN = 4
+INPUT_NAMES = tuple(f"in{i}" for i in range(MAX_FAN_IN))
+
+
+class NoopComponent(RagnarokComponent):
+    DESCRIPTION = "sum the connected inputs, nothing else"
+    ENABLE_HINT_CHECK = True
+
+    @classmethod
+    def input_options(cls) -> Tuple[ComponentInputTypeOption, ...]:
+        return tuple(
+            ComponentInputTypeOption(name=name, allowed_types={ComponentIOType.INT}, required=False)
+            for name in INPUT_NAMES
+        )
+
+    @classmethod
+    def output_options(cls) -> Tuple[ComponentOutputTypeOption, ...]:
+        return (ComponentOutputTypeOption(name="out", type=ComponentIOType.INT),)
+
+    @classmethod
+    def execute(
+        cls, in0: Optional[int] = None, in1: Optional[int] = None, in2: Optional[int] = None, in3: Optional[int] = None
+    ) -> Dict[str, Any]:
+        return {"out": (in0 or 0) + (in1 or 0) + (in2 or 0) + (in3 or 0)}
+
+
+class SleepComponent(NoopComponent):
+    DESCRIPTION = "sum the connected inputs after a short non-blocking sleep, like an io bound node"
+
+    # seconds slept per execution
+    SLEEP = 0.001
+
+    @classmethod
+    async def execute(
+        cls, in0: Optional[int] = None, in1: Optional[int] = None, in2: Optional[int] = None, in3: Optional[int] = None
+    ) -> Dict[str, Any]:
+        await asyncio.sleep(cls.SLEEP)
+        return {"out": (in0 or 0) + (in1 or 0) + (in2 or 0) + (in3 or 0)}
+
+
+def build_pipeline(edges: List[Tuple[int, int]], node_num: int, component: Type[RagnarokComponent]) -> PipelineEntity:
+    """pipeline of node_num nodes connected by (from, to) edges, node 0 is injected with x"""
+    forward_edges: List[List[PipelineNode.NodeConnection]] = [[] for _ in range(node_num)]
+    fan_in = [0] * node_num
+    for from_index, to_index in edges:
+        forward_edges[from_index].append(
+            PipelineNode.NodeConnection(
+                from_node_id=str(from_index),
+                from_node_output_name="out",
+                to_node_id=str(to_index),
+                to_node_input_name=INPUT_NAMES[fan_in[to_index]],
+            )
+        )
+        fan_in[to_index] += 1
+    node_map = {
+        str(index): PipelineNode(
+            node_id=str(index),
+            component=component,
+            forward_node_info=tuple(forward_edges[index]),
+            output_name="res" if index == node_num - 1 else None,
+        )
+        for index in range(node_num)
+    }
+    # a beginning node has all its inputs injected, the ones other than x are left None
+    inject_input_mapping = {"x": ("0", INPUT_NAMES[0])}
+    inject_input_mapping.update({f"x_{name}": ("0", name) for name in INPUT_NAMES[1:]})
+    return PipelineEntity(node_map, inject_input_mapping)
+
+
+def chain_edges(node_num: int) -> List[Tuple[int, int]]:
+    """0 -> 1 -> ... -> n-1"""
+    return [(index, index + 1) for index in range(node_num - 1)]
+
+
+def fan_out_edges(node_num: int) -> List[Tuple[int, int]]:
+    """0 -> every other node"""
+    return [(0, index) for index in range(1, node_num)]
+
+
+def diamond_edges(node_num: int) -> List[Tuple[int, int]]:
+    """a chain of diamonds, each top node forks into two nodes joined by the next top node"""
+    edges = []
+    top = 0
+    while top + 3 < node_num:
+        edges += [(top, top + 1), (top, top + 2), (top + 1, top + 3), (top + 2, top + 3)]
+        top += 3
+    # the trailing nodes which do not make a whole diamond hang off the last top node
+    edges += [(top, index) for index in range(top + 1, node_num)]
+    return edges
+
+
+def random_dag_edges(node_num: int, seed: int = 0) -> List[Tuple[int, int]]:
+    """every node but the first has 1 to MAX_FAN_IN upstream nodes among the ones before it"""
+    rng = random.Random(seed)
+    edges = []
+    for index in range(1, node_num):
+        for from_index in rng.sample(range(index), rng.randint(1, min(MAX_FAN_IN, index))):
+            edges.append((from_index, index))
+    return edges
+
+
+TOPOLOGIES: Dict[str, Callable[[int], List[Tuple[int, int]]]] = {
+    "chain": chain_edges,
+    "fan_out": fan_out_edges,
+    "diamond": diamond_edges,
+    "random_dag": random_dag_edges,
+}
+
+COMPONENTS: Dict[str, Type[RagnarokComponent]] = {"noop": NoopComponent, "sleep": SleepComponent}
+
+
+def critical_path_length(edges: List[Tuple[int, int]], node_num: int, max_concurrency: int) -> int:
+    """
+    num of node executions one after another on the longest path, the synthetic edges always go from a lower index
+    to a higher one. the nodes of one depth run max_concurrency at a time, as a run has no more in-flight nodes
+    """
+    depths = [1] * node_num
+    for from_index, to_index in sorted(edges):
+        depths[to_index] = max(depths[to_index], depths[from_index] + 1)
+    widths: Dict[int, int] = {}
+    for depth in depths:
+        widths[depth] = widths.get(depth, 0) + 1
+    return sum(math.ceil(width / max_concurrency) for width in widths.values())
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+async def run_once(pipeline: PipelineEntity) -> Tuple[float, int]:
+    """seconds of one run and the num of events it yields"""
+    event_num = 0
+    start = time.perf_counter()
+    async for info in pipeline.run_async(x=1, run_timeout=None):
+        if info.type == "error_info":
+            raise RuntimeError(f"benchmark run failed: {info.data}")
+        event_num += 1
+    return time.perf_counter() - start, event_num
+
+
+async def bench_case(topology: str, component: str, node_num: int, repeat: int) -> Dict[str, Any]:
+    """build once, warm up once, then time repeat runs and measure the peak memory of one more run"""
+    edges = TOPOLOGIES[topology](node_num)
+    build_start = time.perf_counter()
+    pipeline = build_pipeline(edges, node_num, COMPONENTS[component])
+    build_seconds = time.perf_counter() - build_start
+
+    await run_once(pipeline)
+    latencies = []
+    event_num = 0
+    for _ in range(repeat):
+        seconds, event_num = await run_once(pipeline)
+        latencies.append(seconds)
+
+    tracemalloc.start()
+    await run_once(pipeline)
+    _, peak_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    mean_seconds = statistics.fmean(latencies)
+    # the sleeps on the critical path are the least a run could take, a wide level takes several turns of the slots
+    work_seconds = (
+        SleepComponent.SLEEP * critical_path_length(edges, node_num, pipeline.scheduler.max_concurrency_per_run)
+        if component == "sleep"
+        else 0.0
+    )
+    return {
+        "topology": topology,
+        "component": component,
+        "nodes": node_num,
+        "edges": len(edges),
+        "repeat": repeat,
+        "build_ms": build_seconds * 1e3,
+        "mean_ms": mean_seconds * 1e3,
+        "p50_ms": percentile(latencies, 0.5) * 1e3,
+        "p95_ms": percentile(latencies, 0.95) * 1e3,
+        "p99_ms": percentile(latencies, 0.99) * 1e3,
+        # engine time per node beyond the work of the components
+        "overhead_us_per_node": max(mean_seconds - work_seconds, 0.0) / node_num * 1e6,
+        "events_per_sec": event_num / mean_seconds,
+        "peak_memory_kib": peak_bytes / 1024,
+    }
+
+
+async def run_benchmarks(
+    sizes: List[int], topologies: List[str], components: List[str], repeat: int
+) -> List[Dict[str, Any]]:
+    results = []
+    for component in components:
+        for topology in topologies:
+            for node_num in sizes:
+                result = await bench_case(topology, component, node_num, repeat)
+                print(
+                    f"{component:>6} {topology:>10} {node_num:>6} nodes: "
+                    f"p50 {result['p50_ms']:9.2f}ms p99 {result['p99_ms']:9.2f}ms "
+                    f"{result['overhead_us_per_node']:8.1f}us/node {result['events_per_sec']:10.0f} events/s "
+                    f"peak {result['peak_memory_kib']:9.0f}KiB"
+                )
+                results.append(result)
+    return results
+
+
+def find_regressions(
+    results: List[Dict[str, Any]], baseline: List[Dict[str, Any]], tolerance: float
+) -> List[Tuple[Dict[str, Any], float]]:
+    """the results whose per node overhead grows more than tolerance (0.2 for 20%) over the same case of the baseline"""
+    baseline_overheads = {
+        (result["topology"], result["component"], result["nodes"]): result["overhead_us_per_node"]
+        for result in baseline
+    }
+    regressions = []
+    for result in results:
+        baseline_overhead = baseline_overheads.get((result["topology"], result["component"], result["nodes"]))
+        if baseline_overhead and result["overhead_us_per_node"] > baseline_overhead * (1 + tolerance):
+            regressions.append((result, result["overhead_us_per_node"] / baseline_overhead))
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="micro benchmarks of the pipeline engine")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 5000])
+    parser.add_argument("--topologies", nargs="+", choices=list(TOPOLOGIES), default=list(TOPOLOGIES))
+    parser.add_argument("--components", nargs="+", choices=list(COMPONENTS), default=list(COMPONENTS))
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--output", help="path of the json result file")
+    parser.add_argument("--baseline", help="path of a former json result file to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed growth of the per node overhead")
+    args = parser.parse_args()
+
+    results = asyncio.run(run_benchmarks(args.sizes, args.topologies, args.components, args.repeat))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(
+                {
+                    "created_at": datetime.now().isoformat(),
+                    "python": platform.python_version(),
+                    "platform": platform.platform(),
+                    "results": results,
+                },
+                f,
+                indent=2,
+            )
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = find_regressions(results, json.load(f)["results"], args.tolerance)
+        for result, ratio in regressions:
+            print(
+                f"regression: {result['component']} {result['topology']} {result['nodes']} nodes, {ratio:.2f}x overhead"
+            )
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 from typing import Any, Dict, Tuple
 
 from ragnarok_toolkit.component import (
+    ComponentExecutionClass,
     ComponentInputTypeOption,
     ComponentIOType,
     ComponentOutputTypeOption,
@@ -11,6 +12,7 @@ from ragnarok_toolkit.component import (
 class CodeExecutionComponent(RagnarokComponent):
     DESCRIPTION: str = "Execute Python code"
     ENABLE_HINT_CHECK: bool = True
+    EXECUTION_CLASS: ComponentExecutionClass = ComponentExecutionClass.PROCESS
 
     @classmethod
     def input_options(cls) -> Tuple[ComponentInputTypeOption, ...]:
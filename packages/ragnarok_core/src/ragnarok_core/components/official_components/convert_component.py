@@ -11,6 +11,9 @@ from ragnarok_toolkit.component import (
 class Chunks2Object(RagnarokComponent):
     DESCRIPTION: str = "Chunks converted to Object"
     ENABLE_HINT_CHECK: bool = True
+    CACHEABLE: bool = True
+    SUPPORT_BATCH: bool = True
+    LIGHTWEIGHT: bool = True
 
     @classmethod
     def input_options(cls) -> Tuple[ComponentInputTypeOption, ...]:
@@ -47,10 +50,16 @@ class Chunks2Object(RagnarokComponent):
         content_bytes_list = [chunk.encode("utf-8") for chunk in text_chunks]
         return {"chunk_ids": chunk_ids, "content_bytes_list": content_bytes_list}
 
+    @classmethod
+    def execute_batch(cls, inputs_list: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return [cls.execute(inputs["doc_id"], inputs["text_chunks"]) for inputs in inputs_list]
+
 
 class Vectors2VecPoints(RagnarokComponent):
     DESCRIPTION: str = "Vectors converted to Vector Points"
     ENABLE_HINT_CHECK: bool = True
+    CACHEABLE: bool = True
+    LIGHTWEIGHT: bool = True
 
     @classmethod
     def input_options(cls) -> Tuple[ComponentInputTypeOption, ...]:
@@ -3,11 +3,13 @@ from typing import Any, Dict, List, Tuple
 
 import requests
 from ragnarok_toolkit.component import (
+    ComponentExecutionClass,
     ComponentInputTypeOption,
     ComponentIOType,
     ComponentOutputTypeOption,
     RagnarokComponent,
 )
+from ragnarok_toolkit.tracing import trace_call
 
 
 class EmbeddingModelEnum(Enum):
@@ -20,6 +22,9 @@ class EmbeddingModelEnum(Enum):
 class EmbeddingComponent(RagnarokComponent):
     DESCRIPTION: str = "embedding"
     ENABLE_HINT_CHECK: bool = True
+    CACHEABLE: bool = True
+    EXECUTION_CLASS: ComponentExecutionClass = ComponentExecutionClass.THREAD
+    SUPPORT_BATCH: bool = True
 
     HF_API_URL = (
         "https://router.huggingface.co/hf-inference/models/"
@@ -51,13 +56,14 @@ class EmbeddingComponent(RagnarokComponent):
         data = {"inputs": text_chunks}
 
         try:
-            response = requests.post(
-                cls.HF_API_URL,
-                headers=cls.HEADERS,
-                json=data,
-                proxies=cls.PROXIES,
-                timeout=cls.TIMEOUT,
-            )
+            with trace_call("hf.feature_extraction"):
+                response = requests.post(
+                    cls.HF_API_URL,
+                    headers=cls.HEADERS,
+                    json=data,
+                    proxies=cls.PROXIES,
+                    timeout=cls.TIMEOUT,
+                )
             if response.status_code != 200:
                 return {
                     "vectors": [[-1.0]],
@@ -67,3 +73,20 @@ class EmbeddingComponent(RagnarokComponent):
             return {"vectors": vectors}
         except Exception as e:
             raise e
+
+    @classmethod
+    async def execute_batch(cls, inputs_list: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """embed the text chunks of all the input sets with a single api request"""
+        text_chunks = [chunk for inputs in inputs_list for chunk in inputs["text_chunks"]]
+        outputs = await cls.execute(text_chunks)
+        if "error" in outputs:
+            return [outputs] * len(inputs_list)
+
+        vectors = outputs["vectors"]
+        outputs_list = []
+        start = 0
+        for inputs in inputs_list:
+            end = start + len(inputs["text_chunks"])
+            outputs_list.append({"vectors": vectors[start:end]})
+            start = end
+        return outputs_list
@@ -10,6 +10,7 @@ from ragnarok_toolkit.component import (
     ComponentOutputTypeOption,
     RagnarokComponent,
 )
+from ragnarok_toolkit.tracing import trace_call
 
 
 class LLMIntentRecognitionComponent(RagnarokComponent):
@@ -116,30 +117,31 @@ class LLMIntentRecognitionComponent(RagnarokComponent):
         retries = 0
         while True:
             try:
-                completion = await client.chat.completions.create(
-                    model=model_name,
-                    messages=messages,
-                    timeout=30,
-                    temperature=temperature,
-                    top_p=top_p,
-                    response_format={
-                        "type": "json_schema",
-                        "json_schema": {
-                            "name": "intent_classification",
-                            "schema": {
-                                "type": "object",
-                                "properties": {
-                                    "intent": {
-                                        "type": "number",
+                with trace_call("openai.chat_completions"):
+                    completion = await client.chat.completions.create(
+                        model=model_name,
+                        messages=messages,
+                        timeout=30,
+                        temperature=temperature,
+                        top_p=top_p,
+                        response_format={
+                            "type": "json_schema",
+                            "json_schema": {
+                                "name": "intent_classification",
+                                "schema": {
+                                    "type": "object",
+                                    "properties": {
+                                        "intent": {
+                                            "type": "number",
+                                        },
                                     },
+                                    "required": ["intent"],
+                                    "additionalProperties": False,
                                 },
-                                "required": ["intent"],
-                                "additionalProperties": False,
+                                "strict": True,
                             },
-                            "strict": True,
                         },
-                    },
-                )
+                    )
                 response = completion.choices[0].message.content
                 response_json = json.loads(response)
                 break
@@ -9,6 +9,7 @@ from ragnarok_toolkit.component import (
     ComponentOutputTypeOption,
     RagnarokComponent,
 )
+from ragnarok_toolkit.tracing import trace_call
 
 
 def clean_up_json_from_oai(text: str) -> str:
@@ -28,6 +29,8 @@ def load_json_from_oai(text: str) -> dict:
 class KeywordExtractComponent(RagnarokComponent):
     DESCRIPTION: str = "Extract keywords from user query"
     ENABLE_HINT_CHECK: bool = True
+    # sampled at temperature 0, the same query gives the same keywords
+    CACHEABLE: bool = True
 
     @classmethod
     def input_options(cls) -> Tuple[ComponentInputTypeOption, ...]:
@@ -82,28 +85,30 @@ class KeywordExtractComponent(RagnarokComponent):
             },
             {"role": "user", "content": query},
         ]
-        response = await client.chat.completions.create(
-            model=model_name,
-            messages=messages,
-            response_format={
-                "type": "json_schema",
-                "json_schema": {
-                    "name": "keyword_extract",
-                    "schema": {
-                        "type": "object",
-                        "properties": {
-                            "keywords": {
-                                "type": "array",
-                                "items": {"type": "string", "description": "Keywords to extract."},
-                                "minItems": size,
-                                "maxItems": size,
-                            }
+        with trace_call("openai.chat_completions"):
+            response = await client.chat.completions.create(
+                model=model_name,
+                messages=messages,
+                temperature=0,
+                response_format={
+                    "type": "json_schema",
+                    "json_schema": {
+                        "name": "keyword_extract",
+                        "schema": {
+                            "type": "object",
+                            "properties": {
+                                "keywords": {
+                                    "type": "array",
+                                    "items": {"type": "string", "description": "Keywords to extract."},
+                                    "minItems": size,
+                                    "maxItems": size,
+                                }
+                            },
+                            "required": ["keywords"],
                         },
-                        "required": ["keywords"],
                     },
                 },
-            },
-        )
+            )
         keywords_str = response.choices[0].message.content
         keywords_json = load_json_from_oai(keywords_str)
         return {"keywords": keywords_json["keywords"]}
@@ -10,6 +10,7 @@ from ragnarok_toolkit.component import (
     ComponentOutputTypeOption,
     RagnarokComponent,
 )
+from ragnarok_toolkit.tracing import trace_call
 
 
 class LLMRewriteComponent(RagnarokComponent):
@@ -185,32 +186,33 @@ class LLMRewriteComponent(RagnarokComponent):
         retries = 0
         while True:
             try:
-                completion = await client.chat.completions.create(
-                    model=model_name,
-                    messages=messages,
-                    timeout=30,
-                    temperature=temperature,
-                    top_p=top_p,
-                    response_format={
-                        "type": "json_schema",
-                        "json_schema": {
-                            "name": "question_rewriting",
-                            "schema": {
-                                "type": "object",
-                                "properties": {
-                                    "answer": {
-                                        "type": "string",
+                with trace_call("openai.chat_completions"):
+                    completion = await client.chat.completions.create(
+                        model=model_name,
+                        messages=messages,
+                        timeout=30,
+                        temperature=temperature,
+                        top_p=top_p,
+                        response_format={
+                            "type": "json_schema",
+                            "json_schema": {
+                                "name": "question_rewriting",
+                                "schema": {
+                                    "type": "object",
+                                    "properties": {
+                                        "answer": {
+                                            "type": "string",
+                                        },
                                     },
+                                    "required": [
+                                        "answer",
+                                    ],
+                                    "additionalProperties": False,
                                 },
-                                "required": [
-                                    "answer",
-                                ],
-                                "additionalProperties": False,
+                                "strict": True,
                             },
-                            "strict": True,
                         },
-                    },
-                )
+                    )
                 response = completion.choices[0].message.content
 
                 response_json = json.loads(response)
@@ -0,0 +1,119 @@
+import asyncio
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+from ragnarok_toolkit.component import (
+    ComponentInputTypeOption,
+    ComponentIOType,
+    ComponentOutputTypeOption,
+    RagnarokComponent,
+)
+from ragnarok_toolkit.config import PIPELINE_MAP_CONCURRENCY
+
+
+class MapComponent(RagnarokComponent):
+    """
+    run a sub-pipeline for each item of a list, a bounded num of them at the same time.
+    the results keep the order of the items, a failed item gets None and an entry in the errors
+    """
+
+    DESCRIPTION = "run a sub-pipeline for each item of a list"
+    ENABLE_HINT_CHECK = True
+    # the map node only waits on its sub-pipeline runs, their nodes take the process-wide slots
+    SCHEDULED = False
+
+    @classmethod
+    def input_options(cls) -> Tuple[ComponentInputTypeOption, ...]:
+        return (
+            ComponentInputTypeOption(name="items", allowed_types={ComponentIOType.STRING_LIST}, required=True),
+            # the sub-pipeline in json format, run once per item or per batch of items
+            ComponentInputTypeOption(name="pipeline", allowed_types={ComponentIOType.DICT}, required=True),
+            # inject name of the sub-pipeline receiving the item, "item" by default
+            ComponentInputTypeOption(name="item_name", allowed_types={ComponentIOType.STRING}, required=False),
+            # params injected into every sub-pipeline run
+            ComponentInputTypeOption(name="params", allowed_types={ComponentIOType.DICT}, required=False),
+            ComponentInputTypeOption(name="concurrency", allowed_types={ComponentIOType.INT}, required=False),
+            # the sub-pipeline receives a list of up to batch_size items, and outputs one list item per input item
+            ComponentInputTypeOption(name="batch_size", allowed_types={ComponentIOType.INT}, required=False),
+        )
+
+    @classmethod
+    def output_options(cls) -> Tuple[ComponentOutputTypeOption, ...]:
+        return (
+            ComponentOutputTypeOption(name="results", type=ComponentIOType.DICT_LIST),
+            ComponentOutputTypeOption(name="errors", type=ComponentIOType.DICT_LIST),
+        )
+
+    @classmethod
+    async def execute(
+        cls,
+        items: List[str],
+        pipeline: dict,
+        item_name: Optional[str] = None,
+        params: Optional[dict] = None,
+        concurrency: Optional[int] = None,
+        batch_size: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        # imported here, the pipeline module registers the official components on import
+        from ragnarok_core.pipeline import pipeline_cache
+        from ragnarok_core.pipeline.pipeline_context import current_principal
+
+        if isinstance(pipeline, str):
+            pipeline = json.loads(pipeline)
+        item_name = item_name or "item"
+        params = params or {}
+        # the sub-pipeline is compiled once for all the maps running it
+        sub_pipeline = pipeline_cache.get_or_compile(json.dumps(pipeline, sort_keys=True))
+        # the sub-pipeline runs are charged to the principal of the map node, within its node budget
+        principal = current_principal.get()
+        # a cap on the sub-pipeline runs of this map, their nodes are scheduled along with all the others
+        semaphore = asyncio.Semaphore(max(concurrency or PIPELINE_MAP_CONCURRENCY, 1))
+
+        results: List[Optional[Dict[str, Any]]] = [None] * len(items)
+        errors: List[Dict[str, Any]] = []
+
+        async def run_one(start: int, end: int) -> None:
+            value: Any = items[start:end] if batch_size else items[start]
+            async with semaphore:
+                try:
+                    outputs = await cls._run_sub_pipeline(sub_pipeline, {**params, item_name: value}, principal)
+                    if not batch_size:
+                        results[start] = outputs
+                        return
+                    # split the list outputs of a batch back into the results of its items
+                    for output_name, node_outputs in outputs.items():
+                        for name, output in node_outputs.items():
+                            if not isinstance(output, list) or len(output) != end - start:
+                                raise ValueError(
+                                    f"output {output_name}.{name} of a batch is not a list of one value per item"
+                                )
+                    for offset in range(end - start):
+                        results[start + offset] = {
+                            output_name: {name: output[offset] for name, output in node_outputs.items()}
+                            for output_name, node_outputs in outputs.items()
+                        }
+                except Exception as e:
+                    errors.extend({"index": index, "error": str(e)} for index in range(start, end))
+
+        step = batch_size or 1
+        await asyncio.gather(*(run_one(start, min(start + step, len(items))) for start in range(0, len(items), step)))
+        errors.sort(key=lambda error: error["index"])
+        return {"results": results, "errors": errors}
+
+    @staticmethod
+    async def _run_sub_pipeline(
+        sub_pipeline: Any, params: Dict[str, Any], principal: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """the outputs of a sub-pipeline run, by output name. raises if the run fails"""
+        from ragnarok_core.pipeline.pipeline_event import EventVerbosity
+
+        # the params the sub-pipeline does not inject are dropped, they could not clash with the run options
+        inputs = {name: value for name, value in params.items() if name in sub_pipeline.inject_input_mapping}
+        outputs: Dict[str, Any] = {}
+        async for info in sub_pipeline.run_async(**inputs, verbosity=EventVerbosity.OUTPUTS, principal=principal):
+            if info.type == "output_info":
+                for output_name, output in info.data.items():
+                    outputs[output_name] = output
+            elif info.type == "error_info":
+                raise RuntimeError(info.data.get("error"))
+        return outputs
@@ -1,6 +1,6 @@
 import ast
 import json
-from typing import Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
 from openai import AsyncOpenAI
 from ragnarok_toolkit.component import (
@@ -11,6 +11,7 @@ from ragnarok_toolkit.component import (
 )
 from ragnarok_toolkit.model.embedding_model import EmbeddingModel, EmbeddingModelEnum
 from ragnarok_toolkit.odb.minio_client import MinioClient
+from ragnarok_toolkit.tracing import trace_call
 from ragnarok_toolkit.vdb.qdrant_client import QdrantClient
 
 qdrant_client = QdrantClient()
@@ -124,6 +125,13 @@ class RetrievalComponent(RagnarokComponent):
             )
         return {"texts": texts}
 
+    @classmethod
+    def accept_speculative(cls, input_name: str, speculative_value: Any, value: Any) -> bool:
+        # a rewritten query differing in case and spacing only is close enough to keep the documents retrieved
+        if input_name == "query" and isinstance(speculative_value, str) and isinstance(value, str):
+            return " ".join(speculative_value.lower().split()) == " ".join(value.lower().split())
+        return super().accept_speculative(input_name, speculative_value, value)
+
     @classmethod
     async def embedding(cls, query: str, model: EmbeddingModelEnum) -> List[float]:
         vector = await EmbeddingModel.embedding([query], model)
@@ -158,37 +166,38 @@ class RetrievalComponent(RagnarokComponent):
         cls, query: str, texts: List[str], top_n: int, rerank_model: str, api_key: str, base_url: str
     ) -> List[str]:
         client = AsyncOpenAI(api_key=api_key, base_url=base_url)
-        response = await client.chat.completions.create(
-            model=rerank_model,
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are a helpful assistant that reranks a list of texts based on the query.",
-                },
-                {
-                    "role": "user",
-                    "content": f"""
-                        请根据以下查询和文本列表，根据问题和文本的相关程度进行打分，打分范围是1~100的整数，分数越高代表相关程度越高。
-                        Query: {query}
-                        Texts: {texts}
-                        严格按照以下格式返回：
-                        result: {{
-                            {{
-                                "text_id": "文本1的id",
-                                "score": 分数1
-                            }},
-                            {{
-                                "text_id": "文本2的id",
-                                "score": 分数2
-                            }},
-                            ...
-                        }}
-                        其中，text_id1、text_id2、... 是文本列表中的文本list中的id，从0开始，分数1、分数2、... 是打分结果。
-                        不要输出任何解释，不要输出任何其他内容, 不要输出任何其他字符，和上述格式完全一模一样。
-                        """,
-                },
-            ],
-        )
+        with trace_call("openai.chat_completions"):
+            response = await client.chat.completions.create(
+                model=rerank_model,
+                messages=[
+                    {
+                        "role": "system",
+                        "content": "You are a helpful assistant that reranks a list of texts based on the query.",
+                    },
+                    {
+                        "role": "user",
+                        "content": f"""
+                            请根据以下查询和文本列表，根据问题和文本的相关程度进行打分，打分范围是1~100的整数，分数越高代表相关程度越高。
+                            Query: {query}
+                            Texts: {texts}
+                            严格按照以下格式返回：
+                            result: {{
+                                {{
+                                    "text_id": "文本1的id",
+                                    "score": 分数1
+                                }},
+                                {{
+                                    "text_id": "文本2的id",
+                                    "score": 分数2
+                                }},
+                                ...
+                            }}
+                            其中，text_id1、text_id2、... 是文本列表中的文本list中的id，从0开始，分数1、分数2、... 是打分结果。
+                            不要输出任何解释，不要输出任何其他内容, 不要输出任何其他字符，和上述格式完全一模一样。
+                            """,
+                    },
+                ],
+            )
         response_json = response.choices[0].message.content
         try:
             response_json = response_json.split("result:")[1]
@@ -11,6 +11,7 @@ from ragnarok_toolkit.component import (
 class StrComponent(RagnarokComponent):
     DESCRIPTION = "pass str"
     ENABLE_HINT_CHECK = True
+    LIGHTWEIGHT = True
 
     @classmethod
     def input_options(cls) -> Tuple[ComponentInputTypeOption, ...]:
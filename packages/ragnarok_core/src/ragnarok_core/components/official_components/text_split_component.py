@@ -21,11 +21,13 @@ from openai import OpenAI
 from openpyxl import load_workbook
 from pptx import Presentation
 from ragnarok_toolkit.component import (
+    ComponentExecutionClass,
     ComponentInputTypeOption,
     ComponentIOType,
     ComponentOutputTypeOption,
     RagnarokComponent,
 )
+from ragnarok_toolkit.tracing import trace_call
 
 logger = logging.getLogger(__name__)
 
@@ -39,6 +41,8 @@ class SplitType(Enum):
 class TextSplitComponent(RagnarokComponent):
     DESCRIPTION: str = "txt_split_component"
     ENABLE_HINT_CHECK: bool = True
+    EXECUTION_CLASS: ComponentExecutionClass = ComponentExecutionClass.THREAD
+    CACHEABLE: bool = True
 
     @classmethod
     def input_options(cls) -> Tuple[ComponentInputTypeOption, ...]:
@@ -209,7 +213,8 @@ class TextSplitComponent(RagnarokComponent):
             func = functools.partial(
                 client.embeddings.create, model="text-embedding-v1", input=batch_texts, encoding_format="float"
             )
-            response = await asyncio.to_thread(func)
+            with trace_call("openai.embeddings"):
+                response = await asyncio.to_thread(func)
 
             batch_embeddings = [item.embedding for item in response.data]
             all_embeddings.extend(batch_embeddings)
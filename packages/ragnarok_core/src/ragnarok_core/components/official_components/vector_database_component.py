@@ -47,6 +47,7 @@ class StoreVDB(RagnarokComponent):
 class RetrieveComponent(RagnarokComponent):
     DESCRIPTION: str = "Retrieve embeddings in vector database"
     ENABLE_HINT_CHECK: bool = True
+    SUPPORT_BATCH: bool = True
 
     @classmethod
     def input_options(cls) -> Tuple[ComponentInputTypeOption, ...]:
@@ -85,10 +86,39 @@ class RetrieveComponent(RagnarokComponent):
         top_k: Optional[int],
         payload_filters: Optional[List[SearchPayloadDict]],
     ) -> Dict[str, Any]:
-        piece_ids = await qdrant_client.search_vectors(
-            name=vector_database_name,
-            query_vector=query_vector,
-            top_k=10 if top_k is None else top_k,
-            payload_filters=payload_filters,
+        # the same search request as a batch of one, so that batched or not the node gives the same results
+        outputs_list = await cls.execute_batch(
+            [
+                {
+                    "vector_database_name": vector_database_name,
+                    "query_vector": query_vector,
+                    "top_k": top_k,
+                    "payload_filters": payload_filters,
+                }
+            ]
         )
-        return {"piece_ids": piece_ids}
+        return outputs_list[0]
+
+    @classmethod
+    async def execute_batch(cls, inputs_list: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """search the query vectors of all the input sets with one request per vector database"""
+        outputs_list: List[Dict[str, Any]] = [{} for _ in inputs_list]
+        index_groups: Dict[str, List[int]] = {}
+        for index, inputs in enumerate(inputs_list):
+            index_groups.setdefault(inputs["vector_database_name"], []).append(index)
+
+        for vector_database_name, indexes in index_groups.items():
+            texts_list = await qdrant_client.search_batch(
+                collection_name=vector_database_name,
+                queries=[
+                    {
+                        "query_vector": inputs_list[index]["query_vector"],
+                        "top_k": 10 if inputs_list[index].get("top_k") is None else inputs_list[index]["top_k"],
+                        "payload_filters": inputs_list[index].get("payload_filters"),
+                    }
+                    for index in indexes
+                ],
+            )
+            for index, piece_ids in zip(indexes, texts_list):
+                outputs_list[index] = {"piece_ids": piece_ids}
+        return outputs_list
@@ -2,6 +2,7 @@ from typing import Any, Dict, Tuple
 
 import wikipedia
 from ragnarok_toolkit.component import (
+    ComponentExecutionClass,
     ComponentInputTypeOption,
     ComponentIOType,
     ComponentOutputTypeOption,
@@ -10,6 +11,7 @@ from ragnarok_toolkit.component import (
 
 
 class WikipediaSearchComponent(RagnarokComponent):
+    EXECUTION_CLASS: ComponentExecutionClass = ComponentExecutionClass.THREAD
 
     @classmethod
     def input_options(cls) -> Tuple[ComponentInputTypeOption, ...]:
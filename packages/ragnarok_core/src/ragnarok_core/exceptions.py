@@ -14,3 +14,9 @@ class PipelineNotFoundError(Exception):
     def __init__(self, pipeline_id: int) -> None:
         self.message = f"pipeline with the id {pipeline_id} not does not exists"
         super().__init__(self.message)
+
+
+class InvalidPipelineError(ValueError):
+    def __init__(self, reason: str) -> None:
+        self.message = f"pipeline is invalid: {reason}"
+        super().__init__(self.message)
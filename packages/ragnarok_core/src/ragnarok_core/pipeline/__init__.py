@@ -0,0 +1,24 @@
+from ragnarok_core.pipeline.blob_store import blob_store
+from ragnarok_core.pipeline.checkpoint_store import checkpoint_store, session_store
+from ragnarok_core.pipeline.node_cache import node_cache
+from ragnarok_core.pipeline.pipeline_cache import PipelineCache
+from ragnarok_core.pipeline.pipeline_executor import component_executor
+from ragnarok_core.pipeline.pipeline_job import job_manager
+from ragnarok_core.pipeline.pipeline_scheduler import node_scheduler
+from ragnarok_core.pipeline.result_cache import result_cache
+from ragnarok_core.pipeline.run_scheduler import run_scheduler
+
+pipeline_cache = PipelineCache()
+
+__all__ = [
+    "pipeline_cache",
+    "node_cache",
+    "checkpoint_store",
+    "session_store",
+    "blob_store",
+    "node_scheduler",
+    "component_executor",
+    "job_manager",
+    "result_cache",
+    "run_scheduler",
+]
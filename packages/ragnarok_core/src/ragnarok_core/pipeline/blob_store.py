@@ -0,0 +1,56 @@
+import asyncio
+import os
+import tempfile
+import uuid
+from typing import Optional, Union
+
+from ragnarok_toolkit.blob import BlobRef
+from ragnarok_toolkit.config import PIPELINE_BLOB_DIR, PIPELINE_BLOB_SPILL_SIZE
+
+
+class BlobStore:
+    """
+    maker of the blob handles of the BLOB outputs, should be used as a singleton.
+    small payloads stay in memory, those over spill_size are written to a temp file and mapped when read.
+    nothing is indexed, a payload lives as long as the handles on it
+    """
+
+    def __init__(
+        self, spill_size: int = PIPELINE_BLOB_SPILL_SIZE, directory: Optional[str] = PIPELINE_BLOB_DIR
+    ) -> None:
+        self.spill_size = spill_size
+        self.directory = directory
+        # num of bytes spilled to files so far
+        self.spilled_bytes = 0
+
+    async def put(self, data: Union[bytes, bytearray, memoryview, BlobRef]) -> BlobRef:
+        """the handle of a payload, a handle is returned as is. a spilled payload is written off the event loop"""
+        if isinstance(data, BlobRef):
+            return data
+        blob_id = uuid.uuid4().hex
+        size = memoryview(data).nbytes
+        if size <= self.spill_size:
+            # bytes are immutable, they are kept without a copy
+            return BlobRef(blob_id, size, data if isinstance(data, bytes) else bytes(data))
+
+        path = await asyncio.to_thread(self._spill, data)
+        self.spilled_bytes += size
+        ref = BlobRef(blob_id, size, path=path)
+        ref.own_file()
+        return ref
+
+    def _spill(self, data: Union[bytes, bytearray, memoryview]) -> str:
+        """write a payload to a temp file, return its path"""
+        if self.directory is not None:
+            os.makedirs(self.directory, exist_ok=True)
+        fd, path = tempfile.mkstemp(prefix="ragnarok-blob-", dir=self.directory)
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.write(data)
+        except BaseException:
+            os.remove(path)
+            raise
+        return path
+
+
+blob_store = BlobStore()
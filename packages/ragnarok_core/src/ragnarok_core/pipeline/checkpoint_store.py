@@ -0,0 +1,115 @@
+import asyncio
+import hashlib
+import logging
+import os
+import pickle
+import shutil
+import tempfile
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional, Tuple
+
+from cachetools import TTLCache
+from ragnarok_toolkit.config import (
+    PIPELINE_CHECKPOINT_DIR,
+    PIPELINE_SESSION_SIZE,
+    PIPELINE_SESSION_TTL,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class CheckpointStore(ABC):
+    """
+    persisted node outputs of the runs with a run id, keyed by run id and node id.
+    a restarted run of the same id reuses the outputs of the nodes whose inputs hash the same,
+    rather than executing them again
+    """
+
+    @abstractmethod
+    async def get(self, run_id: str, node_id: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """the input hash and outputs saved for the node of the run, None if there is none"""
+
+    @abstractmethod
+    async def set(self, run_id: str, node_id: str, input_hash: str, outputs: Dict[str, Any]) -> None:
+        """save the outputs of the node of the run, replacing the former ones"""
+
+    @abstractmethod
+    async def delete(self, run_id: str) -> None:
+        """drop all the checkpoints of the run"""
+
+
+class LocalCheckpointStore(CheckpointStore):
+    """one directory per run under the given directory, holding a pickle file per node"""
+
+    SUFFIX = ".pkl"
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+
+    def run_path(self, run_id: str) -> str:
+        # the ids are hashed, as they are free form strings given by the caller
+        return os.path.join(self.directory, hashlib.sha256(run_id.encode("utf-8")).hexdigest())
+
+    def node_path(self, run_id: str, node_id: str) -> str:
+        node_key = hashlib.sha256(node_id.encode("utf-8")).hexdigest()
+        return os.path.join(self.run_path(run_id), node_key + self.SUFFIX)
+
+    def _get(self, run_id: str, node_id: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        try:
+            with open(self.node_path(run_id, node_id), "rb") as f:
+                return pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"broken checkpoint of node {node_id} in run {run_id}: {e!r}")
+            return None
+
+    def _set(self, run_id: str, node_id: str, input_hash: str, outputs: Dict[str, Any]) -> None:
+        try:
+            data = pickle.dumps((input_hash, outputs))
+        except Exception as e:
+            logger.warning(f"outputs of node {node_id} could not be checkpointed: {e!r}")
+            return
+        run_path = self.run_path(run_id)
+        os.makedirs(run_path, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=run_path, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, self.node_path(run_id, node_id))
+
+    async def get(self, run_id: str, node_id: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        return await asyncio.to_thread(self._get, run_id, node_id)
+
+    async def set(self, run_id: str, node_id: str, input_hash: str, outputs: Dict[str, Any]) -> None:
+        await asyncio.to_thread(self._set, run_id, node_id, input_hash, outputs)
+
+    async def delete(self, run_id: str) -> None:
+        await asyncio.to_thread(shutil.rmtree, self.run_path(run_id), True)
+
+
+class MemoryCheckpointStore(CheckpointStore):
+    """in-process checkpoints, lru with ttl by run, for the editing sessions whose runs reuse the former outputs"""
+
+    def __init__(self, maxsize: int = PIPELINE_SESSION_SIZE, ttl: float = PIPELINE_SESSION_TTL) -> None:
+        # run id -> node id -> (input hash, outputs)
+        self.runs: TTLCache[str, Dict[str, Tuple[str, Dict[str, Any]]]] = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    async def get(self, run_id: str, node_id: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        checkpoints = self.runs.get(run_id)
+        return checkpoints.get(node_id) if checkpoints is not None else None
+
+    async def set(self, run_id: str, node_id: str, input_hash: str, outputs: Dict[str, Any]) -> None:
+        checkpoints = self.runs.get(run_id)
+        if checkpoints is None:
+            checkpoints = self.runs[run_id] = {}
+        checkpoints[node_id] = (input_hash, outputs)
+
+    async def delete(self, run_id: str) -> None:
+        self.runs.pop(run_id, None)
+
+
+checkpoint_store: CheckpointStore = LocalCheckpointStore(
+    PIPELINE_CHECKPOINT_DIR or os.path.join(tempfile.gettempdir(), "ragnarok-checkpoints")
+)
+# node outputs of the editing sessions, kept across their runs
+session_store: CheckpointStore = MemoryCheckpointStore()
@@ -0,0 +1,231 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import pickle
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional, Type
+
+from cachetools import TTLCache
+from ragnarok_core.pipeline.pipeline_trace import estimate_size
+from ragnarok_toolkit.blob import BlobRef
+from ragnarok_toolkit.component import RagnarokComponent
+from ragnarok_toolkit.config import (
+    PIPELINE_NODE_CACHE_BYTES,
+    PIPELINE_NODE_CACHE_DIR,
+    PIPELINE_NODE_CACHE_DISK_BYTES,
+    PIPELINE_NODE_CACHE_TTL,
+    PIPELINE_NODE_HASH_OFFLOAD_BYTES,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _encode_special(value: Any) -> Any:
+    # binary payloads are keyed by their digest, hashed from the raw bytes rather than encoded as text
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return {"__bytes__": hashlib.sha256(value).hexdigest()}
+    if isinstance(value, BlobRef):
+        return {"__bytes__": hashlib.sha256(value.view()).hexdigest()}
+    if isinstance(value, (set, frozenset)):
+        return {"__set__": sorted(value, key=repr)}
+    raise TypeError(f"unhashable node input of type {type(value).__name__}")
+
+
+def canonical_json(value: Any) -> Optional[str]:
+    """json encoding of a value independent of the dict key order, None if some item could not be encoded"""
+    try:
+        return json.dumps(value, sort_keys=True, default=_encode_special, ensure_ascii=False)
+    except (TypeError, ValueError):
+        return None
+
+
+def stable_hash(component: Type[RagnarokComponent], inputs: Dict[str, Any]) -> Optional[str]:
+    """
+    stable key of a component execution, by the component name, version and inputs.
+    returns None if some input could not be encoded, the execution is then not cached
+    """
+    encoded_inputs = canonical_json(inputs)
+    if encoded_inputs is None:
+        return None
+    content = f"{component.__name__}\0{component.VERSION}\0{encoded_inputs}"
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def _payload_size(value: Any) -> int:
+    """num of bytes or chars of the binary and text payloads of a value, the other items are not counted"""
+    if isinstance(value, (str, bytes, bytearray, memoryview, BlobRef)):
+        return len(value)
+    if isinstance(value, dict):
+        return sum(_payload_size(item) for item in value.values())
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return sum(_payload_size(item) for item in value)
+    return 0
+
+
+async def stable_hash_async(component: Type[RagnarokComponent], inputs: Dict[str, Any]) -> Optional[str]:
+    """stable_hash without blocking the event loop, the inputs with large payloads are hashed in a thread"""
+    if _payload_size(inputs) > PIPELINE_NODE_HASH_OFFLOAD_BYTES:
+        return await asyncio.to_thread(stable_hash, component, inputs)
+    return stable_hash(component, inputs)
+
+
+class NodeCache(ABC):
+    """
+    storage of the outputs of the cacheable components, keyed by stable_hash.
+    cached outputs are shared by all the runs, so they must not be mutated
+    """
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """the cached outputs of the key, None if missed"""
+
+    @abstractmethod
+    async def set(self, key: str, outputs: Dict[str, Any]) -> None:
+        """store the outputs of the key"""
+
+    @abstractmethod
+    def clear(self) -> None:
+        pass
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses}
+
+
+class MemoryNodeCache(NodeCache):
+    """
+    in-process lru cache with ttl, the least recently used outputs are evicted once their total estimated size
+    exceeds max_bytes. outputs larger than max_bytes are not cached
+    """
+
+    def __init__(self, max_bytes: int = PIPELINE_NODE_CACHE_BYTES, ttl: float = PIPELINE_NODE_CACHE_TTL) -> None:
+        super().__init__()
+        self.max_bytes = max_bytes
+        # each entry weighs at least one byte, so that the empty outputs are bounded too
+        self.outputs: TTLCache[str, Dict[str, Any]] = TTLCache(
+            maxsize=max_bytes, ttl=ttl, getsizeof=lambda outputs: estimate_size(outputs) + 1
+        )
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        outputs = self.outputs.get(key)
+        if outputs is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return outputs
+
+    async def set(self, key: str, outputs: Dict[str, Any]) -> None:
+        try:
+            self.outputs[key] = outputs
+        except ValueError:
+            # larger than the whole cache
+            pass
+
+    def stats(self) -> Dict[str, int]:
+        return {**super().stats(), "size": len(self.outputs), "bytes": int(self.outputs.currsize)}
+
+    def clear(self) -> None:
+        self.outputs.clear()
+
+
+class DiskNodeCache(NodeCache):
+    """
+    on-disk cache, one pickle file per key.
+    the least recently used files are evicted once the total size exceeds max_bytes
+    """
+
+    SUFFIX = ".pkl"
+
+    def __init__(self, directory: str, max_bytes: int = PIPELINE_NODE_CACHE_DISK_BYTES) -> None:
+        super().__init__()
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+        # key -> file size, loaded from the existing files
+        self.sizes: Dict[str, int] = {}
+        for name in os.listdir(directory):
+            if name.endswith(self.SUFFIX):
+                self.sizes[name[: -len(self.SUFFIX)]] = os.path.getsize(os.path.join(directory, name))
+        self.total_bytes = sum(self.sizes.values())
+        self.lock = threading.Lock()
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, key + self.SUFFIX)
+
+    def _get(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.path(key), "rb") as f:
+                outputs = pickle.load(f)
+            # touch the file, the modification time is the recency of eviction
+            os.utime(self.path(key))
+            return outputs
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"broken node cache file of {key}: {e!r}")
+            return None
+
+    def _set(self, key: str, outputs: Dict[str, Any]) -> None:
+        try:
+            data = pickle.dumps(outputs)
+        except Exception:
+            return
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, self.path(key))
+
+        with self.lock:
+            self.total_bytes += len(data) - self.sizes.get(key, 0)
+            self.sizes[key] = len(data)
+            if self.total_bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        """remove the least recently used files until the total size fits, called with the lock held"""
+        recency = []
+        for key in self.sizes:
+            try:
+                recency.append((os.path.getmtime(self.path(key)), key))
+            except FileNotFoundError:
+                recency.append((0.0, key))
+        recency.sort()
+        for _, key in recency:
+            if self.total_bytes <= self.max_bytes:
+                break
+            try:
+                os.remove(self.path(key))
+            except FileNotFoundError:
+                pass
+            self.total_bytes -= self.sizes.pop(key)
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        outputs = await asyncio.to_thread(self._get, key)
+        if outputs is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return outputs
+
+    async def set(self, key: str, outputs: Dict[str, Any]) -> None:
+        await asyncio.to_thread(self._set, key, outputs)
+
+    def clear(self) -> None:
+        with self.lock:
+            for key in list(self.sizes):
+                try:
+                    os.remove(self.path(key))
+                except FileNotFoundError:
+                    pass
+            self.sizes.clear()
+            self.total_bytes = 0
+
+
+node_cache: NodeCache = DiskNodeCache(PIPELINE_NODE_CACHE_DIR) if PIPELINE_NODE_CACHE_DIR else MemoryNodeCache()
@@ -0,0 +1,44 @@
+import hashlib
+from typing import Dict
+
+from cachetools import LRUCache
+from ragnarok_core.pipeline.pipeline_entity import PipelineEntity
+from ragnarok_toolkit.config import PIPELINE_CACHE_SIZE
+
+
+class PipelineCache:
+    """
+    content-addressed cache of compiled pipelines, should be used as a singleton
+    """
+
+    def __init__(self, maxsize: int = PIPELINE_CACHE_SIZE) -> None:
+        # content hash -> compiled pipeline entity, shared by all the runs of the content
+        self.compiled: LRUCache[str, PipelineEntity] = LRUCache(maxsize=maxsize)
+
+    @staticmethod
+    def content_hash(content: str) -> str:
+        """stable key of a pipeline json content"""
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+    def get_or_compile(self, content: str) -> PipelineEntity:
+        """
+        get the compiled pipeline entity of the content,
+        json parsing and component lookup only happen on cache miss
+        """
+        key = self.content_hash(content)
+        compiled = self.compiled.get(key)
+        if compiled is None:
+            compiled = PipelineEntity.from_json_str(content)
+            self.compiled[key] = compiled
+
+        return compiled
+
+    def invalidate(self, content: str) -> bool:
+        """drop the compiled pipeline of the content, return true if it was cached"""
+        return self.compiled.pop(self.content_hash(content), None) is not None
+
+    def clear(self) -> None:
+        self.compiled.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {"size": len(self.compiled), "maxsize": int(self.compiled.maxsize)}
@@ -0,0 +1,181 @@
+import asyncio
+import heapq
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Set, Tuple
+
+from ragnarok_core.pipeline.pipeline_trace import PipelineTrace
+
+if TYPE_CHECKING:
+    from ragnarok_core.pipeline.checkpoint_store import CheckpointStore
+    from ragnarok_core.pipeline.pipeline_entity import (
+        PipelineEntity,
+        PipelineExecutionInfo,
+    )
+
+# principal of the pipeline node running in the current context, the sub-pipelines it runs are charged to it
+current_principal: ContextVar[Optional[str]] = ContextVar("current_principal", default=None)
+
+
+class PipelineRunContext:
+    """
+    mutable state of a single pipeline run,
+    the pipeline entity itself stays frozen so that many runs can share it
+    """
+
+    __slots__ = (
+        "pipeline",
+        "waiting_num",
+        "input_data",
+        "result_queue",
+        "remaining_num",
+        "priorities",
+        "ready",
+        "ready_seq",
+        "running_num",
+        "tasks",
+        "cache_hits",
+        "cache_misses",
+        "trace",
+        "selected",
+        "run_id",
+        "checkpoint_store",
+        "checkpoint_hits",
+        "skipped_inputs",
+        "report_process",
+        "speculations",
+        "speculation_hits",
+        "speculation_misses",
+        "principal",
+        "writers",
+        "unread_nums",
+        "output_bytes",
+        "live_output_bytes",
+        "peak_output_bytes_estimate",
+    )
+
+    def __init__(
+        self,
+        pipeline: "PipelineEntity",
+        priorities: List[float],
+        trace: Optional[PipelineTrace] = None,
+        selected: Optional[Tuple[bool, ...]] = None,
+        run_id: Optional[str] = None,
+        checkpoint_store: Optional["CheckpointStore"] = None,
+        report_process: bool = True,
+        principal: Optional[str] = None,
+    ) -> None:
+        self.pipeline = pipeline
+        # whether each node runs in this run, the live nodes needed by the requested outputs
+        self.selected = selected if selected is not None else pipeline.live_nodes
+        # num of the unprepared input data of each node, indexed by node index
+        self.waiting_num: List[int] = list(pipeline.in_degrees)
+        # whether process_info carries the node outputs, the run drops it otherwise,
+        # so it is sent empty, or not at all by the nodes fused into their downstream node
+        self.report_process = report_process
+        # num of the skipped upstream inputs of each node by input name, allocated on first skip
+        self.skipped_inputs: List[Optional[Dict[str, int]]] = [None] * len(pipeline.node_ids)
+        # input slot table, indexed by node index, allocated on first write
+        self.input_data: List[Optional[Dict[str, Any]]] = [None] * len(pipeline.node_ids)
+        # store the processing result, breaking the contagiousness of multi async generator
+        # unbounded, as streaming nodes emit any num of stream_info
+        self.result_queue: asyncio.Queue["PipelineExecutionInfo"] = asyncio.Queue()
+        # num of the unfinished node
+        self.remaining_num = sum(self.selected)
+        # scheduling priority of each node, that is the estimated length of its remaining path
+        self.priorities = priorities
+        # heap of the ready but not started nodes: (-priority, seq, node_index)
+        self.ready: List[Tuple[float, int, int]] = []
+        self.ready_seq = 0
+        # num of the started and unfinished nodes
+        self.running_num = 0
+        # the running node tasks, referenced until done
+        self.tasks: Set[asyncio.Task] = set()
+        # node cache lookups of the cacheable components
+        self.cache_hits = 0
+        self.cache_misses = 0
+        # node spans of a traced run, None if not traced
+        self.trace = trace
+        # id of a resumable run, whose node outputs are checkpointed in the checkpoint store
+        self.run_id = run_id
+        self.checkpoint_store = checkpoint_store
+        # num of the nodes restored from the checkpoints rather than executed
+        self.checkpoint_hits = 0
+        # node index -> (speculative inputs, execution task) of the nodes started with fallback values
+        self.speculations: Dict[int, Tuple[Dict[str, Any], asyncio.Task]] = {}
+        # num of the speculative executions kept, and of those dropped for the actual inputs
+        self.speculation_hits = 0
+        self.speculation_misses = 0
+        # owner of the run, whose nodes are within its budget of in-flight nodes
+        self.principal = principal
+        # upstream node indexes whose outputs were written into the unread inputs of each node
+        self.writers: List[List[int]] = [[] for _ in pipeline.node_ids]
+        # num of the unread inputs written from the outputs of each node, and the estimated bytes of those outputs
+        self.unread_nums: List[int] = [0] * len(pipeline.node_ids)
+        self.output_bytes: List[int] = [0] * len(pipeline.node_ids)
+        # estimated bytes of the node outputs still waiting to be read by a downstream node, and its peak.
+        # only an estimate from the output sizes, the real memory is measured by tracemalloc in the benchmarks
+        self.live_output_bytes = 0
+        self.peak_output_bytes_estimate = 0
+
+    def set_input(self, node_index: int, input_name: str, value: Any, from_index: Optional[int] = None) -> None:
+        """write an input value of a node, from_index is the upstream node it comes from, None if injected"""
+        slots = self.input_data[node_index]
+        if slots is None:
+            slots = self.input_data[node_index] = dict.fromkeys(self.pipeline.input_names[node_index])
+        slots[input_name] = value
+        if from_index is not None:
+            self.writers[node_index].append(from_index)
+            self.unread_nums[from_index] += 1
+        if self.trace is not None:
+            self.trace.mark_input(node_index)
+
+    def take_inputs(self, node_index: int) -> Dict[str, Any]:
+        """pop the inputs of a node which is about to execute, missing inputs are None"""
+        slots = self.input_data[node_index]
+        self.release_inputs(node_index)
+        if slots is None:
+            return dict.fromkeys(self.pipeline.input_names[node_index])
+        return slots
+
+    def release_inputs(self, node_index: int) -> None:
+        """drop the inputs of a node, read or skipped, the upstream outputs with no other unread input are released"""
+        self.input_data[node_index] = None
+        for from_index in self.writers[node_index]:
+            self.unread_nums[from_index] -= 1
+            if self.unread_nums[from_index] == 0:
+                self.live_output_bytes -= self.output_bytes[from_index]
+        self.writers[node_index] = []
+
+    def hold_outputs(self, node_index: int, output_bytes: int) -> None:
+        """
+        count the outputs of a finished node as live, call it once its inputs are written downstream.
+        they are released when the last of those inputs is read
+        """
+        self.output_bytes[node_index] = output_bytes
+        self.live_output_bytes += output_bytes
+        self.peak_output_bytes_estimate = max(self.peak_output_bytes_estimate, self.live_output_bytes)
+        if self.unread_nums[node_index] == 0:
+            self.live_output_bytes -= output_bytes
+
+    def skip_input(self, node_index: int, input_name: str) -> None:
+        """record an upstream input of a node skipped, by a connection not taken or an upstream node skipped"""
+        skipped = self.skipped_inputs[node_index]
+        if skipped is None:
+            skipped = self.skipped_inputs[node_index] = {}
+        skipped[input_name] = skipped.get(input_name, 0) + 1
+
+    def settle_input(self, node_index: int) -> bool:
+        """mark one upstream input of a node as settled, return true if the node becomes ready"""
+        self.waiting_num[node_index] -= 1
+        return self.waiting_num[node_index] == 0
+
+    def push_ready(self, node_index: int) -> None:
+        """queue a node whose inputs are all settled"""
+        if self.trace is not None:
+            self.trace.mark_ready(node_index)
+        self.ready_seq += 1
+        heapq.heappush(self.ready, (-self.priorities[node_index], self.ready_seq, node_index))
+
+    def pop_ready(self) -> int:
+        """pop the ready node with the longest remaining path"""
+        return heapq.heappop(self.ready)[2]
@@ -1,161 +1,1232 @@
 import asyncio
+import inspect
+import itertools
 import json
-from dataclasses import asdict, dataclass
+import logging
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Any, AsyncGenerator, Dict, List, Literal, Tuple
+from typing import (
+    Any,
+    AsyncGenerator,
+    AsyncIterator,
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    Literal,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+    Union,
+)
 
 from ragnarok_core.components import component_manager
+from ragnarok_core.exceptions import InvalidPipelineError
+from ragnarok_core.pipeline.blob_store import BlobStore
+from ragnarok_core.pipeline.blob_store import blob_store as default_blob_store
+from ragnarok_core.pipeline.checkpoint_store import CheckpointStore
+from ragnarok_core.pipeline.checkpoint_store import (
+    checkpoint_store as default_checkpoint_store,
+)
+from ragnarok_core.pipeline.checkpoint_store import session_store
+from ragnarok_core.pipeline.node_cache import NodeCache
+from ragnarok_core.pipeline.node_cache import node_cache as default_node_cache
+from ragnarok_core.pipeline.node_cache import stable_hash_async
+from ragnarok_core.pipeline.pipeline_context import (
+    PipelineRunContext,
+    current_principal,
+)
+from ragnarok_core.pipeline.pipeline_event import (
+    EventEncoding,
+    EventVerbosity,
+    encode,
+    summarize,
+)
+from ragnarok_core.pipeline.pipeline_executor import (
+    ComponentExecutor,
+    component_executor,
+)
 from ragnarok_core.pipeline.pipeline_node import PipelineNode
+from ragnarok_core.pipeline.pipeline_scheduler import NodeScheduler, node_scheduler
+from ragnarok_core.pipeline.pipeline_stream import NodeStream, StreamAggregator
+from ragnarok_core.pipeline.pipeline_trace import PipelineTrace, estimate_size
+from ragnarok_toolkit.component import (
+    ComponentExecutionClass,
+    ComponentIOType,
+    ComponentOutputTypeOption,
+    RagnarokComponent,
+)
+from ragnarok_toolkit.config import (
+    PIPELINE_BATCH_SIZE,
+    PIPELINE_FUSE_LIGHTWEIGHT,
+    PIPELINE_NODE_TIMEOUT,
+    PIPELINE_RUN_TIMEOUT,
+    PIPELINE_STREAM_QUEUE_SIZE,
+)
+from ragnarok_toolkit.tracing import current_external_calls
+
+logger = logging.getLogger(__name__)
 
 
 @dataclass
 class PipelineExecutionInfo:
     node_id: str
-    type: Literal["process_info", "output_info", "end_info"]
+    type: Literal["process_info", "output_info", "stream_info", "skip_info", "error_info", "trace_info", "end_info"]
     data: Dict[str, Any]
     timestamp: datetime = None  # auto set by __post_init__
 
     def __post_init__(self):
         self.timestamp = datetime.now()
 
+    def to_dict(self) -> Dict[str, Any]:
+        """shallow, the node data is shared rather than copied"""
+        return {
+            "node_id": self.node_id,
+            "type": self.type,
+            "data": self.data,
+            "timestamp": self.timestamp.isoformat(),
+        }
+
+    def to_json(self) -> str:
+        return encode(self.to_dict())
+
+    def encode(self, encoding: EventEncoding = EventEncoding.JSON) -> Union[str, bytes]:
+        return encode(self.to_dict(), encoding)
+
+
+@dataclass
+class PipelineBatchResult:
+    """result of one input set of a batched run, outputs are keyed by the output name of the output nodes"""
+
+    row_index: int
+    outputs: Dict[str, Any]
+    error: Optional[str] = None
+
     def to_json(self) -> str:
-        dict_data = asdict(self)
-        dict_data["timestamp"] = self.timestamp.isoformat()
-        return json.dumps(dict_data)
+        return encode({"row_index": self.row_index, "outputs": self.outputs, "error": self.error})
 
 
 class PipelineEntity:
-    def __init__(self, node_map: Dict[str, PipelineNode], inject_input_mapping: Dict[str, Tuple[str, str]]) -> None:
+    """
+    frozen pipeline graph, the state of each run lives in a PipelineRunContext,
+    so one entity could serve any number of sequential or concurrent runs
+    """
+
+    def __init__(
+        self,
+        node_map: Dict[str, PipelineNode],
+        inject_input_mapping: Dict[str, Tuple[str, str]],
+        *,
+        scheduler: Optional[NodeScheduler] = None,
+        executor: Optional[ComponentExecutor] = None,
+        node_cache: Optional[NodeCache] = None,
+        checkpoint_store: Optional[CheckpointStore] = None,
+        blob_store: Optional[BlobStore] = None,
+        fuse: bool = PIPELINE_FUSE_LIGHTWEIGHT,
+        cache_results: bool = False,
+    ) -> None:
         # store the mapping of the node_id and node entity
         self.node_map = node_map
-        # store the processing result, breaking the contagiousness of multi async generator
-        self.result_queue: asyncio.Queue[PipelineExecutionInfo] = asyncio.Queue(maxsize=2 * len(self.node_map))
-        # num of the unfinished node
-        self.remaining_num = len(node_map)
         # outer input inject mapping. eg: inject_name -> (node_id, node_input_name)
         self.inject_input_mapping = inject_input_mapping
-        # init waiting nums
-        for node in node_map.values():
-            for connection in node.forward_node_info:
-                node_map[connection.to_node_id].waiting_num += 1
+        # node index arrays, run contexts address nodes by index
+        self.node_ids: Tuple[str, ...] = tuple(node_map.keys())
+        self.node_index: Dict[str, int] = {node_id: index for index, node_id in enumerate(self.node_ids)}
+        self.input_names: Tuple[Tuple[str, ...], ...] = tuple(
+            tuple(input_option["name"] for input_option in node.component.input_options()) for node in node_map.values()
+        )
+        # input names of each node declared streaming, they receive a NodeStream instead of the whole value
+        self.streaming_inputs: Tuple[FrozenSet[str], ...] = tuple(
+            frozenset(
+                input_option["name"] for input_option in node.component.input_options() if input_option.get("streaming")
+            )
+            for node in node_map.values()
+        )
+        # whether each node is a streaming node, whose execute function is an async generator
+        self.streaming_nodes: Tuple[bool, ...] = tuple(
+            inspect.isasyncgenfunction(node.component.execute) for node in node_map.values()
+        )
+        # input names of each node declared required, a node whose required input is skipped is skipped too
+        self.required_inputs: Tuple[FrozenSet[str], ...] = tuple(
+            frozenset(
+                input_option["name"] for input_option in node.component.input_options() if input_option.get("required")
+            )
+            for node in node_map.values()
+        )
+        # declared output types of each node, by which the partial outputs of a streaming node are merged
+        self.output_types: Tuple[Dict[str, ComponentIOType], ...] = tuple(
+            {output_option["name"]: output_option.get("type") for output_option in self._output_options(node.component)}
+            for node in node_map.values()
+        )
+        # output names of each node declared BLOB or BLOB_LIST, their payloads are handed over as blob handles
+        self.blob_outputs: Tuple[Tuple[Tuple[str, bool], ...], ...] = tuple(
+            tuple(
+                (name, output_type == ComponentIOType.BLOB_LIST)
+                for name, output_type in output_types.items()
+                if output_type in (ComponentIOType.BLOB, ComponentIOType.BLOB_LIST)
+            )
+            for output_types in self.output_types
+        )
+        self._validate_ports()
+        # forward edges of each node: (from_node_output_name, to_node_index, to_node_input_name)
+        self.forward_edges: Tuple[Tuple[Tuple[str, int, str], ...], ...] = tuple(
+            tuple(
+                (
+                    connection.from_node_output_name,
+                    self.node_index[connection.to_node_id],
+                    connection.to_node_input_name,
+                )
+                for connection in node.forward_node_info
+            )
+            for node in node_map.values()
+        )
+        # in-degree of each node, that is the num of the upstream inputs it waits for
+        in_degrees = [0] * len(self.node_ids)
+        # num of the upstream connections of each node by input name
+        input_edge_nums: List[Dict[str, int]] = [{} for _ in self.node_ids]
+        for edges in self.forward_edges:
+            for _, to_index, to_node_input_name in edges:
+                in_degrees[to_index] += 1
+                input_edge_nums[to_index][to_node_input_name] = input_edge_nums[to_index].get(to_node_input_name, 0) + 1
+        self.input_edge_nums: Tuple[Dict[str, int], ...] = tuple(input_edge_nums)
 
         # beginning nodes, whose input is either empty or totally injected
-        self.begin_nodes = [
+        injected_inputs: Dict[str, Set[str]] = {}
+        for node_id, node_input_name in inject_input_mapping.values():
+            injected_inputs.setdefault(node_id, set()).add(node_input_name)
+        self.begin_nodes: Tuple[PipelineNode, ...] = tuple(
             node
-            for node in node_map.values()
-            if len(node.component.input_options()) == 0
-            or {input_option.get("name") for input_option in node.component.input_options()}.issubset(
-                {
-                    node_input_name
-                    for node_id, node_input_name in inject_input_mapping.values()
-                    if node_id == node.node_id
-                }
-            )
-        ]
+            for index, node in enumerate(node_map.values())
+            if set(self.input_names[index]).issubset(injected_inputs.get(node.node_id, set()))
+        )
+        if node_map and not self.begin_nodes:
+            raise InvalidPipelineError("no beginning node, every node has an input which is not injected")
+        upstream_nums = tuple(in_degrees)
+        self.upstream_nums: Tuple[int, ...] = upstream_nums
         for node in self.begin_nodes:
-            node.waiting_num = 0
+            in_degrees[self.node_index[node.node_id]] = 0
+        self.in_degrees: Tuple[int, ...] = tuple(in_degrees)
+        self._validate_streams()
+        # whether each node has a streaming input fed by a streaming node,
+        # it is started as soon as it is ready, paced by its producer rather than by the scheduler
+        stream_fed = [False] * len(self.node_ids)
+        for index, edges in enumerate(self.forward_edges):
+            if self.streaming_nodes[index]:
+                for _, to_index, to_node_input_name in edges:
+                    if to_node_input_name in self.streaming_inputs[to_index]:
+                        stream_fed[to_index] = True
+        self.stream_fed: Tuple[bool, ...] = tuple(stream_fed)
+        # whether each node is started at once without a slot, a stream fed node or an unscheduled component
+        self.unscheduled: Tuple[bool, ...] = tuple(
+            fed or not node.component.SCHEDULED for fed, node in zip(stream_fed, node_map.values())
+        )
+        # node indexes in topological order, used to estimate the remaining path of each node
+        self.topological_order: Tuple[int, ...] = self._topological_sort()
+        if len(self.topological_order) < len(self.node_ids):
+            sorted_indexes = set(self.topological_order)
+            cycle_node_ids = [node_id for index, node_id in enumerate(self.node_ids) if index not in sorted_indexes]
+            raise InvalidPipelineError(f"cycle through or downstream of the nodes {', '.join(cycle_node_ids)}")
+        # whether each node could ever run, dead nodes are left out of the runs
+        self.live_nodes: Tuple[bool, ...] = self._find_live_nodes(upstream_nums)
+        self.live_num = sum(self.live_nodes)
+        if self.live_num < len(self.node_ids):
+            dead_node_ids = [node_id for index, node_id in enumerate(self.node_ids) if not self.live_nodes[index]]
+            logger.warning(f"pipeline nodes {', '.join(dead_node_ids)} could never run, they are pruned")
+        # upstream node indexes of each node, walked back from the requested outputs
+        upstream_indexes: List[List[int]] = [[] for _ in self.node_ids]
+        for index, edges in enumerate(self.forward_edges):
+            for _, to_index, _ in edges:
+                upstream_indexes[to_index].append(index)
+        self.upstream_indexes: Tuple[Tuple[int, ...], ...] = tuple(tuple(indexes) for indexes in upstream_indexes)
+        self.output_names: FrozenSet[str] = frozenset(
+            node.output_name for node in node_map.values() if node.output_name is not None
+        )
+        # input name -> fallback inject name of the speculative connections into each node
+        speculative_inputs: List[Dict[str, str]] = [{} for _ in self.node_ids]
+        for node in node_map.values():
+            for connection in node.forward_node_info:
+                if connection.speculative_fallback is not None:
+                    to_index = self.node_index[connection.to_node_id]
+                    speculative_inputs[to_index][connection.to_node_input_name] = connection.speculative_fallback
+        self.speculative_inputs: Tuple[Dict[str, str], ...] = tuple(speculative_inputs)
+        # nodes started at once with the fallback values, those whose upstream connections are all speculative
+        self.speculative_nodes: Tuple[int, ...] = tuple(
+            index
+            for index, inputs in enumerate(speculative_inputs)
+            if inputs
+            and sum(self.input_edge_nums[index][input_name] for input_name in inputs) == self.upstream_nums[index]
+            and not self.streaming_nodes[index]
+            and not self.streaming_inputs[index]
+        )
+        # requested output names -> the nodes they need, a pipeline is asked for few distinct sets
+        self.output_cones: Dict[FrozenSet[str], Tuple[bool, ...]] = {}
+        # node run right after each node within the same scheduled step, if it heads or continues a fused chain
+        self.fused_next: Tuple[Optional[int], ...] = self._fuse_chains() if fuse else (None,) * len(self.node_ids)
+        # limiter of the concurrently executing nodes
+        self.scheduler = scheduler if scheduler is not None else node_scheduler
+        # runner of the component execute functions, by their execution class
+        self.executor = executor if executor is not None else component_executor
+        # storage of the outputs of the cacheable components
+        self.node_cache = node_cache if node_cache is not None else default_node_cache
+        # storage of the node outputs of the resumable runs
+        self.checkpoint_store = checkpoint_store if checkpoint_store is not None else default_checkpoint_store
+        # maker of the handles of the BLOB outputs, spilling the large payloads to files
+        self.blob_store = blob_store if blob_store is not None else default_blob_store
+        # default deadline of a node execution, overridden by the component EXECUTION_TIMEOUT
+        self.node_timeout = PIPELINE_NODE_TIMEOUT or None
+        # whether the runs of the same params could be served from the result cache,
+        # for the pipelines whose results depend on their params only
+        self.cache_results = cache_results
+
+    def _validate_ports(self) -> None:
+        """every connection and injection has to point at an existing node and a declared input or output"""
+        for node in self.node_map.values():
+            from_index = self.node_index[node.node_id]
+            for connection in node.forward_node_info:
+                if connection.from_node_output_name not in self.output_types[from_index]:
+                    raise InvalidPipelineError(f"node {node.node_id} has no output {connection.from_node_output_name}")
+                to_index = self.node_index.get(connection.to_node_id)
+                if to_index is None:
+                    raise InvalidPipelineError(
+                        f"connection from node {node.node_id} to a missing node {connection.to_node_id}"
+                    )
+                if connection.to_node_input_name not in self.input_names[to_index]:
+                    raise InvalidPipelineError(
+                        f"node {connection.to_node_id} has no input {connection.to_node_input_name}"
+                    )
+                if connection.condition_output_name is not None:
+                    if connection.condition_output_name not in self.output_types[from_index]:
+                        raise InvalidPipelineError(
+                            f"connection condition on a missing output {connection.condition_output_name} "
+                            f"of node {node.node_id}"
+                        )
+                    if (
+                        self.streaming_nodes[from_index]
+                        and connection.to_node_input_name in self.streaming_inputs[to_index]
+                    ):
+                        raise InvalidPipelineError(
+                            f"streaming connection from node {node.node_id} to node {connection.to_node_id} "
+                            "could not be conditional"
+                        )
+                if (
+                    connection.speculative_fallback is not None
+                    and connection.speculative_fallback not in self.inject_input_mapping
+                ):
+                    raise InvalidPipelineError(
+                        f"speculative connection to node {connection.to_node_id} falls back on a missing input "
+                        f"{connection.speculative_fallback}"
+                    )
 
-    async def run_async(self, *args, **kwargs) -> AsyncGenerator[PipelineExecutionInfo, None]:
-        """execute the pipeline, async version"""
-        # 1. inject outer input
         for inject_name, (node_id, node_input_name) in self.inject_input_mapping.items():
-            actual_input_value = kwargs.get(inject_name)
-            # TODO check if actual_input_value is None or not correspond to node expected type
-            self.node_map[node_id].input_data[node_input_name] = actual_input_value
+            if inject_name in RESERVED_INJECT_NAMES:
+                raise InvalidPipelineError(f"input name {inject_name} is reserved for a run option")
+            index = self.node_index.get(node_id)
+            if index is None:
+                raise InvalidPipelineError(f"input {inject_name} is injected into a missing node {node_id}")
+            if node_input_name not in self.input_names[index]:
+                raise InvalidPipelineError(f"input {inject_name} is injected into a missing input {node_input_name}")
+
+    def _validate_streams(self) -> None:
+        """
+        a streaming node waits for its consumers to read each partial output, so a consumer of its stream
+        could not also wait for its end, through a non-streaming input fed by the node or by any node after it
+        """
+        # upstream node indexes of each node, and those of its non-streaming inputs only
+        upstreams: List[List[int]] = [[] for _ in self.node_ids]
+        whole_upstreams: List[List[int]] = [[] for _ in self.node_ids]
+        streamed_edges: List[Tuple[int, int]] = []
+        for from_index, edges in enumerate(self.forward_edges):
+            for _, to_index, to_node_input_name in edges:
+                upstreams[to_index].append(from_index)
+                if self.streaming_nodes[from_index] and to_node_input_name in self.streaming_inputs[to_index]:
+                    streamed_edges.append((from_index, to_index))
+                else:
+                    whole_upstreams[to_index].append(from_index)
+
+        # consumer index -> the nodes its non-streaming inputs wait for
+        waited: Dict[int, Set[int]] = {}
+        for from_index, to_index in streamed_edges:
+            if to_index not in waited:
+                seen: Set[int] = set()
+                stack = list(whole_upstreams[to_index])
+                while stack:
+                    index = stack.pop()
+                    if index not in seen:
+                        seen.add(index)
+                        stack.extend(upstreams[index])
+                waited[to_index] = seen
+            if from_index in waited[to_index]:
+                raise InvalidPipelineError(
+                    f"node {self.node_ids[to_index]} reads the stream of node {self.node_ids[from_index]} "
+                    "while a non-streaming input of it waits for the end of that stream"
+                )
+
+    def _is_fusible(self, node_index: int) -> bool:
+        """a lightweight component whose execute is a plain sync function run inline"""
+        component = self.node_map[self.node_ids[node_index]].component
+        return (
+            component.LIGHTWEIGHT
+            and component.EXECUTION_CLASS == ComponentExecutionClass.INLINE
+            and not inspect.iscoroutinefunction(component.execute)
+            and not self.streaming_nodes[node_index]
+            and not self.streaming_inputs[node_index]
+        )
 
-        # 2. run beginning task
-        # TODO if begin_nodes is empty, please raise error
+    def _fuse_chains(self) -> Tuple[Optional[int], ...]:
+        """
+        fuse each fusible node into its only downstream node, when that one is fusible too and fed by it alone,
+        through unconditional connections. the fused node then runs in the step of its upstream node,
+        skipping the task creation, the ready queue and the scheduler slot
+        """
+        begin_indexes = {self.node_index[node.node_id] for node in self.begin_nodes}
+        fused_next: List[Optional[int]] = [None] * len(self.node_ids)
+        for index, node in enumerate(self.node_map.values()):
+            to_indexes = {to_index for _, to_index, _ in self.forward_edges[index]}
+            if len(to_indexes) != 1 or not self._is_fusible(index):
+                continue
+            to_index = to_indexes.pop()
+            if (
+                self._is_fusible(to_index)
+                and to_index not in begin_indexes
+                and set(self.upstream_indexes[to_index]) == {index}
+                and all(connection.condition_output_name is None for connection in node.forward_node_info)
+            ):
+                fused_next[index] = to_index
+        return tuple(fused_next)
+
+    def _find_live_nodes(self, upstream_nums: Tuple[int, ...]) -> Tuple[bool, ...]:
+        """
+        a node is live if it is a beginning node, or all its upstream nodes are live.
+        any other node waits for an input that never comes
+        """
+        live_nodes = [False] * len(self.node_ids)
         for node in self.begin_nodes:
-            asyncio.create_task(self.run_node_async(node))
+            live_nodes[self.node_index[node.node_id]] = True
+        live_upstream_nums = [0] * len(self.node_ids)
+        for index in self.topological_order:
+            if not live_nodes[index] and (
+                upstream_nums[index] == 0 or live_upstream_nums[index] < upstream_nums[index]
+            ):
+                continue
+            live_nodes[index] = True
+            for _, to_index, _ in self.forward_edges[index]:
+                live_upstream_nums[to_index] += 1
+        return tuple(live_nodes)
+
+    def select_nodes(self, outputs: Optional[Iterable[str]] = None) -> Tuple[bool, ...]:
+        """
+        whether each node is needed for the requested output names,
+        that is a live node in the backward cone of their output nodes. all the live nodes if None
+        """
+        if outputs is None:
+            return self.live_nodes
+        requested = frozenset(outputs)
+        selected = self.output_cones.get(requested)
+        if selected is not None:
+            return selected
+
+        unknown = requested - self.output_names
+        if unknown:
+            raise ValueError(f"pipeline has no outputs {', '.join(sorted(unknown))}")
+        in_cone = [False] * len(self.node_ids)
+        stack = [index for index, node in enumerate(self.node_map.values()) if node.output_name in requested]
+        while stack:
+            index = stack.pop()
+            if not in_cone[index]:
+                in_cone[index] = True
+                stack.extend(self.upstream_indexes[index])
+        selected = tuple(needed and live for needed, live in zip(in_cone, self.live_nodes))
+        self.output_cones[requested] = selected
+        return selected
+
+    def _topological_sort(self) -> Tuple[int, ...]:
+        """kahn's algorithm over the forward edges, nodes on a cycle are left out"""
+        in_degrees = [0] * len(self.node_ids)
+        for edges in self.forward_edges:
+            for _, to_index, _ in edges:
+                in_degrees[to_index] += 1
+
+        order = [index for index, in_degree in enumerate(in_degrees) if in_degree == 0]
+        for index in order:
+            for _, to_index, _ in self.forward_edges[index]:
+                in_degrees[to_index] -= 1
+                if in_degrees[to_index] == 0:
+                    order.append(to_index)
+        return tuple(order)
+
+    def remaining_paths(self) -> List[float]:
+        """estimated latency of the longest path starting from each node, by historical component latency"""
+        latency_stats = self.scheduler.latency_stats
+        paths = [latency_stats.estimate(self.node_map[node_id].component.__name__) for node_id in self.node_ids]
+        for index in reversed(self.topological_order):
+            successor_paths = [paths[to_index] for _, to_index, _ in self.forward_edges[index]]
+            if successor_paths:
+                paths[index] += max(successor_paths)
+        return paths
+
+    async def run_async(
+        self,
+        *args,
+        run_timeout: Optional[float] = PIPELINE_RUN_TIMEOUT,
+        trace: bool = False,
+        outputs: Optional[Iterable[str]] = None,
+        verbosity: EventVerbosity = EventVerbosity.FULL,
+        run_id: Optional[str] = None,
+        checkpoint_store: Optional[CheckpointStore] = None,
+        session_id: Optional[str] = None,
+        principal: Optional[str] = None,
+        **kwargs,
+    ) -> AsyncGenerator[PipelineExecutionInfo, None]:
+        """
+        execute the pipeline, async version.
+        the run ends with an error_info once a node fails or the run_timeout (seconds, 0 for none) expires,
+        closing the generator early cancels all the in-flight nodes.
+        a traced run reports the spans of its nodes in a trace_info right before the run ends.
+        given the output names, only the nodes they depend on are run.
+        verbosity drops or summarizes the node outputs carried by process_info,
+        the inner nodes of the fused chains do not even emit it when it is dropped.
+        a run with a run_id checkpoints the outputs of its nodes, restarting a failed run with the same id
+        skips the nodes whose inputs are unchanged. the checkpoints are dropped once the run succeeds.
+        the runs of an editing session, given its session_id, likewise reuse the outputs of the former runs
+        of the session, only the nodes whose component or inputs changed are executed again.
+        the nodes fed by speculative connections only start at once with the fallback values of those.
+        the nodes of the runs of one principal are within its budget of in-flight nodes
+        """
+        if run_id is not None and session_id is not None:
+            raise ValueError("a run could not be both resumable and part of an editing session")
+        selected = self.select_nodes(outputs)
+        if session_id is not None:
+            # the session outputs outlive each run, they are only replaced node by node
+            run_id, checkpoint_store = session_id, session_store
+        pipeline_trace = (
+            PipelineTrace(self.node_ids, [node.component.__name__ for node in self.node_map.values()])
+            if trace
+            else None
+        )
+        ctx = PipelineRunContext(
+            self,
+            self.remaining_paths(),
+            pipeline_trace,
+            selected,
+            run_id=run_id,
+            checkpoint_store=checkpoint_store if checkpoint_store is not None else self.checkpoint_store,
+            report_process=verbosity != EventVerbosity.OUTPUTS,
+            principal=principal,
+        )
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + run_timeout if run_timeout else None
+
+        try:
+            # 1. inject outer input
+            for inject_name, (node_id, node_input_name) in self.inject_input_mapping.items():
+                actual_input_value = kwargs.get(inject_name)
+                # TODO check if actual_input_value is None or not correspond to node expected type
+                ctx.set_input(self.node_index[node_id], node_input_name, actual_input_value)
+
+            # 2. run beginning task, there is at least one as checked on build
+            for node in self.begin_nodes:
+                if selected[self.node_index[node.node_id]]:
+                    self._make_ready(ctx, self.node_index[node.node_id])
+            self._dispatch(ctx)
+            for node_index in self.speculative_nodes:
+                if selected[node_index]:
+                    self._speculate(ctx, node_index, kwargs)
+
+            # 3. collect result
+            while ctx.remaining_num > 0:
+                try:
+                    timeout = None if deadline is None else max(deadline - loop.time(), 0)
+                    execution_info = await asyncio.wait_for(ctx.result_queue.get(), timeout)
+                except TimeoutError:
+                    yield PipelineExecutionInfo(
+                        "", "error_info", {"error": f"pipeline run timed out after {run_timeout}s"}
+                    )
+                    if pipeline_trace is not None:
+                        yield self._trace_info(ctx)
+                    return
+
+                if execution_info.type == "skip_info":
+                    ctx.remaining_num -= 1
+                elif execution_info.type == "process_info":
+                    ctx.remaining_num -= 1
+                    if verbosity == EventVerbosity.OUTPUTS:
+                        continue
+                    if verbosity == EventVerbosity.SUMMARY:
+                        execution_info.data = summarize(execution_info.data)
+
+                yield execution_info
+
+                # fail fast, the rest of the run is cancelled
+                if execution_info.type == "error_info":
+                    if pipeline_trace is not None:
+                        yield self._trace_info(ctx)
+                    return
+                # not kept while waiting for the next event, the reader holds the node data as long as it needs
+                execution_info = None
+
+            if run_id is not None and session_id is None:
+                await ctx.checkpoint_store.delete(run_id)
+            if pipeline_trace is not None:
+                yield self._trace_info(ctx)
+            yield PipelineExecutionInfo(
+                "",
+                "end_info",
+                {
+                    "cache_hits": ctx.cache_hits,
+                    "cache_misses": ctx.cache_misses,
+                    "checkpoint_hits": ctx.checkpoint_hits,
+                    "speculation_hits": ctx.speculation_hits,
+                    "speculation_misses": ctx.speculation_misses,
+                    "peak_output_bytes_estimate": ctx.peak_output_bytes_estimate,
+                },
+            )
+        finally:
+            await self._cancel(ctx)
+
+    @staticmethod
+    def _trace_info(ctx: PipelineRunContext) -> PipelineExecutionInfo:
+        pipeline_trace = ctx.trace
+        pipeline_trace.peak_output_bytes_estimate = ctx.peak_output_bytes_estimate
+        pipeline_trace.finish()
+        return PipelineExecutionInfo(
+            "",
+            "trace_info",
+            {
+                "trace": pipeline_trace.to_dict(),
+                "chrome_trace": pipeline_trace.to_chrome_trace(),
+                "otel": pipeline_trace.to_otel(),
+            },
+        )
+
+    async def _cancel(self, ctx: PipelineRunContext) -> None:
+        """cancel and wait for all the unfinished nodes of a run"""
+        ctx.ready.clear()
+        tasks = list(ctx.tasks)
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _dispatch(self, ctx: PipelineRunContext) -> None:
+        """start the ready nodes of a run, as long as the run has spare slots"""
+        while ctx.ready and ctx.running_num < self.scheduler.max_concurrency_per_run:
+            node_index = ctx.pop_ready()
+            ctx.running_num += 1
+            self._start(ctx, node_index, scheduled=True)
+
+    def _start(self, ctx: PipelineRunContext, node_index: int, scheduled: bool) -> None:
+        task = asyncio.create_task(self._run_node_task(ctx, node_index, scheduled))
+        ctx.tasks.add(task)
+        task.add_done_callback(ctx.tasks.discard)
 
-        # 3. collect result
-        while self.remaining_num > 0:
-            execution_info = await self.result_queue.get()
-            if execution_info.type == "process_info":
-                self.remaining_num -= 1
+    def _make_ready(self, ctx: PipelineRunContext, node_index: int) -> None:
+        """hand a node whose inputs are all settled to the scheduler, or start an unscheduled node at once"""
+        if self.unscheduled[node_index]:
+            if ctx.trace is not None:
+                ctx.trace.mark_ready(node_index)
+            self._start(ctx, node_index, scheduled=False)
+        else:
+            ctx.push_ready(node_index)
+
+    def _is_skipped(self, node_index: int, skipped_inputs: Optional[Dict[str, int]]) -> bool:
+        """
+        whether a node whose inputs are all settled is skipped, that is all its upstream inputs are skipped,
+        or all the connections of one of its required inputs are
+        """
+        if not skipped_inputs:
+            return False
+        if sum(skipped_inputs.values()) >= self.upstream_nums[node_index]:
+            return True
+        return any(
+            skipped_num >= self.input_edge_nums[node_index][input_name]
+            for input_name, skipped_num in skipped_inputs.items()
+            if input_name in self.required_inputs[node_index]
+        )
+
+    def _settle_node(self, ctx: PipelineRunContext, node_index: int) -> None:
+        """a node whose inputs are all settled either runs, or is skipped along with the nodes it leaves skipped"""
+        if not self._is_skipped(node_index, ctx.skipped_inputs[node_index]):
+            self._make_ready(ctx, node_index)
+            return
+
+        skipped_indexes = [node_index]
+        while skipped_indexes:
+            skipped_index = skipped_indexes.pop()
+            self._abandon_streams(skipped_index, ctx.input_data[skipped_index])
+            # the outputs of the upstream nodes written into it are not read, they are released all the same
+            ctx.release_inputs(skipped_index)
+            self._drop_speculation(ctx, skipped_index)
+            ctx.result_queue.put_nowait(PipelineExecutionInfo(self.node_ids[skipped_index], "skip_info", {}))
+            for _, to_index, to_node_input_name in self.forward_edges[skipped_index]:
+                if not ctx.selected[to_index]:
+                    continue
+                ctx.skip_input(to_index, to_node_input_name)
+                if ctx.settle_input(to_index):
+                    if self._is_skipped(to_index, ctx.skipped_inputs[to_index]):
+                        skipped_indexes.append(to_index)
+                    else:
+                        self._make_ready(ctx, to_index)
 
-            yield execution_info
+    async def _run_node_task(self, ctx: PipelineRunContext, node_index: int, scheduled: bool) -> None:
+        """hold a process-wide slot while running a node if scheduled, then start the nodes it made ready"""
+        current_principal.set(ctx.principal)
+        try:
+            if scheduled:
+                await self.scheduler.acquire(ctx.priorities[node_index], ctx.principal, ctx)
+            try:
+                # a fused chain runs node by node within this step, each node gives the next one if any
+                while node_index is not None:
+                    node_index = await self.run_node_async(ctx, node_index)
+            finally:
+                if scheduled:
+                    self.scheduler.release(ctx.principal)
+                    ctx.running_num -= 1
+        except Exception as e:
+            node_id = self.node_ids[node_index]
+            logger.warning(f"pipeline node {node_id} failed: {e!r}")
+            if isinstance(e, TimeoutError):
+                error = f"node {node_id} timed out"
+            else:
+                error = f"node {node_id} failed: {e}"
+            ctx.result_queue.put_nowait(
+                PipelineExecutionInfo(node_id, "error_info", {"error": error, "error_type": type(e).__name__})
+            )
+            return
+        self._dispatch(ctx)
+
+    async def run_node_async(self, ctx: PipelineRunContext, node_index: int) -> Optional[int]:
+        """run a node execution function, async version. returns the fused node to run next, if any"""
+        if ctx.trace is None:
+            return await self._run_node(ctx, node_index)
 
-        yield PipelineExecutionInfo("", "end_info", {})
+        span = ctx.trace.spans[node_index]
+        span.start_time = time.time()
+        # the external calls made by the node are recorded into its span
+        token = current_external_calls.set(span.external_calls)
+        try:
+            return await self._run_node(ctx, node_index)
+        except Exception as e:
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            current_external_calls.reset(token)
+            span.end_time = time.time()
 
-    async def run_node_async(self, node: PipelineNode) -> None:
-        """run a node execution function, async version"""
+    async def _run_node(self, ctx: PipelineRunContext, node_index: int) -> Optional[int]:
+        node = self.node_map[self.node_ids[node_index]]
+        node_inputs = self._wrap_streaming_inputs(node_index, ctx.take_inputs(node_index))
+        streaming = self.streaming_nodes[node_index]
 
-        # TODO error handling
-        if asyncio.iscoroutinefunction(node.component.execute):
-            node_outputs = await node.component.execute(**node.input_data)
+        # streaming nodes are neither cached nor checkpointed, as their consumers take the partial outputs
+        resumable = ctx.run_id is not None and not streaming
+        input_hash = (
+            await stable_hash_async(node.component, node_inputs)
+            if (node.component.CACHEABLE or resumable) and not streaming
+            else None
+        )
+        node_outputs = None
+        if resumable and input_hash is not None:
+            checkpoint = await ctx.checkpoint_store.get(ctx.run_id, node.node_id)
+            if checkpoint is not None and checkpoint[0] == input_hash:
+                node_outputs = checkpoint[1]
+                ctx.checkpoint_hits += 1
+        restored = node_outputs is not None
+
+        cache_key = input_hash if node.component.CACHEABLE else None
+        if not restored and cache_key is not None:
+            node_outputs = await self.node_cache.get(cache_key)
+        cache_hit = not restored and node_outputs is not None
+        if cache_hit:
+            ctx.cache_hits += 1
+        if restored or cache_hit:
+            self._drop_speculation(ctx, node_index)
         else:
-            node_outputs = node.component.execute(**node.input_data)
+            node_outputs = await self._take_speculation(ctx, node_index, node_inputs)
+        if node_outputs is None:
+            node_timeout = node.component.EXECUTION_TIMEOUT or self.node_timeout
+            start_time = time.perf_counter()
+            try:
+                async with asyncio.timeout(node_timeout):
+                    if streaming:
+                        node_outputs = await self._run_streaming_node(ctx, node_index, node_inputs)
+                    else:
+                        node_outputs = await self.executor.execute(
+                            node.component, node_inputs, self._execution_class(node_index)
+                        )
+            finally:
+                self._abandon_streams(node_index, node_inputs)
+            self.scheduler.latency_stats.observe(node.component.__name__, time.perf_counter() - start_time)
+            if cache_key is not None:
+                ctx.cache_misses += 1
+                if self._is_cacheable_outputs(node.component, node_outputs):
+                    await self.node_cache.set(cache_key, node_outputs)
+        # released before the outputs are handed over, the upstream outputs are freed once all their readers are done
+        self._abandon_streams(node_index, node_inputs)
+        node_inputs = None
+        if resumable and input_hash is not None and not restored:
+            await ctx.checkpoint_store.set(ctx.run_id, node.node_id, input_hash, node_outputs)
+        # the caches and checkpoints keep the payloads, the downstream nodes and the events get the handles
+        node_outputs = await self._put_blobs(node_index, node_outputs)
+
+        output_bytes = estimate_size(node_outputs)
+        if ctx.trace is not None:
+            span = ctx.trace.spans[node_index]
+            span.cache_hit = cache_hit or restored
+            span.output_bytes = output_bytes
 
         # if is output node, yield output info
         # HINT!: this have to be set before putting process_info, because we use process_info to count remaining num
         if node.output_name is not None:
-            self.result_queue.put_nowait(
+            ctx.result_queue.put_nowait(
                 PipelineExecutionInfo(node.node_id, "output_info", {node.output_name: node_outputs})
             )
 
+        fused_index = self.fused_next[node_index]
+        if fused_index is not None and not ctx.selected[fused_index]:
+            fused_index = None
         # return current node result
-        self.result_queue.put_nowait(PipelineExecutionInfo(node.node_id, "process_info", node_outputs))
-
-        # trigger forward nodes
-        tasks = []
-        for connection in node.forward_node_info:
-            current_output = node_outputs[connection.from_node_output_name]
-            trigger_node = self.node_map[connection.to_node_id]
-            if trigger_node is None:
+        if ctx.report_process:
+            ctx.result_queue.put_nowait(PipelineExecutionInfo(node.node_id, "process_info", node_outputs))
+        elif fused_index is None:
+            ctx.result_queue.put_nowait(PipelineExecutionInfo(node.node_id, "process_info", {}))
+        else:
+            # unreported, the chain end still reports its process_info after this one is counted
+            ctx.remaining_num -= 1
+
+        # queue forward nodes, they are started by the scheduler
+        for connection, (from_node_output_name, to_index, to_node_input_name) in zip(
+            node.forward_node_info, self.forward_edges[node_index]
+        ):
+            if not ctx.selected[to_index]:
+                continue
+            if streaming and to_node_input_name in self.streaming_inputs[to_index]:
+                # already settled with a stream when the execution started
                 continue
+            if connection.is_taken(node_outputs):
+                ctx.set_input(to_index, to_node_input_name, node_outputs[from_node_output_name], node_index)
+            else:
+                ctx.skip_input(to_index, to_node_input_name)
+            if ctx.settle_input(to_index) and to_index != fused_index:
+                self._settle_node(ctx, to_index)
+        ctx.hold_outputs(node_index, output_bytes)
+        return fused_index
+
+    def _speculate(self, ctx: PipelineRunContext, node_index: int, kwargs: Dict[str, Any]) -> None:
+        """start a node with the fallback values of its speculative inputs, beside the injected ones"""
+        slots = ctx.input_data[node_index]
+        node_inputs = dict(slots) if slots is not None else dict.fromkeys(self.input_names[node_index])
+        for input_name, inject_name in self.speculative_inputs[node_index].items():
+            node_inputs[input_name] = kwargs.get(inject_name)
+        task = asyncio.create_task(self._run_speculation(ctx, node_index, node_inputs))
+        ctx.tasks.add(task)
+        task.add_done_callback(ctx.tasks.discard)
+        ctx.speculations[node_index] = (node_inputs, task)
+
+    async def _run_speculation(
+        self, ctx: PipelineRunContext, node_index: int, node_inputs: Dict[str, Any]
+    ) -> Union[Dict[str, Any], Exception]:
+        """execute a node with speculative inputs holding a scheduler slot, a failure is returned rather than raised"""
+        node = self.node_map[self.node_ids[node_index]]
+        try:
+            async with self._slot(node.component, ctx.priorities[node_index], ctx.principal, ctx):
+                async with asyncio.timeout(node.component.EXECUTION_TIMEOUT or self.node_timeout):
+                    return await self.executor.execute(node.component, node_inputs, self._execution_class(node_index))
+        except Exception as e:
+            return e
+
+    async def _take_speculation(
+        self, ctx: PipelineRunContext, node_index: int, node_inputs: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        the outputs of the speculative execution of a node if its component accepts the speculative inputs
+        for the actual ones, None if there is none or it is dropped
+        """
+        speculation = ctx.speculations.pop(node_index, None)
+        if speculation is None:
+            return None
+        speculative_inputs, task = speculation
+        component = self.node_map[self.node_ids[node_index]].component
+        if all(
+            component.accept_speculative(input_name, speculative_inputs[input_name], node_inputs.get(input_name))
+            for input_name in self.speculative_inputs[node_index]
+        ):
+            node_outputs = await task
+            if not isinstance(node_outputs, Exception):
+                ctx.speculation_hits += 1
+                return node_outputs
+        else:
+            task.cancel()
+        ctx.speculation_misses += 1
+        return None
+
+    @staticmethod
+    def _drop_speculation(ctx: PipelineRunContext, node_index: int) -> None:
+        speculation = ctx.speculations.pop(node_index, None)
+        if speculation is not None:
+            speculation[1].cancel()
+
+    async def _run_streaming_node(
+        self, ctx: PipelineRunContext, node_index: int, node_inputs: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        run a streaming node on the event loop, the streaming consumers are settled with a stream up front,
+        then each partial output is passed to them and reported as stream_info if it is an output node.
+        returns the merged outputs
+        """
+        node = self.node_map[self.node_ids[node_index]]
+        streams: List[Tuple[str, NodeStream]] = []
+        for from_node_output_name, to_index, to_node_input_name in self.forward_edges[node_index]:
+            if ctx.selected[to_index] and to_node_input_name in self.streaming_inputs[to_index]:
+                stream = NodeStream(PIPELINE_STREAM_QUEUE_SIZE)
+                streams.append((from_node_output_name, stream))
+                ctx.set_input(to_index, to_node_input_name, stream)
+                if ctx.settle_input(to_index):
+                    self._make_ready(ctx, to_index)
+
+        aggregator = StreamAggregator(self.output_types[node_index])
+        async for partial_outputs in node.component.execute(**node_inputs):
+            aggregator.add(partial_outputs)
+            if node.output_name is not None:
+                ctx.result_queue.put_nowait(
+                    PipelineExecutionInfo(node.node_id, "stream_info", {node.output_name: partial_outputs})
+                )
+            for from_node_output_name, stream in streams:
+                if from_node_output_name in partial_outputs:
+                    await stream.put(partial_outputs[from_node_output_name])
+        for _, stream in streams:
+            await stream.close()
+        return aggregator.outputs
+
+    def _abandon_streams(self, node_index: int, node_inputs: Optional[Dict[str, Any]]) -> None:
+        """
+        let the producers of the streams of a node go on once it is done with them or skipped,
+        the partial outputs it leaves unread are dropped rather than waiting for room forever
+        """
+        if node_inputs:
+            for input_name in self.streaming_inputs[node_index]:
+                stream = node_inputs.get(input_name)
+                if isinstance(stream, NodeStream):
+                    stream.abandon()
+
+    def _wrap_streaming_inputs(self, node_index: int, node_inputs: Dict[str, Any]) -> Dict[str, Any]:
+        """streaming inputs given a whole value, from a non-streaming node or injected, get a single value stream"""
+        for input_name in self.streaming_inputs[node_index]:
+            if not isinstance(node_inputs.get(input_name), NodeStream):
+                node_inputs[input_name] = NodeStream.of(node_inputs.get(input_name))
+        return node_inputs
+
+    def _execution_class(self, node_index: int) -> Optional[ComponentExecutionClass]:
+        """streams are bound to the event loop, so the nodes consuming them always run inline"""
+        return ComponentExecutionClass.INLINE if self.streaming_inputs[node_index] else None
+
+    @staticmethod
+    def _output_options(component: Type[RagnarokComponent]) -> Tuple[ComponentOutputTypeOption, ...]:
+        output_options = component.output_options()
+        # tolerate a component returning a single option rather than a tuple
+        if isinstance(output_options, dict):
+            return (output_options,)
+        return tuple(output_options)
+
+    async def run_batch(
+        self,
+        rows: Iterable[Dict[str, Any]],
+        *,
+        batch_size: int = PIPELINE_BATCH_SIZE,
+        outputs: Optional[Iterable[str]] = None,
+        principal: Optional[str] = None,
+    ) -> AsyncGenerator[PipelineBatchResult, None]:
+        """
+        execute the pipeline over many input sets, each row maps the inject names to values like run_async kwargs.
+        rows are run in micro batches of batch_size, node by node in topological order,
+        so a batch supported component is executed once per micro batch instead of once per row.
+        results are yielded in row order as each micro batch finishes, a failed node only fails its own row.
+        given the output names, only the nodes they depend on are run, within the node budget of the principal if any
+        """
+        selected = self.select_nodes(outputs)
+        rows = iter(rows)
+        row_offset = 0
+        while True:
+            batch_rows = list(itertools.islice(rows, batch_size))
+            if not batch_rows:
+                return
+            for result in await self._run_micro_batch(batch_rows, row_offset, selected, principal):
+                yield result
+            row_offset += len(batch_rows)
+
+    async def _run_micro_batch(
+        self,
+        batch_rows: List[Dict[str, Any]],
+        row_offset: int,
+        selected: Tuple[bool, ...],
+        principal: Optional[str] = None,
+    ) -> List[PipelineBatchResult]:
+        """run one micro batch through the whole graph"""
+        results = [PipelineBatchResult(row_offset + row_index, {}) for row_index in range(len(batch_rows))]
+        # row -> node -> input values, and the upstream inputs each node still waits for
+        input_data: List[List[Dict[str, Any]]] = [[{} for _ in self.node_ids] for _ in batch_rows]
+        waiting_num = [list(self.in_degrees) for _ in batch_rows]
+        skipped_inputs: List[List[Optional[Dict[str, int]]]] = [[None for _ in self.node_ids] for _ in batch_rows]
+        for row_index, row in enumerate(batch_rows):
+            for inject_name, (node_id, node_input_name) in self.inject_input_mapping.items():
+                input_data[row_index][self.node_index[node_id]][node_input_name] = row.get(inject_name)
+
+        priorities = self.remaining_paths()
+        # key of the micro batch in the node scheduler, its nodes take turns with those of the other runs
+        run = object()
+        for node_index in self.topological_order:
+            if not selected[node_index]:
+                continue
+            row_indexes = [
+                row_index
+                for row_index in range(len(batch_rows))
+                if results[row_index].error is None and waiting_num[row_index][node_index] <= 0
+            ]
+            node = self.node_map[self.node_ids[node_index]]
+            skipped_rows = {
+                row_index
+                for row_index in row_indexes
+                if self._is_skipped(node_index, skipped_inputs[row_index][node_index])
+            }
+            for row_index in skipped_rows:
+                input_data[row_index][node_index] = None
+                for _, to_index, to_node_input_name in self.forward_edges[node_index]:
+                    self._skip_batch_input(skipped_inputs[row_index], to_index, to_node_input_name)
+                    waiting_num[row_index][to_index] -= 1
+            row_indexes = [row_index for row_index in row_indexes if row_index not in skipped_rows]
+            if not row_indexes:
+                continue
+
+            inputs_list = []
+            for row_index in row_indexes:
+                node_inputs = input_data[row_index][node_index]
+                inputs_list.append(
+                    self._wrap_streaming_inputs(
+                        node_index, {name: node_inputs.get(name) for name in self.input_names[node_index]}
+                    )
+                )
+                input_data[row_index][node_index] = None
+
+            outputs_list = await self._execute_batch(node, inputs_list, priorities[node_index], principal, run)
+            for row_index, node_outputs in zip(row_indexes, outputs_list):
+                if isinstance(node_outputs, Exception):
+                    logger.warning(
+                        f"pipeline node {node.node_id} failed on row {row_offset + row_index}: {node_outputs!r}"
+                    )
+                    if isinstance(node_outputs, TimeoutError):
+                        results[row_index].error = f"node {node.node_id} timed out"
+                    else:
+                        results[row_index].error = f"node {node.node_id} failed: {node_outputs}"
+                    # the row runs no further, the outputs written into its inputs are freed at once
+                    input_data[row_index] = [None] * len(self.node_ids)
+                    continue
+                node_outputs = await self._put_blobs(node_index, node_outputs)
+                if node.output_name is not None:
+                    results[row_index].outputs[node.output_name] = node_outputs
+                for connection, (from_node_output_name, to_index, to_node_input_name) in zip(
+                    node.forward_node_info, self.forward_edges[node_index]
+                ):
+                    if not selected[to_index]:
+                        continue
+                    if connection.is_taken(node_outputs):
+                        input_data[row_index][to_index][to_node_input_name] = node_outputs[from_node_output_name]
+                    else:
+                        self._skip_batch_input(skipped_inputs[row_index], to_index, to_node_input_name)
+                    waiting_num[row_index][to_index] -= 1
+        return results
+
+    @staticmethod
+    def _skip_batch_input(row_skipped_inputs: List[Optional[Dict[str, int]]], node_index: int, input_name: str) -> None:
+        skipped = row_skipped_inputs[node_index]
+        if skipped is None:
+            skipped = row_skipped_inputs[node_index] = {}
+        skipped[input_name] = skipped.get(input_name, 0) + 1
+
+    async def _execute_batch(
+        self,
+        node: PipelineNode,
+        inputs_list: List[Dict[str, Any]],
+        priority: float,
+        principal: Optional[str] = None,
+        run: Any = None,
+    ) -> List[Dict[str, Any] | Exception]:
+        """execute a node over many input sets, returns the outputs or the raised exception of each input set"""
+        component = node.component
+        if not component.CACHEABLE:
+            return await self._execute_batch_uncached(node, inputs_list, priority, principal, run)
+
+        cache_keys = [await stable_hash_async(component, node_inputs) for node_inputs in inputs_list]
+        outputs_list: List[Any] = [
+            await self.node_cache.get(cache_key) if cache_key is not None else None for cache_key in cache_keys
+        ]
+        missed_indexes = [index for index, node_outputs in enumerate(outputs_list) if node_outputs is None]
+        if missed_indexes:
+            missed_outputs_list = await self._execute_batch_uncached(
+                node, [inputs_list[index] for index in missed_indexes], priority, principal, run
+            )
+            for index, node_outputs in zip(missed_indexes, missed_outputs_list):
+                outputs_list[index] = node_outputs
+                if cache_keys[index] is not None and self._is_cacheable_outputs(component, node_outputs):
+                    await self.node_cache.set(cache_keys[index], node_outputs)
+        return outputs_list
+
+    async def _execute_batch_uncached(
+        self,
+        node: PipelineNode,
+        inputs_list: List[Dict[str, Any]],
+        priority: float,
+        principal: Optional[str] = None,
+        run: Any = None,
+    ) -> List[Dict[str, Any] | Exception]:
+        component = node.component
+        node_index = self.node_index[node.node_id]
+        node_timeout = component.EXECUTION_TIMEOUT or self.node_timeout
+
+        if component.SUPPORT_BATCH and not self.streaming_nodes[node_index]:
+            try:
+                async with self._slot(component, priority, principal, run):
+                    start_time = time.perf_counter()
+                    async with asyncio.timeout(node_timeout):
+                        outputs_list = await self.executor.execute_batch(component, inputs_list)
+                    self.scheduler.latency_stats.observe(
+                        component.__name__, (time.perf_counter() - start_time) / len(inputs_list)
+                    )
+            except Exception as e:
+                return [e] * len(inputs_list)
+            if len(outputs_list) != len(inputs_list):
+                error = ValueError(
+                    f"{component.__name__} returned {len(outputs_list)} outputs for {len(inputs_list)} inputs"
+                )
+                return [error] * len(inputs_list)
+            return outputs_list
+
+        # fall back to one execution per input set, bounded like the nodes of a single run
+        semaphore = asyncio.Semaphore(self.scheduler.max_concurrency_per_run)
+
+        async def execute_one(node_inputs: Dict[str, Any]) -> Dict[str, Any]:
+            async with semaphore, self._slot(component, priority, principal, run):
+                async with asyncio.timeout(node_timeout):
+                    if self.streaming_nodes[node_index]:
+                        # no consumer runs alongside in a batched run, the partial outputs are just merged
+                        return await StreamAggregator(self.output_types[node_index]).drain(
+                            component.execute(**node_inputs)
+                        )
+                    return await self.executor.execute(component, node_inputs, self._execution_class(node_index))
 
-            trigger_node.input_data[connection.to_node_input_name] = current_output
-            trigger_node.waiting_num -= 1
-            if trigger_node.waiting_num == 0:
-                task = asyncio.create_task(self.run_node_async(trigger_node))
-                tasks.append(task)
+        return await asyncio.gather(*(execute_one(node_inputs) for node_inputs in inputs_list), return_exceptions=True)
 
-        await asyncio.gather(*tasks)
+    @asynccontextmanager
+    async def _slot(
+        self, component: Type[RagnarokComponent], priority: float, principal: Optional[str], run: Any = None
+    ) -> AsyncIterator[None]:
+        """run the block as the principal, holding a process-wide slot unless the component is unscheduled"""
+        token = current_principal.set(principal)
+        try:
+            if not component.SCHEDULED:
+                yield
+                return
+            await self.scheduler.acquire(priority, principal, run)
+            try:
+                yield
+            finally:
+                self.scheduler.release(principal)
+        finally:
+            current_principal.reset(token)
+
+    async def _put_blobs(self, node_index: int, node_outputs: Dict[str, Any]) -> Dict[str, Any]:
+        """replace the payloads of the BLOB outputs by their handles, the outputs are copied if any is replaced"""
+        blob_outputs = self.blob_outputs[node_index]
+        if not blob_outputs or not isinstance(node_outputs, dict):
+            return node_outputs
+        node_outputs = dict(node_outputs)
+        for name, is_list in blob_outputs:
+            value = node_outputs.get(name)
+            if value is None:
+                continue
+            if is_list:
+                node_outputs[name] = [await self.blob_store.put(item) for item in value]
+            else:
+                node_outputs[name] = await self.blob_store.put(value)
+        return node_outputs
+
+    @staticmethod
+    def _is_cacheable_outputs(component: Type[RagnarokComponent], node_outputs: Any) -> bool:
+        """outputs beyond the declared output options, like an error report, are never cached"""
+        if not isinstance(node_outputs, dict):
+            return False
+        return set(node_outputs).issubset(
+            output_option["name"] for output_option in PipelineEntity._output_options(component)
+        )
 
     @classmethod
-    def from_json_str(cls, json_str: str) -> "PipelineEntity":
-        """instantiate a pipeline entity from a json format string"""
+    def from_json_str(cls, json_str: str, **kwargs: Any) -> "PipelineEntity":
+        """
+        instantiate a pipeline entity from a json format string, the graph is validated up front.
+        the kwargs, like a scheduler, are passed to the constructor
+        """
         data = json.loads(json_str)
         if not all(key in data for key in ["nodes", "connections", "inject_input_mapping"]):
             raise ValueError("Invalid JSON format: missing required fields")
 
+        node_ids = set()
+        for node_data in data["nodes"]:
+            if node_data["node_id"] in node_ids:
+                raise InvalidPipelineError(f"duplicate node id {node_data['node_id']}")
+            node_ids.add(node_data["node_id"])
+
+        # index the connections by their source node in one pass
+        forward_connections: Dict[str, List[PipelineNode.NodeConnection]] = {}
+        for conn in data["connections"]:
+            for node_id in (conn["from_node_id"], conn["to_node_id"]):
+                if node_id not in node_ids:
+                    raise InvalidPipelineError(f"connection refers to a missing node {node_id}")
+            condition = conn.get("condition") or {}
+            speculative = conn.get("speculative") or {}
+            forward_connections.setdefault(conn["from_node_id"], []).append(
+                PipelineNode.NodeConnection(
+                    from_node_id=conn["from_node_id"],
+                    from_node_output_name=conn["from_output_name"],
+                    to_node_id=conn["to_node_id"],
+                    to_node_input_name=conn["to_node_input_name"],
+                    condition_output_name=condition.get("output_name"),
+                    condition_value=condition.get("value"),
+                    speculative_fallback=speculative.get("fallback"),
+                )
+            )
+
         # Build node map
         node_map = {}
         for node_data in data["nodes"]:
             if node_data["component"] == "Str":
                 node_data["component"] = "StrComponent"
-            component = component_manager.get_component_by_name(node_data["component"]).component_class
-            if component is None:
-                raise ValueError(f"Component {node_data['component']} not found")
-
-            forward_connections = []
-            for conn in data["connections"]:
-                if conn["from_node_id"] == node_data["node_id"]:
-                    forward_connections.append(
-                        PipelineNode.NodeConnection(
-                            from_node_id=conn["from_node_id"],
-                            from_node_output_name=conn["from_output_name"],
-                            to_node_id=conn["to_node_id"],
-                            to_node_input_name=conn["to_node_input_name"],
-                        )
-                    )
+            component_info = component_manager.get_component_by_name(node_data["component"])
+            if component_info is None:
+                raise InvalidPipelineError(
+                    f"component {node_data['component']} of node {node_data['node_id']} not found"
+                )
 
             node = PipelineNode(
                 node_id=node_data["node_id"],
-                component=component,
-                forward_node_info=tuple(forward_connections),
+                component=component_info.component_class,
+                forward_node_info=tuple(forward_connections.get(node_data["node_id"], ())),
                 pos=node_data["position"],
                 output_name=node_data.get("output_name"),
             )
             node_map[node_data["node_id"]] = node
 
-        return cls(node_map=node_map, inject_input_mapping=data["inject_input_mapping"])
+        return cls(
+            node_map=node_map,
+            inject_input_mapping=data["inject_input_mapping"],
+            cache_results=bool(data.get("cache_results", False)),
+            **kwargs,
+        )
 
     def to_json_str(self) -> str:
         """convert to json format"""
         nodes: List[Dict[str, Any]] = []
-        connections: List[Dict[str, str]] = []
+        connections: List[Dict[str, Any]] = []
         for node_id, pipeline_node in self.node_map.items():
             node: Dict[str, Any] = {
                 "node_id": node_id,
@@ -166,14 +1237,29 @@ class PipelineEntity:
                 node["output_name"] = pipeline_node.output_name
             nodes.append(node)
             for forward_node_info in pipeline_node.forward_node_info:
-                connections.append(
-                    {
-                        "from_node_id": forward_node_info.from_node_id,
-                        "from_output_name": forward_node_info.from_node_output_name,
-                        "to_node_id": forward_node_info.to_node_id,
-                        "to_node_input_name": forward_node_info.to_node_input_name,
+                connection: Dict[str, Any] = {
+                    "from_node_id": forward_node_info.from_node_id,
+                    "from_output_name": forward_node_info.from_node_output_name,
+                    "to_node_id": forward_node_info.to_node_id,
+                    "to_node_input_name": forward_node_info.to_node_input_name,
+                }
+                if forward_node_info.condition_output_name is not None:
+                    connection["condition"] = {
+                        "output_name": forward_node_info.condition_output_name,
+                        "value": forward_node_info.condition_value,
                     }
-                )
+                if forward_node_info.speculative_fallback is not None:
+                    connection["speculative"] = {"fallback": forward_node_info.speculative_fallback}
+                connections.append(connection)
 
         res = {"nodes": nodes, "connections": connections, "inject_input_mapping": self.inject_input_mapping}
+        if self.cache_results:
+            res["cache_results"] = True
         return json.dumps(res)
+
+
+# the keyword options of run_async, an inject name taking one of them would be read as the option
+RESERVED_INJECT_NAMES: FrozenSet[str] = frozenset(inspect.signature(PipelineEntity.run_async).parameters) - {
+    "args",
+    "kwargs",
+}
@@ -0,0 +1,114 @@
+import base64
+import itertools
+import json
+from enum import StrEnum
+from typing import Any, Tuple, Union
+
+from ragnarok_toolkit.blob import BlobRef
+from ragnarok_toolkit.config import (
+    PIPELINE_EVENT_SUMMARY_CHARS,
+    PIPELINE_EVENT_SUMMARY_ITEMS,
+)
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+class EventVerbosity(StrEnum):
+    """how much node data the events of a run carry"""
+
+    # the outputs of the output nodes only, process_info is not reported
+    OUTPUTS = "outputs"
+    # process_info carries a size bounded summary of the node outputs
+    SUMMARY = "summary"
+    # process_info carries the whole node outputs
+    FULL = "full"
+
+
+class EventEncoding(StrEnum):
+    """wire format of the events, JSON and ORJSON encode to str, MSGPACK to bytes"""
+
+    JSON = "json"
+    ORJSON = "orjson"
+    MSGPACK = "msgpack"
+
+
+def available_encodings() -> Tuple[EventEncoding, ...]:
+    """the encodings whose library is installed"""
+    return tuple(
+        encoding
+        for encoding, module in (
+            (EventEncoding.JSON, json),
+            (EventEncoding.ORJSON, orjson),
+            (EventEncoding.MSGPACK, msgpack),
+        )
+        if module is not None
+    )
+
+
+def summarize(
+    value: Any, max_items: int = PIPELINE_EVENT_SUMMARY_ITEMS, max_chars: int = PIPELINE_EVENT_SUMMARY_CHARS
+) -> Any:
+    """
+    size bounded view of a node data, long strings are cut, lists and dicts keep their first max_items
+    with a marker of what is left out, and bytes are replaced by their length. only the kept part is copied
+    """
+    if isinstance(value, BlobRef):
+        return value.to_dict()
+    if isinstance(value, str):
+        if len(value) <= max_chars:
+            return value
+        return f"{value[:max_chars]}...(+{len(value) - max_chars} chars)"
+    if isinstance(value, (bytes, bytearray)):
+        return f"<{len(value)} bytes>"
+    if isinstance(value, dict):
+        summary = {
+            key: summarize(item, max_items, max_chars) for key, item in itertools.islice(value.items(), max_items)
+        }
+        if len(value) > max_items:
+            summary["..."] = f"+{len(value) - max_items} keys"
+        return summary
+    if isinstance(value, (list, tuple)):
+        summary = [summarize(item, max_items, max_chars) for item in itertools.islice(value, max_items)]
+        if len(value) > max_items:
+            summary.append(f"...(+{len(value) - max_items} items)")
+        return summary
+    return value
+
+
+def _default(value: Any) -> Any:
+    """fallback of the json encoders for the values they do not support natively"""
+    # a blob is reported by its size, never by its payload
+    if isinstance(value, BlobRef):
+        return value.to_dict()
+    # bytes are always tagged base64, so they never read as a str, msgpack packs them natively as bin
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return {"__bytes__": base64.b64encode(value).decode("ascii")}
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    # numpy arrays and scalars
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    raise TypeError(f"object of type {type(value).__name__} is not serializable")
+
+
+def encode(value: Any, encoding: EventEncoding = EventEncoding.JSON) -> Union[str, bytes]:
+    """serialize an event dict, the values are read in place rather than copied"""
+    if encoding == EventEncoding.JSON:
+        return json.dumps(value, default=_default)
+    if encoding == EventEncoding.ORJSON:
+        if orjson is None:
+            raise ValueError("orjson is not installed")
+        return orjson.dumps(value, default=_default, option=orjson.OPT_SERIALIZE_NUMPY).decode("utf-8")
+    if encoding == EventEncoding.MSGPACK:
+        if msgpack is None:
+            raise ValueError("msgpack is not installed")
+        return msgpack.packb(value, default=_default)
+    raise ValueError(f"unknown encoding {encoding}")
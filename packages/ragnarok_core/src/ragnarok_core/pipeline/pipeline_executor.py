@@ -0,0 +1,132 @@
+import asyncio
+import contextvars
+import functools
+import logging
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Type
+
+from ragnarok_toolkit.component import ComponentExecutionClass, RagnarokComponent
+from ragnarok_toolkit.config import (
+    PIPELINE_PROCESS_BACKEND,
+    PIPELINE_PROCESS_POOL_SIZE,
+    PIPELINE_THREAD_POOL_SIZE,
+)
+
+if TYPE_CHECKING:
+    from ragnarok_core.pipeline.pipeline_worker import WorkerPool
+
+logger = logging.getLogger(__name__)
+
+
+def run_component(component: Type[RagnarokComponent], inputs: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    run the execute function of a component to completion in the current thread,
+    an async function gets an event loop of its own
+    """
+    if asyncio.iscoroutinefunction(component.execute):
+        return asyncio.run(component.execute(**inputs))
+    return component.execute(**inputs)
+
+
+def run_component_batch(component: Type[RagnarokComponent], inputs_list: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """run the execute_batch function of a component to completion in the current thread"""
+    if asyncio.iscoroutinefunction(component.execute_batch):
+        return asyncio.run(component.execute_batch(inputs_list))
+    return component.execute_batch(inputs_list)
+
+
+class ComponentExecutor:
+    """
+    dispatch component executions by the declared execution class, should be used as a singleton.
+    the pools are created on first use. the PROCESS execution class runs either in a ProcessPoolExecutor
+    (process_backend "pool") or in a WorkerPool passing the large payloads by shared memory ("workers")
+    """
+
+    def __init__(
+        self,
+        *,
+        thread_pool_size: int = PIPELINE_THREAD_POOL_SIZE,
+        process_pool_size: int = PIPELINE_PROCESS_POOL_SIZE,
+        process_backend: str = PIPELINE_PROCESS_BACKEND,
+    ) -> None:
+        if process_backend not in ("pool", "workers"):
+            raise ValueError(f"unknown process backend {process_backend}")
+        self.thread_pool_size = thread_pool_size
+        self.process_pool_size = process_pool_size
+        self.process_backend = process_backend
+        self.thread_pool: Optional[ThreadPoolExecutor] = None
+        self.process_pool: Optional[ProcessPoolExecutor] = None
+        self.worker_pool: Optional["WorkerPool"] = None
+
+    def get_pool(self, execution_class: ComponentExecutionClass) -> Executor:
+        if execution_class == ComponentExecutionClass.PROCESS:
+            if self.process_pool is None:
+                self.process_pool = ProcessPoolExecutor(max_workers=self.process_pool_size)
+            return self.process_pool
+
+        if self.thread_pool is None:
+            self.thread_pool = ThreadPoolExecutor(
+                max_workers=self.thread_pool_size, thread_name_prefix="ragnarok-component"
+            )
+        return self.thread_pool
+
+    def get_worker_pool(self) -> "WorkerPool":
+        if self.worker_pool is None:
+            # imported here as the worker module runs the components by the functions of this one
+            from ragnarok_core.pipeline.pipeline_worker import WorkerPool
+
+            self.worker_pool = WorkerPool(self.process_pool_size)
+        return self.worker_pool
+
+    async def execute(
+        self,
+        component: Type[RagnarokComponent],
+        inputs: Dict[str, Any],
+        execution_class: Optional[ComponentExecutionClass] = None,
+    ) -> Dict[str, Any]:
+        """execute a component, offloaded to a pool unless its execution class (or the override) is inline"""
+        execution_class = execution_class or component.EXECUTION_CLASS
+        if execution_class == ComponentExecutionClass.INLINE:
+            if asyncio.iscoroutinefunction(component.execute):
+                return await component.execute(**inputs)
+            return component.execute(**inputs)
+        if execution_class == ComponentExecutionClass.PROCESS and self.process_backend == "workers":
+            return await self.get_worker_pool().execute(component, inputs)
+
+        return await self.run_in_pool(execution_class, run_component, component, inputs)
+
+    async def execute_batch(
+        self, component: Type[RagnarokComponent], inputs_list: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """execute a batch supported component over many input sets in one call, dispatched like execute"""
+        execution_class = component.EXECUTION_CLASS
+        if execution_class == ComponentExecutionClass.INLINE:
+            if asyncio.iscoroutinefunction(component.execute_batch):
+                return await component.execute_batch(inputs_list)
+            return component.execute_batch(inputs_list)
+        if execution_class == ComponentExecutionClass.PROCESS and self.process_backend == "workers":
+            return await self.get_worker_pool().execute(component, inputs_list, batch=True)
+
+        return await self.run_in_pool(execution_class, run_component_batch, component, inputs_list)
+
+    async def run_in_pool(self, execution_class: ComponentExecutionClass, func, *args) -> Any:
+        """run a function in the pool of the execution class, threads see the context variables of the caller"""
+        loop = asyncio.get_running_loop()
+        if execution_class == ComponentExecutionClass.THREAD:
+            func = functools.partial(contextvars.copy_context().run, func)
+        return await loop.run_in_executor(self.get_pool(execution_class), func, *args)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """release the pools, they would be recreated if used again"""
+        if self.thread_pool is not None:
+            self.thread_pool.shutdown(wait=wait)
+            self.thread_pool = None
+        if self.process_pool is not None:
+            self.process_pool.shutdown(wait=wait)
+            self.process_pool = None
+        if self.worker_pool is not None:
+            self.worker_pool.shutdown(wait=wait)
+            self.worker_pool = None
+
+
+component_executor = ComponentExecutor()
@@ -0,0 +1,237 @@
+import asyncio
+import logging
+import time
+import uuid
+from collections import deque
+from contextlib import aclosing
+from enum import StrEnum
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncGenerator,
+    Deque,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+)
+
+from ragnarok_toolkit.config import (
+    PIPELINE_JOB_BUFFER_SIZE,
+    PIPELINE_JOB_TTL,
+    PIPELINE_JOB_WORKERS,
+)
+
+if TYPE_CHECKING:
+    from ragnarok_core.pipeline.pipeline_entity import PipelineExecutionInfo
+
+logger = logging.getLogger(__name__)
+
+
+class JobStatus(StrEnum):
+    PENDING = "pending"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+    @property
+    def finished(self) -> bool:
+        return self not in (JobStatus.PENDING, JobStatus.RUNNING)
+
+
+class EventRingBuffer:
+    """the last capacity events of a job, addressed by their offset in the whole event sequence of the job"""
+
+    def __init__(self, capacity: int) -> None:
+        self.events: Deque["PipelineExecutionInfo"] = deque(maxlen=capacity)
+        # offset of the next event
+        self.end_offset = 0
+
+    @property
+    def start_offset(self) -> int:
+        """offset of the oldest event kept, the older ones are dropped"""
+        return self.end_offset - len(self.events)
+
+    def append(self, event: "PipelineExecutionInfo") -> None:
+        self.events.append(event)
+        self.end_offset += 1
+
+    def read(self, offset: int) -> List[Tuple[int, "PipelineExecutionInfo"]]:
+        """the events kept from the offset on, with their offsets"""
+        start_offset = self.start_offset
+        offset = max(offset, start_offset)
+        return [(index, self.events[index - start_offset]) for index in range(offset, self.end_offset)]
+
+
+class PipelineJob:
+    """
+    a pipeline run detached from any request, its events are kept in a ring buffer,
+    from which any num of readers follow the run from an offset of their own
+    """
+
+    def __init__(
+        self,
+        job_id: str,
+        events: AsyncGenerator["PipelineExecutionInfo", None],
+        buffer_size: int,
+        principal: Optional[str] = None,
+    ) -> None:
+        self.job_id = job_id
+        # key of the principal who submitted the job, only it could read or cancel the job
+        self.principal = principal
+        # the events of the run, iterated by a worker of the job manager
+        self.source = events
+        self.status = JobStatus.PENDING
+        self.error: Optional[str] = None
+        self.buffer = EventRingBuffer(buffer_size)
+        # notified on each new event and on the end of the job
+        self.changed = asyncio.Condition()
+        self.task: Optional[asyncio.Task] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    async def run(self) -> None:
+        """iterate the run into the ring buffer, a failed run fails the job rather than raising"""
+        if self.status != JobStatus.PENDING:
+            return
+        self.status = JobStatus.RUNNING
+        self.started_at = time.time()
+        status, error = JobStatus.SUCCEEDED, None
+        try:
+            async with aclosing(self.source) as events:
+                async for event in events:
+                    if event.type == "error_info":
+                        status, error = JobStatus.FAILED, event.data.get("error")
+                    async with self.changed:
+                        self.buffer.append(event)
+                        self.changed.notify_all()
+        except asyncio.CancelledError:
+            status = JobStatus.CANCELLED
+        except Exception as e:
+            logger.warning(f"pipeline job {self.job_id} failed: {e!r}")
+            status, error = JobStatus.FAILED, f"{type(e).__name__}: {e}"
+        await self._finish(status, error)
+
+    async def cancel(self) -> None:
+        if self.status == JobStatus.PENDING:
+            await self.source.aclose()
+            await self._finish(JobStatus.CANCELLED, None)
+        elif self.status == JobStatus.RUNNING and self.task is not None:
+            self.task.cancel()
+
+    async def _finish(self, status: JobStatus, error: Optional[str]) -> None:
+        async with self.changed:
+            self.status = status
+            self.error = error
+            self.finished_at = time.time()
+            self.changed.notify_all()
+
+    async def events(self, offset: int = 0) -> AsyncGenerator[Tuple[int, "PipelineExecutionInfo"], None]:
+        """
+        the events of the job from the offset on, with their offsets, waiting for the new ones until the job ends.
+        the events dropped from the ring buffer are skipped
+        """
+        while True:
+            async with self.changed:
+                await self.changed.wait_for(lambda: self.buffer.end_offset > offset or self.status.finished)
+                entries = self.buffer.read(offset)
+                finished = self.status.finished
+            for entry in entries:
+                yield entry
+            if entries:
+                offset = entries[-1][0] + 1
+            if finished and offset >= self.buffer.end_offset:
+                return
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "error": self.error,
+            "start_offset": self.buffer.start_offset,
+            "end_offset": self.buffer.end_offset,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class PipelineJobManager:
+    """
+    process-wide registry of the pipeline jobs, should be used as a singleton.
+    the jobs are run by a fixed num of worker tasks in submission order, started on first submission.
+    finished jobs are forgotten after ttl seconds
+    """
+
+    def __init__(
+        self,
+        worker_num: int = PIPELINE_JOB_WORKERS,
+        buffer_size: int = PIPELINE_JOB_BUFFER_SIZE,
+        ttl: float = PIPELINE_JOB_TTL,
+    ) -> None:
+        self.worker_num = worker_num
+        self.buffer_size = buffer_size
+        self.ttl = ttl
+        self.jobs: Dict[str, PipelineJob] = {}
+        self.queue: Optional[asyncio.Queue[PipelineJob]] = None
+        self.workers: List[asyncio.Task] = []
+
+    def submit(
+        self, events: AsyncGenerator["PipelineExecutionInfo", None], principal: Optional[str] = None
+    ) -> PipelineJob:
+        """queue the run of the given events as a new job of the principal"""
+        self._evict()
+        if not self.workers:
+            self.queue = asyncio.Queue()
+            self.workers = [asyncio.create_task(self._work()) for _ in range(self.worker_num)]
+        job = PipelineJob(uuid.uuid4().hex, events, self.buffer_size, principal)
+        self.jobs[job.job_id] = job
+        self.queue.put_nowait(job)
+        return job
+
+    def get(self, job_id: str, principal: Optional[str] = None) -> Optional[PipelineJob]:
+        """the job, None if there is none or, given a principal, if the job was submitted by another one"""
+        job = self.jobs.get(job_id)
+        if job is None or (principal is not None and job.principal != principal):
+            return None
+        return job
+
+    async def cancel(self, job_id: str, principal: Optional[str] = None) -> bool:
+        job = self.get(job_id, principal)
+        if job is None:
+            return False
+        await job.cancel()
+        return True
+
+    async def _work(self) -> None:
+        while True:
+            job = await self.queue.get()
+            if job.status != JobStatus.PENDING:
+                continue
+            # a task of its own, so that cancelling the job leaves the worker running
+            job.task = asyncio.create_task(job.run())
+            await asyncio.wait((job.task,))
+
+    def _evict(self) -> None:
+        deadline = time.time() - self.ttl
+        expired = [
+            job_id
+            for job_id, job in self.jobs.items()
+            if job.status.finished and job.finished_at is not None and job.finished_at < deadline
+        ]
+        for job_id in expired:
+            del self.jobs[job_id]
+
+    async def shutdown(self) -> None:
+        """cancel the unfinished jobs and stop the workers"""
+        for job in list(self.jobs.values()):
+            await job.cancel()
+        workers, self.workers = self.workers, []
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, *(job.task for job in self.jobs.values() if job.task), return_exceptions=True)
+
+
+job_manager = PipelineJobManager()
@@ -1,13 +1,13 @@
 from dataclasses import dataclass
-from typing import Optional, Tuple, Type, TypedDict
+from typing import Any, Dict, Optional, Tuple, Type, TypedDict
 
 from ragnarok_toolkit.component import RagnarokComponent
 
 
 class PipelineNode:
-    """pipeline node structured metadata"""
+    """pipeline node structured metadata, immutable once the pipeline is built"""
 
-    @dataclass
+    @dataclass(frozen=True)
     class NodeConnection:
         """encapsulate the forward node info"""
 
@@ -15,6 +15,16 @@ class PipelineNode:
         from_node_output_name: str
         to_node_id: str
         to_node_input_name: str
+        # a conditional connection is only taken if the from node output of this name equals condition_value,
+        # otherwise the input is skipped
+        condition_output_name: Optional[str] = None
+        condition_value: Any = None
+        # inject name of the fallback value of a speculative connection, the to node may start with it
+        # before the from node is done, and keeps that result if its component accepts the fallback
+        speculative_fallback: Optional[str] = None
+
+        def is_taken(self, outputs: Dict[str, Any]) -> bool:
+            return self.condition_output_name is None or outputs.get(self.condition_output_name) == self.condition_value
 
     class NodePosition(TypedDict):
         x: float
@@ -26,7 +36,7 @@ class PipelineNode:
         node_id: str,
         component: Type[RagnarokComponent],
         forward_node_info: Tuple[NodeConnection, ...],
-        pos: NodePosition=None,
+        pos: Optional[NodePosition] = None,
         output_name: Optional[str] = None,
     ) -> None:
         # each node in one pipeline has a unique id
@@ -39,9 +49,3 @@ class PipelineNode:
         self.forward_node_info = forward_node_info
         # frontend use
         self.pos = pos
-        # input data, originally None
-        self.input_data = {
-            param: None for param in [input_option["name"] for input_option in component.input_options()]
-        }
-        # num of the unprepared input data
-        self.waiting_num = 0
@@ -0,0 +1,157 @@
+import asyncio
+import heapq
+import itertools
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from ragnarok_toolkit.config import (
+    PIPELINE_MAX_CONCURRENCY,
+    PIPELINE_PRINCIPAL_MAX_NODES,
+    PIPELINE_RUN_MAX_CONCURRENCY,
+)
+
+
+class ComponentLatencyStats:
+    """
+    historical execution latency of each component,
+    kept as an exponentially weighted moving average in seconds
+    """
+
+    def __init__(self, *, alpha: float = 0.2, default_latency: float = 0.01) -> None:
+        self.alpha = alpha
+        # latency estimation of the component never observed
+        self.default_latency = default_latency
+        # component name -> moving average latency
+        self.latencies: Dict[str, float] = {}
+
+    def observe(self, component_name: str, latency: float) -> None:
+        previous = self.latencies.get(component_name)
+        if previous is None:
+            self.latencies[component_name] = latency
+        else:
+            self.latencies[component_name] = previous + self.alpha * (latency - previous)
+
+    def estimate(self, component_name: str) -> float:
+        return self.latencies.get(component_name, self.default_latency)
+
+
+class NodeScheduler:
+    """
+    process-wide limiter of concurrently executing pipeline nodes, should be used as a singleton.
+    when slots are short, the runs with waiting nodes are granted in turn, so a large run does not starve
+    the short ones, and within a run the waiting node with the longest remaining path is granted first.
+    a run whose principal is over its budget of in-flight nodes is passed over
+    """
+
+    def __init__(
+        self,
+        *,
+        max_concurrency: int = PIPELINE_MAX_CONCURRENCY,
+        max_concurrency_per_run: int = PIPELINE_RUN_MAX_CONCURRENCY,
+        max_concurrency_per_principal: int = PIPELINE_PRINCIPAL_MAX_NODES,
+    ) -> None:
+        # max num of the nodes executing at the same time, across all the runs
+        self.max_concurrency = max_concurrency
+        # max num of the nodes executing at the same time, in one run
+        self.max_concurrency_per_run = max_concurrency_per_run
+        # max num of the nodes executing at the same time, across all the runs of one principal, 0 means unlimited
+        self.max_concurrency_per_principal = max_concurrency_per_principal
+        self.latency_stats = ComponentLatencyStats()
+        # num of the granted slots
+        self.running_num = 0
+        # num of the granted slots of each principal with any
+        self.principal_running: Dict[str, int] = {}
+        # run key -> waiting heap of (-priority, seq, principal, future),
+        # the remaining paths are only compared within a run, they say nothing across runs
+        self.waiters: Dict[Any, List[Tuple[float, int, Optional[str], asyncio.Future]]] = {}
+        # keys of the runs with waiters, in the order of their next turn
+        self.turns: Deque[Any] = deque()
+        self.counter = itertools.count()
+
+    def _within_budget(self, principal: Optional[str]) -> bool:
+        return (
+            principal is None
+            or not self.max_concurrency_per_principal
+            or self.principal_running.get(principal, 0) < self.max_concurrency_per_principal
+        )
+
+    def _grant(self, principal: Optional[str]) -> None:
+        self.running_num += 1
+        if principal is not None:
+            self.principal_running[principal] = self.principal_running.get(principal, 0) + 1
+
+    async def acquire(self, priority: float, principal: Optional[str] = None, run: Any = None) -> None:
+        """wait for an execution slot, in turn with the other runs, higher priority is granted first within the run"""
+        if self.running_num < self.max_concurrency and not self.waiters and self._within_budget(principal):
+            self._grant(principal)
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        waiters = self.waiters.get(run)
+        if waiters is None:
+            waiters = self.waiters[run] = []
+            self.turns.append(run)
+        heapq.heappush(waiters, (-priority, next(self.counter), principal, future))
+        # slots may be free, held back from the waiters over their budget
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            # the slot was handed over right before the cancellation, give it back
+            if future.done() and not future.cancelled():
+                self.release(principal)
+            raise
+
+    def release(self, principal: Optional[str] = None) -> None:
+        """give back an execution slot, hand it over to the best waiter within its budget if any"""
+        self.running_num -= 1
+        if principal is not None:
+            running = self.principal_running[principal] - 1
+            if running:
+                self.principal_running[principal] = running
+            else:
+                del self.principal_running[principal]
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        """grant the free slots to the runs in turn, the runs over their budget keep their turn for later"""
+        over_budget = []
+        while self.turns and self.running_num < self.max_concurrency:
+            run = self.turns.popleft()
+            waiters = self.waiters[run]
+            # the best waiter of the run within its budget, the cancelled waiters are dropped
+            skipped = []
+            granted = False
+            while waiters:
+                waiter = heapq.heappop(waiters)
+                _, _, principal, future = waiter
+                if future.done():
+                    continue
+                if not self._within_budget(principal):
+                    skipped.append(waiter)
+                    continue
+                self._grant(principal)
+                future.set_result(None)
+                granted = True
+                break
+            for waiter in skipped:
+                heapq.heappush(waiters, waiter)
+            if not waiters:
+                del self.waiters[run]
+            elif granted:
+                self.turns.append(run)
+            else:
+                over_budget.append(run)
+        self.turns.extendleft(reversed(over_budget))
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "running_num": self.running_num,
+            "waiting_num": sum(len(waiters) for waiters in self.waiters.values()),
+            "max_concurrency": self.max_concurrency,
+            "max_concurrency_per_run": self.max_concurrency_per_run,
+            "max_concurrency_per_principal": self.max_concurrency_per_principal,
+        }
+
+
+node_scheduler = NodeScheduler()
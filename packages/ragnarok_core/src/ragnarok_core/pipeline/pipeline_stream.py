@@ -0,0 +1,80 @@
+import asyncio
+from typing import Any, AsyncIterator, Dict, Optional
+
+from ragnarok_toolkit.component import ComponentIOType
+
+_END = object()
+
+
+class NodeStream:
+    """
+    async iterator over the partial values of an upstream output,
+    fed through a bounded queue so that a fast producer waits for its consumer
+    """
+
+    def __init__(self, maxsize: int = 0) -> None:
+        self.queue: asyncio.Queue[Any] = asyncio.Queue(maxsize=maxsize)
+        # the consumer is done with the stream, whether it read all of it or not
+        self.abandoned = False
+
+    @classmethod
+    def of(cls, value: Any) -> "NodeStream":
+        """a closed stream of a single value, for a non-streaming upstream output or an injected value"""
+        stream = cls()
+        stream.queue.put_nowait(value)
+        stream.queue.put_nowait(_END)
+        return stream
+
+    async def put(self, value: Any) -> None:
+        """wait for room in the queue, a value put after the consumer is done is dropped"""
+        if not self.abandoned:
+            await self.queue.put(value)
+
+    async def close(self) -> None:
+        await self.put(_END)
+
+    def abandon(self) -> None:
+        """the consumer is done, the unread values are dropped and a producer waiting for room goes on"""
+        self.abandoned = True
+        while not self.queue.empty():
+            self.queue.get_nowait()
+
+    def __aiter__(self) -> AsyncIterator[Any]:
+        return self
+
+    async def __anext__(self) -> Any:
+        value = await self.queue.get()
+        if value is _END:
+            # keep the end mark, so that iterating again stops at once
+            self.queue.put_nowait(_END)
+            raise StopAsyncIteration
+        return value
+
+
+class StreamAggregator:
+    """merge the partial outputs of a streaming node into the whole outputs, by the declared output types"""
+
+    def __init__(self, output_types: Dict[str, ComponentIOType]) -> None:
+        self.output_types = output_types
+        self.outputs: Dict[str, Any] = {}
+
+    def add(self, partial_outputs: Dict[str, Any]) -> None:
+        for name, value in partial_outputs.items():
+            merged = self.outputs.get(name)
+            output_type: Optional[ComponentIOType] = self.output_types.get(name)
+            if output_type is not None and output_type.endswith("_LIST"):
+                # copied, the partial list is shared with the streaming consumers
+                if merged is None:
+                    self.outputs[name] = list(value)
+                else:
+                    merged.extend(value)
+            elif output_type == ComponentIOType.STRING and merged is not None:
+                self.outputs[name] = merged + value
+            else:
+                self.outputs[name] = value
+
+    async def drain(self, partial_outputs_gen: AsyncIterator[Dict[str, Any]]) -> Dict[str, Any]:
+        """consume a whole streaming execution"""
+        async for partial_outputs in partial_outputs_gen:
+            self.add(partial_outputs)
+        return self.outputs
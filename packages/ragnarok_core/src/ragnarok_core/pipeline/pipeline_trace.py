@@ -0,0 +1,268 @@
+import secrets
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+
+from ragnarok_toolkit.blob import BlobRef
+from ragnarok_toolkit.tracing import ExternalCall
+
+
+def estimate_size(value: Any) -> int:
+    """approximate num of bytes a node output takes, by its payload rather than the python object overhead"""
+    if value is None:
+        return 0
+    if isinstance(value, BlobRef):
+        # a spilled payload takes no memory
+        return 0 if value.spilled else value.size
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    if isinstance(value, bool):
+        return 1
+    if isinstance(value, (int, float)):
+        return 8
+    if isinstance(value, dict):
+        return sum(estimate_size(item) for item in value.values())
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return sum(estimate_size(item) for item in value)
+    return len(repr(value))
+
+
+@dataclass
+class NodeSpan:
+    """timeline of one node in a run, times are unix timestamps in seconds"""
+
+    node_id: str
+    component: str
+    # the first input of the node is written, either injected or from an upstream node
+    first_input_time: Optional[float] = None
+    # all the inputs are settled, the node is handed to the scheduler
+    ready_time: Optional[float] = None
+    start_time: Optional[float] = None
+    end_time: Optional[float] = None
+    # estimated by estimate_size, not measured
+    output_bytes: int = 0
+    cache_hit: bool = False
+    error: Optional[str] = None
+    external_calls: List[ExternalCall] = field(default_factory=list)
+
+    @property
+    def input_wait(self) -> float:
+        """seconds from the first input to the last one"""
+        if self.first_input_time is None or self.ready_time is None:
+            return 0.0
+        return self.ready_time - self.first_input_time
+
+    @property
+    def queue_wait(self) -> float:
+        """seconds from ready to started, waiting for an execution slot"""
+        if self.ready_time is None or self.start_time is None:
+            return 0.0
+        return self.start_time - self.ready_time
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "node_id": self.node_id,
+            "component": self.component,
+            "first_input_time": self.first_input_time,
+            "ready_time": self.ready_time,
+            "start_time": self.start_time,
+            "end_time": self.end_time,
+            "input_wait": self.input_wait,
+            "queue_wait": self.queue_wait,
+            "output_bytes": self.output_bytes,
+            "cache_hit": self.cache_hit,
+            "error": self.error,
+            "external_calls": [external_call.to_dict() for external_call in self.external_calls],
+        }
+
+
+class PipelineTrace:
+    """spans of all the nodes of a traced run"""
+
+    def __init__(self, node_ids: Sequence[str], component_names: Sequence[str]) -> None:
+        self.trace_id = secrets.token_hex(16)
+        self.start_time = time.time()
+        self.end_time: Optional[float] = None
+        # indexed by node index
+        self.spans: List[NodeSpan] = [
+            NodeSpan(node_id=node_id, component=component_name)
+            for node_id, component_name in zip(node_ids, component_names)
+        ]
+        # peak of the estimated bytes of the node outputs waiting to be read, see PipelineRunContext
+        self.peak_output_bytes_estimate = 0
+
+    def mark_input(self, node_index: int) -> None:
+        span = self.spans[node_index]
+        if span.first_input_time is None:
+            span.first_input_time = time.time()
+
+    def mark_ready(self, node_index: int) -> None:
+        span = self.spans[node_index]
+        span.ready_time = time.time()
+        if span.first_input_time is None:
+            span.first_input_time = span.ready_time
+
+    def finish(self) -> None:
+        self.end_time = time.time()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "start_time": self.start_time,
+            "end_time": self.end_time,
+            "peak_output_bytes_estimate": self.peak_output_bytes_estimate,
+            "spans": [span.to_dict() for span in self.spans if span.start_time is not None],
+        }
+
+    def to_chrome_trace(self) -> Dict[str, Any]:
+        """
+        chrome trace event format, loadable by chrome://tracing and perfetto.
+        each node gets a track of its own, holding its queue wait, execution and external calls
+        """
+
+        def micros(timestamp: float) -> float:
+            return (timestamp - self.start_time) * 1e6
+
+        events: List[Dict[str, Any]] = []
+        for tid, span in enumerate(self.spans, start=1):
+            if span.start_time is None:
+                continue
+            events.append({"name": "thread_name", "ph": "M", "pid": 1, "tid": tid, "args": {"name": span.node_id}})
+            if span.ready_time is not None and span.queue_wait > 0:
+                events.append(
+                    {
+                        "name": "queued",
+                        "cat": "scheduler",
+                        "ph": "X",
+                        "pid": 1,
+                        "tid": tid,
+                        "ts": micros(span.ready_time),
+                        "dur": span.queue_wait * 1e6,
+                    }
+                )
+            end_time = span.end_time if span.end_time is not None else self.end_time or time.time()
+            events.append(
+                {
+                    "name": span.component,
+                    "cat": "node",
+                    "ph": "X",
+                    "pid": 1,
+                    "tid": tid,
+                    "ts": micros(span.start_time),
+                    "dur": (end_time - span.start_time) * 1e6,
+                    "args": {
+                        "node_id": span.node_id,
+                        "input_wait_ms": span.input_wait * 1e3,
+                        "output_bytes": span.output_bytes,
+                        "cache_hit": span.cache_hit,
+                        "error": span.error,
+                    },
+                }
+            )
+            for external_call in span.external_calls:
+                events.append(
+                    {
+                        "name": external_call.name,
+                        "cat": "external",
+                        "ph": "X",
+                        "pid": 1,
+                        "tid": tid,
+                        "ts": micros(external_call.start_time),
+                        "dur": (external_call.end_time - external_call.start_time) * 1e6,
+                        "args": {"error": external_call.error},
+                    }
+                )
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def to_otel(self) -> Dict[str, Any]:
+        """
+        opentelemetry compatible structure, in the otlp/json layout of resourceSpans,
+        with a root span of the run, a child span per node and a client span per external call
+        """
+
+        def nanos(timestamp: float) -> str:
+            return str(int(timestamp * 1e9))
+
+        def attributes(**kwargs: Any) -> List[Dict[str, Any]]:
+            result = []
+            for key, value in kwargs.items():
+                if value is None:
+                    continue
+                if isinstance(value, bool):
+                    typed_value = {"boolValue": value}
+                elif isinstance(value, int):
+                    typed_value = {"intValue": str(value)}
+                elif isinstance(value, float):
+                    typed_value = {"doubleValue": value}
+                else:
+                    typed_value = {"stringValue": str(value)}
+                result.append({"key": key, "value": typed_value})
+            return result
+
+        def status(error: Optional[str]) -> Dict[str, Any]:
+            return {"code": 2, "message": error} if error else {"code": 1}
+
+        end_time = self.end_time or time.time()
+        root_span_id = secrets.token_hex(8)
+        spans = [
+            {
+                "traceId": self.trace_id,
+                "spanId": root_span_id,
+                "name": "pipeline.run",
+                "kind": 1,
+                "startTimeUnixNano": nanos(self.start_time),
+                "endTimeUnixNano": nanos(end_time),
+                "attributes": [],
+                "status": status(None),
+            }
+        ]
+        for span in self.spans:
+            if span.start_time is None:
+                continue
+            span_id = secrets.token_hex(8)
+            spans.append(
+                {
+                    "traceId": self.trace_id,
+                    "spanId": span_id,
+                    "parentSpanId": root_span_id,
+                    "name": span.component,
+                    "kind": 1,
+                    "startTimeUnixNano": nanos(span.start_time),
+                    "endTimeUnixNano": nanos(span.end_time if span.end_time is not None else end_time),
+                    "attributes": attributes(
+                        **{
+                            "ragnarok.node_id": span.node_id,
+                            "ragnarok.input_wait": span.input_wait,
+                            "ragnarok.queue_wait": span.queue_wait,
+                            "ragnarok.output_bytes": span.output_bytes,
+                            "ragnarok.cache_hit": span.cache_hit,
+                        }
+                    ),
+                    "status": status(span.error),
+                }
+            )
+            for external_call in span.external_calls:
+                spans.append(
+                    {
+                        "traceId": self.trace_id,
+                        "spanId": secrets.token_hex(8),
+                        "parentSpanId": span_id,
+                        "name": external_call.name,
+                        "kind": 3,
+                        "startTimeUnixNano": nanos(external_call.start_time),
+                        "endTimeUnixNano": nanos(external_call.end_time),
+                        "attributes": [],
+                        "status": status(external_call.error),
+                    }
+                )
+
+        return {
+            "resourceSpans": [
+                {
+                    "resource": {"attributes": attributes(**{"service.name": "ragnarok-pipeline"})},
+                    "scopeSpans": [{"scope": {"name": "ragnarok_core.pipeline"}, "spans": spans}],
+                }
+            ]
+        }
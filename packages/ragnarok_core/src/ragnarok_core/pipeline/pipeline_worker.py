@@ -0,0 +1,264 @@
+import asyncio
+import itertools
+import logging
+import multiprocessing
+import pickle
+import queue
+import threading
+from array import array
+from dataclasses import dataclass
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+from ragnarok_core.pipeline.pipeline_executor import run_component, run_component_batch
+from ragnarok_toolkit.component import RagnarokComponent
+from ragnarok_toolkit.config import PIPELINE_PROCESS_POOL_SIZE, PIPELINE_SHM_THRESHOLD
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class SharedPayload:
+    """a large value moved to a shared memory block, only this reference goes through the queues"""
+
+    name: str
+    # bytes, float_list or float_list_list
+    kind: str
+    size: int
+    # row length of a float_list_list
+    row_size: int = 0
+
+
+def _is_float_list(value: Any) -> bool:
+    return type(value) is list and len(value) > 0 and all(type(item) is float for item in value)
+
+
+def _put_block(data: memoryview, kind: str, row_size: int, blocks: List[SharedMemory]) -> SharedPayload:
+    block = SharedMemory(create=True, size=max(len(data), 1))
+    block.buf[: len(data)] = data
+    blocks.append(block)
+    return SharedPayload(block.name, kind, len(data), row_size)
+
+
+def share(value: Any, threshold: int, blocks: List[SharedMemory]) -> Any:
+    """
+    replace the bytes and float vectors of at least threshold bytes within a node data by SharedPayload,
+    the created blocks are appended to blocks, whose owner closes them and unlinks them once read
+    """
+    if isinstance(value, (bytes, bytearray)):
+        if len(value) >= threshold:
+            return _put_block(memoryview(value), "bytes", 0, blocks)
+        return value
+    if isinstance(value, list) and value:
+        first = value[0]
+        if type(first) is float and len(value) * 8 >= threshold and _is_float_list(value):
+            return _put_block(memoryview(array("d", value)).cast("B"), "float_list", 0, blocks)
+        if (
+            type(first) is list
+            and first
+            and type(first[0]) is float
+            and len(value) * len(first) * 8 >= threshold
+            and all(len(row) == len(first) and _is_float_list(row) for row in value)
+        ):
+            data = array("d", itertools.chain.from_iterable(value))
+            return _put_block(memoryview(data).cast("B"), "float_list_list", len(first), blocks)
+        return [share(item, threshold, blocks) for item in value]
+    if isinstance(value, dict):
+        return {key: share(item, threshold, blocks) for key, item in value.items()}
+    return value
+
+
+def restore(value: Any, unlink: bool = False) -> Any:
+    """copy the SharedPayload within a node data back to the values, unlink the blocks too if asked"""
+    if isinstance(value, SharedPayload):
+        block = SharedMemory(name=value.name)
+        try:
+            data = block.buf[: value.size]
+            if value.kind == "bytes":
+                result: Any = bytes(data)
+            else:
+                floats = array("d")
+                floats.frombytes(data)
+                if value.kind == "float_list":
+                    result = floats.tolist()
+                else:
+                    result = [
+                        floats[start : start + value.row_size].tolist()
+                        for start in range(0, len(floats), value.row_size)
+                    ]
+            data.release()
+        finally:
+            block.close()
+            if unlink:
+                block.unlink()
+        return result
+    if isinstance(value, list):
+        return [restore(item, unlink) for item in value]
+    if isinstance(value, dict):
+        return {key: restore(item, unlink) for key, item in value.items()}
+    return value
+
+
+def release(value: Any) -> None:
+    """unlink the blocks of the SharedPayload within a node data which is never read"""
+    if isinstance(value, SharedPayload):
+        block = SharedMemory(name=value.name)
+        block.close()
+        block.unlink()
+    elif isinstance(value, list):
+        for item in value:
+            release(item)
+    elif isinstance(value, dict):
+        for item in value.values():
+            release(item)
+
+
+def _close_blocks(blocks: List[SharedMemory], unlink: bool) -> None:
+    for block in blocks:
+        block.close()
+        if unlink:
+            block.unlink()
+
+
+def _worker_main(task_queue: multiprocessing.Queue, result_queue: multiprocessing.Queue, threshold: int) -> None:
+    """worker process loop, runs one component execution at a time until it gets None"""
+    while True:
+        task = task_queue.get()
+        if task is None:
+            return
+        task_id, component, inputs, batch = pickle.loads(task)
+        try:
+            inputs = restore(inputs)
+            if batch:
+                outputs = run_component_batch(component, inputs)
+            else:
+                outputs = run_component(component, inputs)
+            blocks: List[SharedMemory] = []
+            outputs = share(outputs, threshold, blocks)
+            # the parent unlinks the output blocks once it has read them
+            _close_blocks(blocks, unlink=False)
+            result = pickle.dumps((task_id, outputs, None))
+        except BaseException as e:
+            try:
+                result = pickle.dumps((task_id, None, e))
+            except Exception:
+                result = pickle.dumps((task_id, None, RuntimeError(f"{type(e).__name__}: {e}")))
+        result_queue.put(result)
+
+
+class WorkerPool:
+    """
+    pool of long lived worker processes fed through local queues, an alternative backend of the PROCESS
+    execution class. large bytes and float vectors of the inputs and outputs go through shared memory
+    rather than being pickled through the queues. the processes are started on first use
+    """
+
+    def __init__(self, size: int = PIPELINE_PROCESS_POOL_SIZE, shm_threshold: int = PIPELINE_SHM_THRESHOLD) -> None:
+        self.size = size
+        self.shm_threshold = shm_threshold
+        self.task_ids = itertools.count()
+        # task id -> (loop, future) of the pending executions
+        self.pending: Dict[int, Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = {}
+        self.lock = threading.Lock()
+        self.mp_context = multiprocessing.get_context()
+        self.task_queue: Optional[multiprocessing.Queue] = None
+        self.result_queue: Optional[multiprocessing.Queue] = None
+        self.workers: List[multiprocessing.Process] = []
+        self.reader: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        with self.lock:
+            if self.reader is not None:
+                return
+            # started before the workers so that they share it, a block is then tracked once by name
+            # whichever process creates or attaches it, until one of them unlinks it
+            resource_tracker.ensure_running()
+            self.task_queue = self.mp_context.Queue()
+            self.result_queue = self.mp_context.Queue()
+            self.workers = [self._spawn_worker() for _ in range(self.size)]
+            self.reader = threading.Thread(target=self._read_results, name="ragnarok-worker-reader", daemon=True)
+            self.reader.start()
+
+    def _spawn_worker(self) -> multiprocessing.Process:
+        worker = self.mp_context.Process(
+            target=_worker_main,
+            args=(self.task_queue, self.result_queue, self.shm_threshold),
+            name="ragnarok-worker",
+            daemon=True,
+        )
+        worker.start()
+        return worker
+
+    async def execute(self, component: Type[RagnarokComponent], inputs: Any, batch: bool = False) -> Any:
+        """run the execute (or execute_batch) function of a component in a worker process"""
+        self.start()
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        task_id = next(self.task_ids)
+        blocks: List[SharedMemory] = []
+        try:
+            task = pickle.dumps((task_id, component, share(inputs, self.shm_threshold, blocks), batch))
+            with self.lock:
+                self.pending[task_id] = (loop, future)
+            self.task_queue.put(task)
+            outputs, error = await future
+        finally:
+            with self.lock:
+                self.pending.pop(task_id, None)
+            _close_blocks(blocks, unlink=True)
+        if error is not None:
+            raise error
+        return restore(outputs, unlink=True)
+
+    def _read_results(self) -> None:
+        """reader thread, resolves the futures of the finished executions and replaces the dead workers"""
+        while True:
+            try:
+                result = self.result_queue.get(timeout=1)
+            except queue.Empty:
+                self._check_workers()
+                continue
+            if result is None:
+                return
+            task_id, outputs, error = pickle.loads(result)
+            with self.lock:
+                loop, future = self.pending.get(task_id, (None, None))
+            if future is None:
+                # cancelled or failed meanwhile, nobody reads the output blocks
+                release(outputs)
+                continue
+            loop.call_soon_threadsafe(self._resolve, future, (outputs, error))
+
+    @staticmethod
+    def _resolve(future: asyncio.Future, result: Tuple[Any, Optional[BaseException]]) -> None:
+        if not future.done():
+            future.set_result(result)
+
+    def _check_workers(self) -> None:
+        """a crashed worker loses its task, which is unknown, so all the pending executions are failed"""
+        with self.lock:
+            dead_indexes = [index for index, worker in enumerate(self.workers) if not worker.is_alive()]
+            if not dead_indexes:
+                return
+            for index in dead_indexes:
+                self.workers[index] = self._spawn_worker()
+            pending = list(self.pending.values())
+        logger.error(f"{len(dead_indexes)} pipeline worker processes died, the pending executions are failed")
+        for loop, future in pending:
+            loop.call_soon_threadsafe(self._resolve, future, (None, RuntimeError("pipeline worker process died")))
+
+    def shutdown(self, wait: bool = True) -> None:
+        """stop the workers and the reader, the pool would be restarted if used again"""
+        with self.lock:
+            if self.reader is None:
+                return
+            for _ in self.workers:
+                self.task_queue.put(None)
+            self.result_queue.put(None)
+            reader, workers = self.reader, self.workers
+            self.reader, self.workers = None, []
+        if wait:
+            for worker in workers:
+                worker.join()
+            reader.join()
@@ -0,0 +1,91 @@
+import hashlib
+from contextlib import aclosing
+from typing import Any, AsyncGenerator, Dict, FrozenSet, List, Optional, Set, Tuple
+
+from cachetools import TTLCache
+from ragnarok_core.pipeline.node_cache import canonical_json
+from ragnarok_core.pipeline.pipeline_entity import PipelineExecutionInfo
+from ragnarok_toolkit.config import (
+    PIPELINE_RESULT_CACHE_SIZE,
+    PIPELINE_RESULT_CACHE_TTL,
+)
+
+
+class ResultCache:
+    """
+    in-process lru cache with ttl of the whole event sequences of the successful pipeline runs,
+    keyed by the pipeline content and the run params, should be used as a singleton.
+    a repeated run replays the cached events rather than executing any node.
+    an edited pipeline gets new keys, the runs of its former content age out
+    """
+
+    def __init__(self, maxsize: int = PIPELINE_RESULT_CACHE_SIZE, ttl: float = PIPELINE_RESULT_CACHE_TTL) -> None:
+        self.events: TTLCache[str, Tuple[Tuple[str, str, Dict[str, Any]], ...]] = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(content_hash: str, params: Dict[str, Any], **options: Any) -> Optional[str]:
+        """
+        stable key of a run by the pipeline content hash, the params whatever their key order,
+        and the run options changing the events. None if the params could not be encoded, the run is then not cached
+        """
+        encoded = canonical_json({"params": params, "options": options})
+        if encoded is None:
+            return None
+        return hashlib.sha256(f"{content_hash}\0{encoded}".encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Tuple[Tuple[str, str, Dict[str, Any]], ...]]:
+        events = self.events.get(key)
+        if events is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return events
+
+    async def record(
+        self, key: str, events: AsyncGenerator[PipelineExecutionInfo, None], output_names: FrozenSet[str]
+    ) -> AsyncGenerator[PipelineExecutionInfo, None]:
+        """pass the events of a run through, caching them once the run ends without error"""
+        # (node_id, type, data) of each event, as the readers may replace the data of the events they get
+        recorded: List[Tuple[str, str, Dict[str, Any]]] = []
+        reported: Set[str] = set()
+        async with aclosing(events):
+            try:
+                async for event in events:
+                    recorded.append((event.node_id, event.type, event.data))
+                    if event.type == "output_info":
+                        reported.update(event.data)
+                    yield event
+            except GeneratorExit:
+                # closed early, typically right after the answer. once all the outputs are reported,
+                # the nodes are done and the rest of the run is drained, so that it is still cached
+                if reported.issuperset(output_names):
+                    async for event in events:
+                        recorded.append((event.node_id, event.type, event.data))
+                    self._store(key, recorded)
+                raise
+            self._store(key, recorded)
+
+    def _store(self, key: str, recorded: List[Tuple[str, str, Dict[str, Any]]]) -> None:
+        if recorded and recorded[-1][1] == "end_info":
+            self.events[key] = tuple(recorded)
+
+    @staticmethod
+    async def replay(
+        events: Tuple[Tuple[str, str, Dict[str, Any]], ...]
+    ) -> AsyncGenerator[PipelineExecutionInfo, None]:
+        """the cached events of a run, time stamped anew, the end_info tells the run was served from the cache"""
+        for node_id, event_type, data in events:
+            if event_type == "end_info":
+                data = {**data, "result_cache_hit": True}
+            yield PipelineExecutionInfo(node_id, event_type, data)
+
+    def clear(self) -> None:
+        self.events.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {"size": len(self.events), "hits": self.hits, "misses": self.misses}
+
+
+result_cache = ResultCache()
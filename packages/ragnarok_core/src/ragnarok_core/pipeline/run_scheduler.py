@@ -0,0 +1,138 @@
+import asyncio
+import heapq
+import itertools
+from collections import deque
+from contextlib import aclosing
+from enum import StrEnum
+from typing import Any, AsyncGenerator, Deque, Dict, List, Tuple
+
+from ragnarok_toolkit.config import (
+    PIPELINE_INTERACTIVE_WEIGHT,
+    PIPELINE_MAX_RUNS,
+    PIPELINE_PRINCIPAL_MAX_RUNS,
+)
+
+
+class RunLane(StrEnum):
+    """kind of the runs of a principal, each lane of each principal is a flow of its own in the fair queue"""
+
+    # chat and test requests, someone is waiting for the answer
+    INTERACTIVE = "interactive"
+    # jobs and batched ingestion
+    BATCH = "batch"
+
+
+class RunScheduler:
+    """
+    process-wide admission of the pipeline runs, should be used as a singleton.
+    the waiting runs are granted by weighted fair queuing across the flows, a flow being a lane of a principal,
+    so a principal flooding the queue only delays itself, and its interactive runs do not wait behind its batches.
+    each principal has at most max_runs_per_principal runs admitted at the same time
+    """
+
+    def __init__(
+        self,
+        *,
+        max_runs: int = PIPELINE_MAX_RUNS,
+        max_runs_per_principal: int = PIPELINE_PRINCIPAL_MAX_RUNS,
+        interactive_weight: float = PIPELINE_INTERACTIVE_WEIGHT,
+        wait_sample_size: int = 1024,
+    ) -> None:
+        self.max_runs = max_runs
+        self.max_runs_per_principal = max_runs_per_principal
+        self.weights: Dict[RunLane, float] = {RunLane.INTERACTIVE: interactive_weight, RunLane.BATCH: 1.0}
+        # num of the admitted runs, in total and of each principal with any
+        self.running_num = 0
+        self.principal_running: Dict[str, int] = {}
+        # virtual time, the start tag of the last admitted run
+        self.virtual_time = 0.0
+        # finish tag of the last queued run of each flow
+        self.finish_tags: Dict[Tuple[str, RunLane], float] = {}
+        # waiting heap of (finish tag, seq, start tag, principal, enqueue time, future)
+        self.waiters: List[Tuple[float, int, float, str, float, asyncio.Future]] = []
+        self.counter = itertools.count()
+        # seconds waited by the latest admitted runs
+        self.wait_times: Deque[float] = deque(maxlen=wait_sample_size)
+
+    async def acquire(self, principal: str, lane: RunLane = RunLane.INTERACTIVE, cost: float = 1.0) -> None:
+        """wait for the admission of a run, cost is its share of work, like the num of rows of a batch"""
+        flow = (principal, lane)
+        start_tag = max(self.virtual_time, self.finish_tags.get(flow, 0.0))
+        finish_tag = start_tag + cost / self.weights[lane]
+        self.finish_tags[flow] = finish_tag
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        heapq.heappush(self.waiters, (finish_tag, next(self.counter), start_tag, principal, loop.time(), future))
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            # the admission was granted right before the cancellation, give it back
+            if future.done() and not future.cancelled():
+                self.release(principal)
+            raise
+
+    def release(self, principal: str) -> None:
+        """end an admitted run, admit the next waiting ones"""
+        self.running_num -= 1
+        running = self.principal_running[principal] - 1
+        if running:
+            self.principal_running[principal] = running
+        else:
+            del self.principal_running[principal]
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        """admit the waiting runs of the smallest finish tags, skipping the principals at their limit"""
+        over_limit = []
+        now = asyncio.get_running_loop().time()
+        while self.waiters and self.running_num < self.max_runs:
+            waiter = heapq.heappop(self.waiters)
+            _, _, start_tag, principal, enqueue_time, future = waiter
+            if future.done():
+                continue
+            if self.principal_running.get(principal, 0) >= self.max_runs_per_principal:
+                over_limit.append(waiter)
+                continue
+            self.running_num += 1
+            self.principal_running[principal] = self.principal_running.get(principal, 0) + 1
+            self.virtual_time = max(self.virtual_time, start_tag)
+            self.wait_times.append(now - enqueue_time)
+            future.set_result(None)
+        for waiter in over_limit:
+            heapq.heappush(self.waiters, waiter)
+        if not self.waiters and not self.running_num:
+            # idle, the tags start over
+            self.virtual_time = 0.0
+            self.finish_tags.clear()
+
+    async def admit(
+        self,
+        events: AsyncGenerator[Any, None],
+        principal: str,
+        lane: RunLane = RunLane.INTERACTIVE,
+        cost: float = 1.0,
+    ) -> AsyncGenerator[Any, None]:
+        """pass the events of a run through once it is admitted, it is released when the run ends or is closed"""
+        async with aclosing(events):
+            await self.acquire(principal, lane, cost)
+            try:
+                async for event in events:
+                    yield event
+            finally:
+                self.release(principal)
+
+    def stats(self) -> Dict[str, Any]:
+        wait_times = sorted(self.wait_times)
+        return {
+            "running_num": self.running_num,
+            "queue_depth": sum(not future.done() for *_, future in self.waiters),
+            "max_runs": self.max_runs,
+            "max_runs_per_principal": self.max_runs_per_principal,
+            "wait_time_avg": sum(wait_times) / len(wait_times) if wait_times else 0.0,
+            "wait_time_p99": wait_times[int(len(wait_times) * 0.99)] if wait_times else 0.0,
+            "principal_running": dict(self.principal_running),
+        }
+
+
+run_scheduler = RunScheduler()
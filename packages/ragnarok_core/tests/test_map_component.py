@@ -0,0 +1,128 @@
+import asyncio
+from typing import Any, Dict, List, Tuple
+
+import pytest
+from ragnarok_core.components.official_components.map_component import MapComponent
+from ragnarok_core.pipeline import node_scheduler
+from ragnarok_core.pipeline.pipeline_context import current_principal
+from ragnarok_core.pipeline.pipeline_entity import PipelineEntity
+from ragnarok_core.pipeline.pipeline_node import PipelineNode
+from ragnarok_toolkit.component import (
+    ComponentInputTypeOption,
+    ComponentIOType,
+    ComponentOutputTypeOption,
+    RagnarokComponent,
+)
+
+running = [0, 0]
+# principal of each fetch, and the slots its principal held meanwhile
+seen: List[Tuple[Any, int]] = []
+
+
+class FakeFetchComponent(RagnarokComponent):
+    DESCRIPTION = "fetch an url, fails on the bad ones"
+    ENABLE_HINT_CHECK = True
+
+    @classmethod
+    def input_options(cls) -> Tuple[ComponentInputTypeOption, ...]:
+        return (ComponentInputTypeOption(name="url", allowed_types={ComponentIOType.STRING}, required=True),)
+
+    @classmethod
+    def output_options(cls) -> Tuple[ComponentOutputTypeOption, ...]:
+        return (ComponentOutputTypeOption(name="content", type=ComponentIOType.STRING),)
+
+    @classmethod
+    async def execute(cls, url: str) -> Dict[str, Any]:
+        running[0] += 1
+        running[1] = max(running)
+        principal = current_principal.get()
+        seen.append((principal, node_scheduler.principal_running.get(principal, 0)))
+        await asyncio.sleep(0.01 * (len(url) % 3))
+        running[0] -= 1
+        if url.startswith("bad"):
+            raise ValueError(f"could not fetch {url}")
+        return {"content": f"page of {url}"}
+
+
+class FakeFetchAllComponent(RagnarokComponent):
+    DESCRIPTION = "fetch many urls at once"
+    ENABLE_HINT_CHECK = True
+
+    @classmethod
+    def input_options(cls) -> Tuple[ComponentInputTypeOption, ...]:
+        return (ComponentInputTypeOption(name="urls", allowed_types={ComponentIOType.STRING_LIST}, required=True),)
+
+    @classmethod
+    def output_options(cls) -> Tuple[ComponentOutputTypeOption, ...]:
+        return (ComponentOutputTypeOption(name="contents", type=ComponentIOType.STRING_LIST),)
+
+    @classmethod
+    def execute(cls, urls: List[str]) -> Dict[str, Any]:
+        return {"contents": [f"page of {url}" for url in urls]}
+
+
+def sub_pipeline(component: str, input_name: str) -> Dict[str, Any]:
+    return {
+        "nodes": [{"node_id": "fetch", "component": component, "position": None, "output_name": "page"}],
+        "connections": [],
+        "inject_input_mapping": {"item": ["fetch", input_name]},
+    }
+
+
+@pytest.fixture(autouse=True)
+def register_components():
+    from ragnarok_core.components import ComponentInfo, component_manager
+
+    for component in (FakeFetchComponent, FakeFetchAllComponent):
+        component_manager.register_component(
+            ComponentInfo(name=component.__name__, is_official=False, component_class=component),
+            check_duplication=False,
+        )
+
+
+@pytest.mark.asyncio
+async def test_map_keeps_order_and_failures():
+    urls = ["a", "bad1", "abc", "ab", "bad2", "abcd"]
+    running[:] = [0, 0]
+    res = await MapComponent.execute(urls, sub_pipeline("FakeFetchComponent", "url"), concurrency=2)
+    assert res["results"] == [
+        {"page": {"content": "page of a"}},
+        None,
+        {"page": {"content": "page of abc"}},
+        {"page": {"content": "page of ab"}},
+        None,
+        {"page": {"content": "page of abcd"}},
+    ]
+    assert [error["index"] for error in res["errors"]] == [1, 4]
+    assert "could not fetch bad1" in res["errors"][0]["error"]
+    assert running[1] <= 2
+
+
+@pytest.mark.asyncio
+async def test_map_batches():
+    urls = ["a", "b", "c", "d", "e"]
+    res = await MapComponent.execute(urls, sub_pipeline("FakeFetchAllComponent", "urls"), batch_size=2)
+    assert res["results"] == [{"page": {"contents": f"page of {url}"}} for url in urls]
+    assert res["errors"] == []
+
+
+@pytest.mark.asyncio
+async def test_map_runs_as_caller():
+    pipeline = PipelineEntity(
+        {"map": PipelineNode(node_id="map", component=MapComponent, forward_node_info=(), output_name="pages")},
+        {name: ("map", name) for name in ("items", "pipeline", "item_name", "params", "concurrency", "batch_size")},
+    )
+    seen.clear()
+    infos = [
+        info
+        async for info in pipeline.run_async(
+            items=["a", "b", "c"],
+            pipeline=sub_pipeline("FakeFetchComponent", "url"),
+            concurrency=1,
+            principal="alice",
+        )
+    ]
+    outputs = next(info.data for info in infos if info.type == "output_info")
+    assert outputs["pages"]["errors"] == []
+    # the sub-pipeline nodes are charged to the caller, the map node itself holds no slot
+    assert seen == [("alice", 1)] * 3
@@ -0,0 +1,122 @@
+import importlib
+import threading
+from typing import Any, Dict, Tuple
+
+import pytest
+from ragnarok_core.pipeline.node_cache import (
+    DiskNodeCache,
+    MemoryNodeCache,
+    stable_hash,
+    stable_hash_async,
+)
+from ragnarok_core.pipeline.pipeline_entity import PipelineEntity
+from ragnarok_core.pipeline.pipeline_node import PipelineNode
+from ragnarok_toolkit.component import (
+    ComponentInputTypeOption,
+    ComponentIOType,
+    ComponentOutputTypeOption,
+    RagnarokComponent,
+)
+
+execute_num = 0
+
+
+# the module, shadowed in the package by its node_cache singleton
+node_cache_module = importlib.import_module("ragnarok_core.pipeline.node_cache")
+
+
+class CountComponent(RagnarokComponent):
+    DESCRIPTION = "count the executions"
+    ENABLE_HINT_CHECK = True
+    CACHEABLE = True
+
+    @classmethod
+    def input_options(cls) -> Tuple[ComponentInputTypeOption, ...]:
+        return (ComponentInputTypeOption(name="text", allowed_types={ComponentIOType.STRING}, required=True),)
+
+    @classmethod
+    def output_options(cls) -> Tuple[ComponentOutputTypeOption, ...]:
+        return (ComponentOutputTypeOption(name="text", type=ComponentIOType.STRING),)
+
+    @classmethod
+    def execute(cls, text: str) -> Dict[str, Any]:
+        global execute_num
+        execute_num += 1
+        return {"text": text * 2}
+
+
+class CountComponentV2(CountComponent):
+    VERSION = "2"
+
+
+def test_stable_hash():
+    assert stable_hash(CountComponent, {"a": 1, "b": [b"x"]}) == stable_hash(CountComponent, {"b": [b"x"], "a": 1})
+    assert stable_hash(CountComponent, {"a": 1}) != stable_hash(CountComponent, {"a": 2})
+    assert stable_hash(CountComponent, {"a": 1}) != stable_hash(CountComponentV2, {"a": 1})
+    assert stable_hash(CountComponent, {"a": object()}) is None
+    # the binary payloads are keyed by their digest, whatever their buffer type
+    assert stable_hash(CountComponent, {"a": b"xy"}) == stable_hash(CountComponent, {"a": bytearray(b"xy")})
+    assert stable_hash(CountComponent, {"a": b"xy"}) != stable_hash(CountComponent, {"a": b"yx"})
+    assert stable_hash(CountComponent, {"a": b"xy"}) != stable_hash(CountComponent, {"a": "xy"})
+
+
+@pytest.mark.asyncio
+async def test_stable_hash_offloaded(monkeypatch):
+    threads = []
+    original = node_cache_module.stable_hash
+
+    def recording_hash(*args):
+        threads.append(threading.current_thread())
+        return original(*args)
+
+    monkeypatch.setattr(node_cache_module, "stable_hash", recording_hash)
+    monkeypatch.setattr(node_cache_module, "PIPELINE_NODE_HASH_OFFLOAD_BYTES", 100)
+    assert await stable_hash_async(CountComponent, {"a": b"x" * 10}) == original(CountComponent, {"a": b"x" * 10})
+    assert await stable_hash_async(CountComponent, {"a": [b"x" * 200]}) == original(CountComponent, {"a": [b"x" * 200]})
+    # only the large inputs are hashed off the event loop
+    assert threads[0] is threading.current_thread()
+    assert threads[1] is not threading.current_thread()
+
+
+@pytest.mark.asyncio
+async def test_pipeline_node_cache():
+    global execute_num
+    execute_num = 0
+    pipeline = PipelineEntity(
+        {"1": PipelineNode(node_id="1", component=CountComponent, forward_node_info=())},
+        {"text": ("1", "text")},
+        node_cache=MemoryNodeCache(),
+    )
+
+    for expected_hits, text in [(0, "a"), (1, "a"), (0, "b")]:
+        infos = [info async for info in pipeline.run_async(text=text)]
+        assert infos[0].data == {"text": text * 2}
+        assert infos[-1].data["cache_hits"] == expected_hits
+        assert infos[-1].data["cache_misses"] == 1 - expected_hits
+    assert execute_num == 2
+
+
+@pytest.mark.asyncio
+async def test_disk_node_cache_eviction(tmp_path):
+    cache = DiskNodeCache(str(tmp_path), max_bytes=200)
+    for i in range(10):
+        await cache.set(f"key{i}", {"text": "x" * 50})
+        assert await cache.get(f"key{i}") == {"text": "x" * 50}
+
+    assert cache.total_bytes <= 200
+    assert await cache.get("key0") is None
+    assert DiskNodeCache(str(tmp_path)).total_bytes == cache.total_bytes
+
+
+@pytest.mark.asyncio
+async def test_memory_node_cache_bytes_bound():
+    cache = MemoryNodeCache(max_bytes=200)
+    for i in range(10):
+        await cache.set(f"key{i}", {"text": "x" * 50})
+        assert await cache.get(f"key{i}") == {"text": "x" * 50}
+
+    assert cache.stats()["bytes"] <= 200
+    assert await cache.get("key0") is None
+    # larger than the whole cache, not cached
+    await cache.set("large", {"text": "x" * 500})
+    assert await cache.get("large") is None
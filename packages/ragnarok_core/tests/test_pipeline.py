@@ -1,3 +1,5 @@
+import asyncio
+
 import pytest
 from ragnarok_core.components.official_components.test_component import (
     TestComponent1,
@@ -158,3 +160,35 @@ def test_from_json_str():
     #
     # with pytest.raises(ValueError):
     #     PipelineEntity.from_json_str("invalid json string")
+
+
+@pytest.mark.asyncio
+async def test_concurrent_runs_share_entity():
+    pipeline = PipelineEntity(
+        {
+            "2": PipelineNode(node_id="2", component=TestComponent2, forward_node_info=(), output_name="node2_res"),
+            "3": PipelineNode(
+                node_id="3",
+                component=TestComponent3,
+                forward_node_info=(
+                    PipelineNode.NodeConnection(
+                        from_node_id="3",
+                        to_node_id="2",
+                        from_node_output_name="component3_output_1",
+                        to_node_input_name="component2_input_1",
+                    ),
+                ),
+            ),
+        },
+        {"outer_input": ("3", "component3_input_1")},
+    )
+
+    async def collect_outputs():
+        outputs = {}
+        async for info in pipeline.run_async(outer_input="outer_input"):
+            if info.type == "output_info":
+                outputs.update(info.data)
+        return outputs
+
+    results = await asyncio.gather(*(collect_outputs() for _ in range(3)))
+    assert all(res == {"node2_res": {"component2_output_1": 26}} for res in results)
@@ -0,0 +1,107 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+import pytest
+from ragnarok_core.pipeline.pipeline_entity import PipelineEntity
+from ragnarok_core.pipeline.pipeline_node import PipelineNode
+from ragnarok_toolkit.component import (
+    ComponentInputTypeOption,
+    ComponentIOType,
+    ComponentOutputTypeOption,
+    RagnarokComponent,
+)
+
+batch_calls = []
+
+
+class UpperBatchComponent(RagnarokComponent):
+    DESCRIPTION = "upper the text, in batch"
+    ENABLE_HINT_CHECK = True
+    SUPPORT_BATCH = True
+
+    @classmethod
+    def input_options(cls) -> Tuple[ComponentInputTypeOption, ...]:
+        return (ComponentInputTypeOption(name="text", allowed_types={ComponentIOType.STRING}, required=True),)
+
+    @classmethod
+    def output_options(cls) -> Tuple[ComponentOutputTypeOption, ...]:
+        return (ComponentOutputTypeOption(name="text", type=ComponentIOType.STRING),)
+
+    @classmethod
+    def execute(cls, text: str) -> Dict[str, Any]:
+        return {"text": text.upper()}
+
+    @classmethod
+    async def execute_batch(cls, inputs_list: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        batch_calls.append(len(inputs_list))
+        return [cls.execute(inputs["text"]) for inputs in inputs_list]
+
+
+class SuffixComponent(RagnarokComponent):
+    DESCRIPTION = "append a suffix, fail on an empty text"
+    ENABLE_HINT_CHECK = True
+
+    @classmethod
+    def input_options(cls) -> Tuple[ComponentInputTypeOption, ...]:
+        return (
+            ComponentInputTypeOption(name="text", allowed_types={ComponentIOType.STRING}, required=True),
+            ComponentInputTypeOption(name="suffix", allowed_types={ComponentIOType.STRING}, required=False),
+        )
+
+    @classmethod
+    def output_options(cls) -> Tuple[ComponentOutputTypeOption, ...]:
+        return (ComponentOutputTypeOption(name="text", type=ComponentIOType.STRING),)
+
+    @classmethod
+    async def execute(cls, text: str, suffix: Optional[str]) -> Dict[str, Any]:
+        if not text:
+            raise ValueError("empty text")
+        return {"text": text + (suffix or "")}
+
+
+def build_pipeline() -> PipelineEntity:
+    return PipelineEntity(
+        {
+            "suffix": PipelineNode(
+                node_id="suffix",
+                component=SuffixComponent,
+                forward_node_info=(
+                    PipelineNode.NodeConnection(
+                        from_node_id="suffix",
+                        from_node_output_name="text",
+                        to_node_id="upper",
+                        to_node_input_name="text",
+                    ),
+                ),
+            ),
+            "upper": PipelineNode(
+                node_id="upper", component=UpperBatchComponent, forward_node_info=(), output_name="res"
+            ),
+        },
+        {"text": ("suffix", "text"), "suffix": ("suffix", "suffix")},
+    )
+
+
+@pytest.mark.asyncio
+async def test_run_batch_micro_batches():
+    batch_calls.clear()
+    rows = [{"text": f"q{i}", "suffix": "!"} for i in range(10)]
+
+    results = [result async for result in build_pipeline().run_batch(rows, batch_size=4)]
+
+    assert [result.row_index for result in results] == list(range(10))
+    assert [result.outputs["res"]["text"] for result in results] == [f"Q{i}!" for i in range(10)]
+    assert all(result.error is None for result in results)
+    assert batch_calls == [4, 4, 2]
+
+
+@pytest.mark.asyncio
+async def test_run_batch_row_failure():
+    batch_calls.clear()
+    rows = [{"text": "a"}, {"text": ""}, {"text": "c"}]
+
+    results = [result async for result in build_pipeline().run_batch(rows, batch_size=8)]
+
+    assert results[1].error is not None and "empty text" in results[1].error
+    assert results[1].outputs == {}
+    assert [results[0].outputs["res"]["text"], results[2].outputs["res"]["text"]] == ["A", "C"]
+    assert batch_calls == [2]
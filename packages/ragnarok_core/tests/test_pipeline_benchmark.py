@@ -0,0 +1,32 @@
+import importlib.util
+import os
+
+import pytest
+
+spec = importlib.util.spec_from_file_location(
+    "bench_pipeline", os.path.join(os.path.dirname(__file__), "..", "benchmarks", "bench_pipeline.py")
+)
+bench_pipeline = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(bench_pipeline)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("topology", list(bench_pipeline.TOPOLOGIES))
+async def test_bench_case(topology: str):
+    result = await bench_pipeline.bench_case(topology, "noop", 20, repeat=2)
+    assert result["nodes"] == 20
+    # a process_info per node, the output_info of the last node and the end_info
+    assert result["events_per_sec"] * result["mean_ms"] / 1e3 == pytest.approx(22)
+    assert result["p50_ms"] <= result["p99_ms"]
+
+    slower = dict(result, overhead_us_per_node=result["overhead_us_per_node"] * 2)
+    assert bench_pipeline.find_regressions([slower], [result], 0.2) == [(slower, pytest.approx(2))]
+    assert bench_pipeline.find_regressions([result], [result], 0.2) == []
+
+
+def test_critical_path_length():
+    # the 99 leaves of a fan out run 16 at a time after the root
+    assert bench_pipeline.critical_path_length(bench_pipeline.fan_out_edges(100), 100, 16) == 1 + 7
+    assert bench_pipeline.critical_path_length(bench_pipeline.chain_edges(100), 100, 16) == 100
+    # each diamond is one level of two nodes and one of its joining top node
+    assert bench_pipeline.critical_path_length(bench_pipeline.diamond_edges(10), 10, 16) == 7
@@ -0,0 +1,119 @@
+import gc
+import json
+import os
+import pickle
+from typing import Any, Dict, Tuple
+
+import pytest
+from ragnarok_core.pipeline.blob_store import BlobStore
+from ragnarok_core.pipeline.pipeline_entity import PipelineEntity
+from ragnarok_core.pipeline.pipeline_node import PipelineNode
+from ragnarok_toolkit.blob import BlobRef
+from ragnarok_toolkit.component import (
+    ComponentInputTypeOption,
+    ComponentIOType,
+    ComponentOutputTypeOption,
+    RagnarokComponent,
+)
+
+
+class LoadComponent(RagnarokComponent):
+    DESCRIPTION = "load a large file"
+    ENABLE_HINT_CHECK = True
+
+    @classmethod
+    def input_options(cls) -> Tuple[ComponentInputTypeOption, ...]:
+        return (ComponentInputTypeOption(name="size", allowed_types={ComponentIOType.INT}, required=True),)
+
+    @classmethod
+    def output_options(cls) -> Tuple[ComponentOutputTypeOption, ...]:
+        return (ComponentOutputTypeOption(name="file", type=ComponentIOType.BLOB),)
+
+    @classmethod
+    def execute(cls, size: int) -> Dict[str, Any]:
+        return {"file": b"x" * size}
+
+
+class MeasureComponent(RagnarokComponent):
+    DESCRIPTION = "measure a file"
+    ENABLE_HINT_CHECK = True
+
+    @classmethod
+    def input_options(cls) -> Tuple[ComponentInputTypeOption, ...]:
+        return (ComponentInputTypeOption(name="file", allowed_types={ComponentIOType.BLOB}, required=True),)
+
+    @classmethod
+    def output_options(cls) -> Tuple[ComponentOutputTypeOption, ...]:
+        return (ComponentOutputTypeOption(name="size", type=ComponentIOType.INT),)
+
+    @classmethod
+    def execute(cls, file: BlobRef) -> Dict[str, Any]:
+        view = file.view()
+        return {"size": view.nbytes if view[-1:] == b"x" else -1}
+
+
+def build_pipeline(store: BlobStore) -> PipelineEntity:
+    # load -> measure
+    return PipelineEntity(
+        {
+            "load": PipelineNode(
+                node_id="load",
+                component=LoadComponent,
+                forward_node_info=(
+                    PipelineNode.NodeConnection(
+                        from_node_id="load",
+                        from_node_output_name="file",
+                        to_node_id="measure",
+                        to_node_input_name="file",
+                    ),
+                ),
+                output_name="file",
+            ),
+            "measure": PipelineNode(
+                node_id="measure", component=MeasureComponent, forward_node_info=(), output_name="size"
+            ),
+        },
+        {"size": ("load", "size")},
+        blob_store=store,
+    )
+
+
+@pytest.mark.asyncio
+async def test_blob_store(tmp_path):
+    store = BlobStore(spill_size=8, directory=str(tmp_path))
+    small = await store.put(b"small")
+    assert not small.spilled and bytes(small) == b"small"
+    assert await store.put(small) is small
+
+    large = await store.put(bytearray(b"0123456789"))
+    assert large.spilled and large.view().tobytes() == b"0123456789"
+    path = large.path
+    # a copy sent to another process shares the file
+    copied = pickle.loads(pickle.dumps(large))
+    assert bytes(copied) == b"0123456789"
+    del copied
+    gc.collect()
+    assert os.path.exists(path)
+
+    # the file is removed along with its owning handle
+    large.view().release()
+    del large
+    gc.collect()
+    assert not os.path.exists(path)
+
+
+@pytest.mark.asyncio
+async def test_blob_passed_by_reference(tmp_path):
+    pipeline = build_pipeline(BlobStore(spill_size=1000, directory=str(tmp_path)))
+    for size, spilled in ((100, False), (5000, True)):
+        infos = [info async for info in pipeline.run_async(size=size)]
+        outputs = {}
+        for info in infos:
+            if info.type == "output_info":
+                outputs.update(info.data)
+        assert outputs["size"] == {"size": size}
+        assert isinstance(outputs["file"]["file"], BlobRef)
+        # the events only carry the size of the payload
+        event = next(json.loads(info.to_json()) for info in infos if info.type == "process_info")
+        assert event["data"]["file"]["size"] == size
+        assert event["data"]["file"]["spilled"] is spilled
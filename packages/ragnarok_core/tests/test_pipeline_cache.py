@@ -0,0 +1,89 @@
+import json
+
+import pytest
+from ragnarok_core.pipeline.pipeline_cache import PipelineCache
+from ragnarok_core.pipeline.pipeline_entity import PipelineEntity
+
+
+def build_content(output_name: str = "node1_res") -> str:
+    return json.dumps(
+        {
+            "nodes": [
+                {
+                    "node_id": "1",
+                    "component": "TestComponent1",
+                    "position": {"x": 1, "y": 1},
+                    "output_name": output_name,
+                },
+                {"node_id": "2", "component": "TestComponent2", "position": {"x": 1, "y": 1}},
+                {"node_id": "3", "component": "TestComponent3", "position": {"x": 1, "y": 1}},
+            ],
+            "connections": [
+                {
+                    "from_node_id": "2",
+                    "from_output_name": "component2_output_1",
+                    "to_node_id": "1",
+                    "to_node_input_name": "component1_input_2",
+                },
+                {
+                    "from_node_id": "3",
+                    "from_output_name": "component3_output_1",
+                    "to_node_id": "1",
+                    "to_node_input_name": "component1_input_1",
+                },
+                {
+                    "from_node_id": "3",
+                    "from_output_name": "component3_output_1",
+                    "to_node_id": "2",
+                    "to_node_input_name": "component2_input_1",
+                },
+            ],
+            "inject_input_mapping": {"outer_input": ["3", "component3_input_1"]},
+        }
+    )
+
+
+def test_compile_once(monkeypatch):
+    cache = PipelineCache(maxsize=4)
+    compile_times = 0
+    ori_from_json_str = PipelineEntity.from_json_str.__func__
+
+    def counting_from_json_str(cls, json_str):
+        nonlocal compile_times
+        compile_times += 1
+        return ori_from_json_str(cls, json_str)
+
+    monkeypatch.setattr(PipelineEntity, "from_json_str", classmethod(counting_from_json_str))
+
+    content = build_content()
+    first = cache.get_or_compile(content)
+    second = cache.get_or_compile(content)
+    assert compile_times == 1
+    assert first is second
+
+    assert cache.invalidate(content)
+    assert not cache.invalidate(content)
+    cache.get_or_compile(content)
+    assert compile_times == 2
+
+
+def test_lru_bound():
+    cache = PipelineCache(maxsize=2)
+    contents = [build_content(f"res_{i}") for i in range(3)]
+    for content in contents:
+        cache.get_or_compile(content)
+
+    assert cache.stats() == {"size": 2, "maxsize": 2}
+    assert not cache.invalidate(contents[0])
+
+
+@pytest.mark.asyncio
+async def test_cached_pipeline_runs_repeatedly():
+    cache = PipelineCache(maxsize=2)
+    content = build_content()
+    for _ in range(2):
+        outputs = {}
+        async for info in cache.get_or_compile(content).run_async(outer_input="outer_input"):
+            if info.type == "output_info":
+                outputs.update(info.data)
+        assert outputs["node1_res"]["component1_output_1"] == "this is res of component 326"
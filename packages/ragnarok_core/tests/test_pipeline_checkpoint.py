@@ -0,0 +1,103 @@
+import os
+from typing import Any, Dict, Optional, Tuple
+
+import pytest
+from ragnarok_core.pipeline.checkpoint_store import LocalCheckpointStore
+from ragnarok_core.pipeline.pipeline_entity import PipelineEntity
+from ragnarok_core.pipeline.pipeline_node import PipelineNode
+from ragnarok_toolkit.component import (
+    ComponentInputTypeOption,
+    ComponentIOType,
+    ComponentOutputTypeOption,
+    RagnarokComponent,
+)
+
+executed = []
+flaky_failing = True
+
+
+class EmbedComponent(RagnarokComponent):
+    DESCRIPTION = "the expensive step, executed once across the restarts"
+    ENABLE_HINT_CHECK = True
+
+    @classmethod
+    def input_options(cls) -> Tuple[ComponentInputTypeOption, ...]:
+        return (ComponentInputTypeOption(name="text", allowed_types={ComponentIOType.STRING}, required=False),)
+
+    @classmethod
+    def output_options(cls) -> Tuple[ComponentOutputTypeOption, ...]:
+        return (ComponentOutputTypeOption(name="text", type=ComponentIOType.STRING),)
+
+    @classmethod
+    def execute(cls, text: Optional[str]) -> Dict[str, Any]:
+        executed.append(cls.__name__)
+        return {"text": f"{text}+embedded"}
+
+
+class FlakyStoreComponent(EmbedComponent):
+    DESCRIPTION = "fails until the flag is cleared"
+
+    @classmethod
+    def execute(cls, text: Optional[str]) -> Dict[str, Any]:
+        executed.append(cls.__name__)
+        if flaky_failing:
+            raise ConnectionError("api is down")
+        return {"text": f"{text}+stored"}
+
+
+def connect(from_node_id: str, to_node_id: str) -> PipelineNode.NodeConnection:
+    return PipelineNode.NodeConnection(
+        from_node_id=from_node_id, from_node_output_name="text", to_node_id=to_node_id, to_node_input_name="text"
+    )
+
+
+@pytest.mark.asyncio
+async def test_resume_failed_run(tmp_path):
+    global flaky_failing
+    store = LocalCheckpointStore(str(tmp_path))
+    pipeline = PipelineEntity(
+        {
+            "embed": PipelineNode(
+                node_id="embed", component=EmbedComponent, forward_node_info=(connect("embed", "store"),)
+            ),
+            "store": PipelineNode(
+                node_id="store", component=FlakyStoreComponent, forward_node_info=(), output_name="res"
+            ),
+        },
+        {"text": ("embed", "text")},
+        checkpoint_store=store,
+    )
+
+    executed.clear()
+    flaky_failing = True
+    infos = [info async for info in pipeline.run_async(text="doc", run_id="run-1")]
+    assert infos[-1].type == "error_info"
+    assert executed == ["EmbedComponent", "FlakyStoreComponent"]
+    assert (await store.get("run-1", "embed"))[1] == {"text": "doc+embedded"}
+
+    # a restart with the same inputs skips the embedding
+    executed.clear()
+    flaky_failing = False
+    infos = [info async for info in pipeline.run_async(text="doc", run_id="run-1")]
+    assert executed == ["FlakyStoreComponent"]
+    assert infos[-1].type == "end_info"
+    assert infos[-1].data["checkpoint_hits"] == 1
+    assert [info.data for info in infos if info.type == "output_info"] == [{"res": {"text": "doc+embedded+stored"}}]
+    # dropped once the run succeeded
+    assert not os.listdir(tmp_path)
+
+
+@pytest.mark.asyncio
+async def test_changed_inputs_rerun(tmp_path):
+    store = LocalCheckpointStore(str(tmp_path))
+    pipeline = PipelineEntity(
+        {"embed": PipelineNode(node_id="embed", component=EmbedComponent, forward_node_info=(), output_name="res")},
+        {"text": ("embed", "text")},
+        checkpoint_store=store,
+    )
+    await store.set("run-2", "embed", "stale hash", {"text": "stale"})
+
+    executed.clear()
+    infos = [info async for info in pipeline.run_async(text="new", run_id="run-2")]
+    assert executed == ["EmbedComponent"]
+    assert infos[-1].data["checkpoint_hits"] == 0
@@ -0,0 +1,157 @@
+import json
+from typing import Any, Dict, Optional, Tuple
+
+import pytest
+from ragnarok_core.exceptions import InvalidPipelineError
+from ragnarok_core.pipeline.pipeline_entity import PipelineEntity
+from ragnarok_toolkit.component import (
+    ComponentInputTypeOption,
+    ComponentIOType,
+    ComponentOutputTypeOption,
+    RagnarokComponent,
+)
+
+executed = []
+
+
+class RouterComponent(RagnarokComponent):
+    DESCRIPTION = "route a query by its first word"
+    ENABLE_HINT_CHECK = True
+
+    @classmethod
+    def input_options(cls) -> Tuple[ComponentInputTypeOption, ...]:
+        return (ComponentInputTypeOption(name="text", allowed_types={ComponentIOType.STRING}, required=True),)
+
+    @classmethod
+    def output_options(cls) -> Tuple[ComponentOutputTypeOption, ...]:
+        return (
+            ComponentOutputTypeOption(name="intent", type=ComponentIOType.STRING),
+            ComponentOutputTypeOption(name="text", type=ComponentIOType.STRING),
+        )
+
+    @classmethod
+    def execute(cls, text: str) -> Dict[str, Any]:
+        return {"intent": text.split()[0], "text": text}
+
+
+class TagComponent(RagnarokComponent):
+    DESCRIPTION = "tag the text by the node that ran"
+    ENABLE_HINT_CHECK = True
+
+    @classmethod
+    def input_options(cls) -> Tuple[ComponentInputTypeOption, ...]:
+        return (ComponentInputTypeOption(name="text", allowed_types={ComponentIOType.STRING}, required=True),)
+
+    @classmethod
+    def output_options(cls) -> Tuple[ComponentOutputTypeOption, ...]:
+        return (ComponentOutputTypeOption(name="text", type=ComponentIOType.STRING),)
+
+    @classmethod
+    def execute(cls, text: str) -> Dict[str, Any]:
+        executed.append(text)
+        return {"text": f"[{text}]"}
+
+
+class AnswerComponent(TagComponent):
+    DESCRIPTION = "merge the branches, whichever is taken"
+
+    @classmethod
+    def input_options(cls) -> Tuple[ComponentInputTypeOption, ...]:
+        return (ComponentInputTypeOption(name="text", allowed_types={ComponentIOType.STRING}, required=False),)
+
+    @classmethod
+    def execute(cls, text: Optional[str]) -> Dict[str, Any]:
+        return {"text": f"answer {text}"}
+
+
+def connect(from_node_id: str, to_node_id: str, intent: Optional[str] = None) -> Dict[str, Any]:
+    connection = {
+        "from_node_id": from_node_id,
+        "from_output_name": "text",
+        "to_node_id": to_node_id,
+        "to_node_input_name": "text",
+    }
+    if intent is not None:
+        connection["condition"] = {"output_name": "intent", "value": intent}
+    return connection
+
+
+def build_pipeline(**overrides: Any) -> PipelineEntity:
+    # router -(search)-> search -> rerank -> answer, router -(chat)-> chat -> answer
+    data = {
+        "nodes": [
+            {"node_id": "router", "component": "RouterComponent", "position": None},
+            {"node_id": "search", "component": "TagComponent", "position": None},
+            {"node_id": "rerank", "component": "TagComponent", "position": None},
+            {"node_id": "chat", "component": "TagComponent", "position": None},
+            {"node_id": "answer", "component": "AnswerComponent", "position": None, "output_name": "res"},
+        ],
+        "connections": [
+            connect("router", "search", "search"),
+            connect("search", "rerank"),
+            connect("rerank", "answer"),
+            connect("router", "chat", "chat"),
+            connect("chat", "answer"),
+        ],
+        "inject_input_mapping": {"text": ["router", "text"]},
+    }
+    data.update(overrides)
+    return PipelineEntity.from_json_str(json.dumps(data))
+
+
+@pytest.fixture(autouse=True)
+def register_components():
+    from ragnarok_core.components import ComponentInfo, component_manager
+
+    for component in (RouterComponent, TagComponent, AnswerComponent):
+        component_manager.register_component(
+            ComponentInfo(name=component.__name__, is_official=False, component_class=component),
+            check_duplication=False,
+        )
+
+
+@pytest.mark.asyncio
+async def test_only_chosen_branch_runs():
+    pipeline = build_pipeline()
+    assert json.loads(pipeline.to_json_str())["connections"][0]["condition"] == {
+        "output_name": "intent",
+        "value": "search",
+    }
+
+    executed.clear()
+    infos = [info async for info in pipeline.run_async(text="chat hello")]
+    assert executed == ["chat hello"]
+    assert sorted(info.node_id for info in infos if info.type == "skip_info") == ["rerank", "search"]
+    assert [info.data for info in infos if info.type == "output_info"] == [{"res": {"text": "answer [chat hello]"}}]
+    assert infos[-1].type == "end_info"
+
+    executed.clear()
+    infos = [info async for info in pipeline.run_async(text="search docs")]
+    assert executed == ["search docs", "[search docs]"]
+    assert [info.node_id for info in infos if info.type == "skip_info"] == ["chat"]
+
+
+@pytest.mark.asyncio
+async def test_no_branch_taken_skips_merge():
+    pipeline = build_pipeline()
+    infos = [info async for info in pipeline.run_async(text="other")]
+    assert sorted(info.node_id for info in infos if info.type == "skip_info") == ["answer", "chat", "rerank", "search"]
+    assert infos[-1].type == "end_info"
+
+
+@pytest.mark.asyncio
+async def test_batch_branches():
+    pipeline = build_pipeline()
+    results = [result async for result in pipeline.run_batch([{"text": "chat a"}, {"text": "search b"}, {"text": "x"}])]
+    assert [result.outputs for result in results] == [
+        {"res": {"text": "answer [chat a]"}},
+        {"res": {"text": "answer [[search b]]"}},
+        {},
+    ]
+
+
+def test_condition_on_missing_output():
+    connection = connect("router", "search")
+    connection["condition"] = {"output_name": "nope", "value": 1}
+    with pytest.raises(InvalidPipelineError, match="nope"):
+        build_pipeline(connections=[connection])
@@ -0,0 +1,115 @@
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+import pytest
+from ragnarok_core.pipeline.pipeline_entity import (
+    PipelineBatchResult,
+    PipelineEntity,
+    PipelineExecutionInfo,
+)
+from ragnarok_core.pipeline.pipeline_event import (
+    EventEncoding,
+    EventVerbosity,
+    available_encodings,
+    encode,
+    summarize,
+)
+from ragnarok_core.pipeline.pipeline_node import PipelineNode
+from ragnarok_toolkit.component import (
+    ComponentInputTypeOption,
+    ComponentIOType,
+    ComponentOutputTypeOption,
+    RagnarokComponent,
+)
+
+
+class FakeEmbeddingComponent(RagnarokComponent):
+    DESCRIPTION = "a large float list per text"
+    ENABLE_HINT_CHECK = True
+
+    @classmethod
+    def input_options(cls) -> Tuple[ComponentInputTypeOption, ...]:
+        return (ComponentInputTypeOption(name="text", allowed_types={ComponentIOType.STRING}, required=False),)
+
+    @classmethod
+    def output_options(cls) -> Tuple[ComponentOutputTypeOption, ...]:
+        return (ComponentOutputTypeOption(name="vector", type=ComponentIOType.FLOAT_LIST),)
+
+    @classmethod
+    def execute(cls, text: Optional[str]) -> Dict[str, Any]:
+        return {"vector": [0.5] * 1024}
+
+
+def build_pipeline() -> PipelineEntity:
+    return PipelineEntity(
+        {
+            "1": PipelineNode(
+                node_id="1",
+                component=FakeEmbeddingComponent,
+                forward_node_info=(
+                    PipelineNode.NodeConnection(
+                        from_node_id="1", from_node_output_name="vector", to_node_id="2", to_node_input_name="text"
+                    ),
+                ),
+            ),
+            "2": PipelineNode(node_id="2", component=FakeEmbeddingComponent, forward_node_info=(), output_name="res"),
+        },
+        {"text": ("1", "text")},
+    )
+
+
+def test_summarize():
+    assert summarize("a" * 10, max_chars=4) == "aaaa...(+6 chars)"
+    assert summarize(b"abc") == "<3 bytes>"
+    assert summarize(list(range(5)), max_items=2) == [0, 1, "...(+3 items)"]
+    assert summarize({"a": [[1.0] * 3] * 3, "b": 1, "c": 2}, max_items=2) == {
+        "a": [[1.0, 1.0, "...(+1 items)"], [1.0, 1.0, "...(+1 items)"], "...(+1 items)"],
+        "b": 1,
+        "...": "+1 keys",
+    }
+
+
+@pytest.mark.parametrize("encoding", [encoding for encoding in available_encodings() if encoding != "msgpack"])
+def test_encode_json(encoding: EventEncoding):
+    info = PipelineExecutionInfo("1", "process_info", {"text": b"abc", "raw": b"\xff", "vector": [0.5]})
+    decoded = json.loads(info.encode(encoding))
+    assert decoded["data"] == {"text": {"__bytes__": "YWJj"}, "raw": {"__bytes__": "/w=="}, "vector": [0.5]}
+    assert decoded["node_id"] == "1"
+    # the node data is shared, not copied
+    assert info.to_dict()["data"] is info.data
+
+
+def test_encode_msgpack():
+    msgpack = pytest.importorskip("msgpack")
+    assert msgpack.unpackb(encode({"text": b"abc", "raw": b"\xff"}, EventEncoding.MSGPACK)) == {
+        "text": b"abc",
+        "raw": b"\xff",
+    }
+
+
+def test_encode_batch_result():
+    # the rows of a batched run tag their bytes like the events
+    result = PipelineBatchResult(0, {"res": {"raw": b"\xff"}})
+    assert json.loads(result.to_json())["outputs"] == {"res": {"raw": {"__bytes__": "/w=="}}}
+
+
+@pytest.mark.asyncio
+async def test_verbosity():
+    pipeline = build_pipeline()
+
+    async def run(verbosity: EventVerbosity) -> List[PipelineExecutionInfo]:
+        return [info async for info in pipeline.run_async(text="x", verbosity=verbosity)]
+
+    infos = await run(EventVerbosity.OUTPUTS)
+    assert [info.type for info in infos] == ["output_info", "end_info"]
+    assert len(infos[0].data["res"]["vector"]) == 1024
+
+    infos = await run(EventVerbosity.SUMMARY)
+    process_infos = [info for info in infos if info.type == "process_info"]
+    assert len(process_infos) == 2
+    assert len(process_infos[0].data["vector"]) == 9
+    # the output node still reports its whole outputs
+    assert [len(info.data["res"]["vector"]) for info in infos if info.type == "output_info"] == [1024]
+
+    infos = await run(EventVerbosity.FULL)
+    assert [len(info.data["vector"]) for info in infos if info.type == "process_info"] == [1024, 1024]
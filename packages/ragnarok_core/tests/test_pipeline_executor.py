@@ -0,0 +1,86 @@
+import os
+import threading
+from typing import Any, Dict, Tuple
+
+import pytest
+from ragnarok_core.pipeline.pipeline_entity import PipelineEntity
+from ragnarok_core.pipeline.pipeline_executor import ComponentExecutor
+from ragnarok_core.pipeline.pipeline_node import PipelineNode
+from ragnarok_toolkit.component import (
+    ComponentExecutionClass,
+    ComponentInputTypeOption,
+    ComponentIOType,
+    ComponentOutputTypeOption,
+    RagnarokComponent,
+)
+
+
+class WhereComponent(RagnarokComponent):
+    DESCRIPTION = "report where it is executed"
+    ENABLE_HINT_CHECK = True
+
+    @classmethod
+    def input_options(cls) -> Tuple[ComponentInputTypeOption, ...]:
+        return ()
+
+    @classmethod
+    def output_options(cls) -> Tuple[ComponentOutputTypeOption, ...]:
+        return (
+            ComponentOutputTypeOption(name="thread", type=ComponentIOType.STRING),
+            ComponentOutputTypeOption(name="pid", type=ComponentIOType.INT),
+        )
+
+    @classmethod
+    def execute(cls) -> Dict[str, Any]:
+        return {"thread": threading.current_thread().name, "pid": os.getpid()}
+
+
+class ThreadWhereComponent(WhereComponent):
+    EXECUTION_CLASS = ComponentExecutionClass.THREAD
+
+
+class AsyncThreadWhereComponent(WhereComponent):
+    EXECUTION_CLASS = ComponentExecutionClass.THREAD
+
+    @classmethod
+    async def execute(cls) -> Dict[str, Any]:
+        return {"thread": threading.current_thread().name, "pid": os.getpid()}
+
+
+class ProcessWhereComponent(WhereComponent):
+    EXECUTION_CLASS = ComponentExecutionClass.PROCESS
+
+
+@pytest.mark.asyncio
+async def test_dispatch_by_execution_class():
+    executor = ComponentExecutor(thread_pool_size=2, process_pool_size=1)
+    try:
+        inline_res = await executor.execute(WhereComponent, {})
+        assert inline_res["thread"] == threading.current_thread().name
+
+        for component in (ThreadWhereComponent, AsyncThreadWhereComponent):
+            thread_res = await executor.execute(component, {})
+            assert thread_res["thread"].startswith("ragnarok-component")
+            assert thread_res["pid"] == os.getpid()
+
+        process_res = await executor.execute(ProcessWhereComponent, {})
+        assert process_res["pid"] != os.getpid()
+    finally:
+        executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_pipeline_offloads_node():
+    executor = ComponentExecutor(thread_pool_size=1, process_pool_size=1)
+    pipeline = PipelineEntity(
+        {"1": PipelineNode(node_id="1", component=ThreadWhereComponent, forward_node_info=(), output_name="where")},
+        {},
+        executor=executor,
+    )
+    outputs = {}
+    async for info in pipeline.run_async():
+        if info.type == "output_info":
+            outputs.update(info.data)
+    executor.shutdown()
+
+    assert outputs["where"]["thread"].startswith("ragnarok-component")
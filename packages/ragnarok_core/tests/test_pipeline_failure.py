@@ -0,0 +1,116 @@
+import asyncio
+from typing import Any, Dict, Optional, Tuple
+
+import pytest
+from ragnarok_core.components.official_components.test_component import TestComponent3
+from ragnarok_core.pipeline.pipeline_entity import PipelineEntity
+from ragnarok_core.pipeline.pipeline_node import PipelineNode
+from ragnarok_toolkit.component import (
+    ComponentInputTypeOption,
+    ComponentIOType,
+    ComponentOutputTypeOption,
+    RagnarokComponent,
+)
+
+cancelled_nodes = []
+
+
+class FailComponent(RagnarokComponent):
+    DESCRIPTION = "always raise"
+    ENABLE_HINT_CHECK = True
+
+    @classmethod
+    def input_options(cls) -> Tuple[ComponentInputTypeOption, ...]:
+        return ()
+
+    @classmethod
+    def output_options(cls) -> Tuple[ComponentOutputTypeOption, ...]:
+        return (ComponentOutputTypeOption(name="out", type=ComponentIOType.STRING),)
+
+    @classmethod
+    def execute(cls) -> Dict[str, Any]:
+        raise RuntimeError("boom")
+
+
+class HangComponent(RagnarokComponent):
+    DESCRIPTION = "sleep for a long time"
+    ENABLE_HINT_CHECK = True
+
+    @classmethod
+    def input_options(cls) -> Tuple[ComponentInputTypeOption, ...]:
+        return (ComponentInputTypeOption(name="tag", allowed_types={ComponentIOType.STRING}, required=False),)
+
+    @classmethod
+    def output_options(cls) -> Tuple[ComponentOutputTypeOption, ...]:
+        return (ComponentOutputTypeOption(name="out", type=ComponentIOType.STRING),)
+
+    @classmethod
+    async def execute(cls, tag: Optional[str]) -> Dict[str, Any]:
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled_nodes.append(tag)
+            raise
+        return {"out": tag}
+
+
+class QuickTimeoutComponent(HangComponent):
+    EXECUTION_TIMEOUT = 0.05
+
+
+def single_node_pipeline(component) -> PipelineEntity:
+    return PipelineEntity(
+        {"1": PipelineNode(node_id="1", component=component, forward_node_info=())}, {"tag": ("1", "tag")}
+    )
+
+
+@pytest.mark.asyncio
+async def test_fail_fast():
+    pipeline = PipelineEntity(
+        {
+            "fail": PipelineNode(node_id="fail", component=FailComponent, forward_node_info=()),
+            "hang": PipelineNode(node_id="hang", component=HangComponent, forward_node_info=()),
+        },
+        {"tag": ("hang", "tag")},
+    )
+    cancelled_nodes.clear()
+
+    infos = [info async for info in pipeline.run_async(tag="hang")]
+    assert [info.type for info in infos] == ["error_info"]
+    assert infos[0].node_id == "fail"
+    assert infos[0].data["error_type"] == "RuntimeError"
+    assert cancelled_nodes == ["hang"]
+
+
+@pytest.mark.asyncio
+async def test_node_timeout():
+    cancelled_nodes.clear()
+    infos = [info async for info in single_node_pipeline(QuickTimeoutComponent).run_async(tag="timeout")]
+    assert infos[-1].type == "error_info"
+    assert infos[-1].data["error_type"] == "TimeoutError"
+    assert cancelled_nodes == ["timeout"]
+
+
+@pytest.mark.asyncio
+async def test_run_timeout():
+    infos = [info async for info in single_node_pipeline(HangComponent).run_async(tag="run", run_timeout=0.05)]
+    assert infos[-1].type == "error_info"
+    assert "timed out" in infos[-1].data["error"]
+
+
+@pytest.mark.asyncio
+async def test_consumer_close_cancels_nodes():
+    pipeline = PipelineEntity(
+        {
+            "fast": PipelineNode(node_id="fast", component=TestComponent3, forward_node_info=()),
+            "hang": PipelineNode(node_id="hang", component=HangComponent, forward_node_info=()),
+        },
+        {"tag": ("hang", "tag"), "text": ("fast", "component3_input_1")},
+    )
+    cancelled_nodes.clear()
+
+    gen = pipeline.run_async(tag="closed", text="text")
+    first = await gen.__anext__()
+    assert (first.node_id, first.type) == ("fast", "process_info")
+    await gen.aclose()
+    assert cancelled_nodes == ["closed"]
@@ -0,0 +1,88 @@
+import asyncio
+from typing import Any, Dict, Tuple
+
+import pytest
+from ragnarok_core.pipeline.pipeline_entity import PipelineEntity
+from ragnarok_core.pipeline.pipeline_event import EventVerbosity
+from ragnarok_core.pipeline.pipeline_node import PipelineNode
+from ragnarok_toolkit.component import (
+    ComponentInputTypeOption,
+    ComponentIOType,
+    ComponentOutputTypeOption,
+    RagnarokComponent,
+)
+
+tasks = []
+
+
+class AppendComponent(RagnarokComponent):
+    DESCRIPTION = "append a character, recording the task it runs in"
+    ENABLE_HINT_CHECK = True
+    LIGHTWEIGHT = True
+
+    @classmethod
+    def input_options(cls) -> Tuple[ComponentInputTypeOption, ...]:
+        return (ComponentInputTypeOption(name="text", allowed_types={ComponentIOType.STRING}, required=True),)
+
+    @classmethod
+    def output_options(cls) -> Tuple[ComponentOutputTypeOption, ...]:
+        return (ComponentOutputTypeOption(name="text", type=ComponentIOType.STRING),)
+
+    @classmethod
+    def execute(cls, text: str) -> Dict[str, Any]:
+        tasks.append(asyncio.current_task())
+        return {"text": text + "a"}
+
+
+class HeavyAppendComponent(AppendComponent):
+    DESCRIPTION = "same, not lightweight"
+    LIGHTWEIGHT = False
+
+
+def build_pipeline(*components: type, **kwargs: Any) -> PipelineEntity:
+    """a chain of the components, the last one is the output node"""
+    node_map = {}
+    for index, component in enumerate(components):
+        forward_node_info = ()
+        if index < len(components) - 1:
+            forward_node_info = (
+                PipelineNode.NodeConnection(
+                    from_node_id=str(index),
+                    from_node_output_name="text",
+                    to_node_id=str(index + 1),
+                    to_node_input_name="text",
+                ),
+            )
+        node_map[str(index)] = PipelineNode(
+            node_id=str(index),
+            component=component,
+            forward_node_info=forward_node_info,
+            output_name="res" if index == len(components) - 1 else None,
+        )
+    return PipelineEntity(node_map, {"text": ("0", "text")}, **kwargs)
+
+
+def test_fusion_plan():
+    pipeline = build_pipeline(AppendComponent, AppendComponent, HeavyAppendComponent, AppendComponent, AppendComponent)
+    assert pipeline.fused_next == (1, None, None, 4, None)
+    assert build_pipeline(AppendComponent, AppendComponent, fuse=False).fused_next == (None, None)
+
+
+@pytest.mark.asyncio
+async def test_fused_chain_runs_in_one_step():
+    pipeline = build_pipeline(AppendComponent, AppendComponent, AppendComponent)
+    tasks.clear()
+    infos = [info async for info in pipeline.run_async(text="")]
+    assert len(set(tasks)) == 1
+    assert [info.node_id for info in infos if info.type == "process_info"] == ["0", "1", "2"]
+    assert [info.data for info in infos if info.type == "output_info"] == [{"res": {"text": "aaa"}}]
+
+    # the dropped process_info of the inner nodes are not emitted at all
+    infos = [info async for info in pipeline.run_async(text="", verbosity=EventVerbosity.OUTPUTS)]
+    assert [info.type for info in infos] == ["output_info", "end_info"]
+
+    tasks.clear()
+    unfused = build_pipeline(AppendComponent, AppendComponent, AppendComponent, fuse=False)
+    infos = [info async for info in unfused.run_async(text="")]
+    assert len(set(tasks)) == 3
+    assert [info.data for info in infos if info.type == "output_info"] == [{"res": {"text": "aaa"}}]
@@ -0,0 +1,93 @@
+import asyncio
+from typing import AsyncGenerator
+
+import pytest
+from ragnarok_core.pipeline.pipeline_entity import PipelineExecutionInfo
+from ragnarok_core.pipeline.pipeline_job import (
+    EventRingBuffer,
+    JobStatus,
+    PipelineJobManager,
+)
+
+
+async def fake_run(num: int, gate: asyncio.Event, fail: bool = False) -> AsyncGenerator[PipelineExecutionInfo, None]:
+    for index in range(num):
+        if index == 1:
+            await gate.wait()
+        yield PipelineExecutionInfo(str(index), "process_info", {"index": index})
+    if fail:
+        yield PipelineExecutionInfo("", "error_info", {"error": "boom"})
+    else:
+        yield PipelineExecutionInfo("", "end_info", {})
+
+
+def test_ring_buffer():
+    buffer = EventRingBuffer(3)
+    for index in range(5):
+        buffer.append(PipelineExecutionInfo(str(index), "process_info", {}))
+    assert (buffer.start_offset, buffer.end_offset) == (2, 5)
+    assert [(offset, event.node_id) for offset, event in buffer.read(0)] == [(2, "2"), (3, "3"), (4, "4")]
+    assert [offset for offset, _ in buffer.read(4)] == [4]
+    assert buffer.read(5) == []
+
+
+@pytest.mark.asyncio
+async def test_job_detach_and_reattach():
+    manager = PipelineJobManager(worker_num=1, buffer_size=16)
+    gate = asyncio.Event()
+    job = manager.submit(fake_run(3, gate))
+    assert manager.get(job.job_id) is job
+
+    # a reader follows the run, then drops after the first event
+    async for offset, event in job.events():
+        assert (offset, event.node_id) == (0, "0")
+        break
+    assert job.status == JobStatus.RUNNING
+
+    gate.set()
+    # another reader reconnects from the next offset and follows the run to its end
+    events = [(offset, event.type) async for offset, event in job.events(1)]
+    assert events == [(1, "process_info"), (2, "process_info"), (3, "end_info")]
+    assert job.status == JobStatus.SUCCEEDED
+    assert job.to_dict()["end_offset"] == 4
+    await manager.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_job_failure_and_cancel():
+    manager = PipelineJobManager(worker_num=1, buffer_size=2)
+    gate = asyncio.Event()
+    gate.set()
+    failed = manager.submit(fake_run(3, gate, fail=True))
+    blocked = manager.submit(fake_run(3, asyncio.Event()))
+    pending = manager.submit(fake_run(3, gate))
+
+    # the events beyond the buffer size are dropped
+    assert [offset async for offset, _ in failed.events()] == [2, 3]
+    assert (failed.status, failed.error) == (JobStatus.FAILED, "boom")
+
+    # the single worker is busy with the blocked job, the last one is still pending
+    async for _ in blocked.events():
+        break
+    assert pending.status == JobStatus.PENDING
+    assert await manager.cancel(pending.job_id)
+    assert await manager.cancel(blocked.job_id)
+    assert [event async for event in pending.events()] == []
+    assert [offset async for offset, _ in blocked.events(1)] == []
+    assert (blocked.status, pending.status) == (JobStatus.CANCELLED, JobStatus.CANCELLED)
+    assert not await manager.cancel("missing")
+    await manager.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_job_owned_by_principal():
+    manager = PipelineJobManager(worker_num=1, buffer_size=16)
+    job = manager.submit(fake_run(3, asyncio.Event()), principal="user:1")
+    assert manager.get(job.job_id, "user:1") is job
+    assert manager.get(job.job_id) is job
+    # the job is not found by the other principals
+    assert manager.get(job.job_id, "user:2") is None
+    assert not await manager.cancel(job.job_id, "anonymous:10.0.0.1")
+    assert job.status != JobStatus.CANCELLED
+    assert await manager.cancel(job.job_id, "user:1")
+    await manager.shutdown()
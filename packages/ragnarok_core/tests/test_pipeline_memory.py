@@ -0,0 +1,223 @@
+import tracemalloc
+from typing import Any, Dict, List, Tuple, Type
+
+import pytest
+from ragnarok_core.pipeline.pipeline_entity import PipelineEntity
+from ragnarok_core.pipeline.pipeline_event import EventVerbosity
+from ragnarok_core.pipeline.pipeline_node import PipelineNode
+from ragnarok_toolkit.component import (
+    ComponentInputTypeOption,
+    ComponentIOType,
+    ComponentOutputTypeOption,
+    RagnarokComponent,
+)
+
+
+class ReadComponent(RagnarokComponent):
+    DESCRIPTION = "read a large file"
+    ENABLE_HINT_CHECK = True
+
+    @classmethod
+    def input_options(cls) -> Tuple[ComponentInputTypeOption, ...]:
+        return (ComponentInputTypeOption(name="size", allowed_types={ComponentIOType.INT}, required=True),)
+
+    @classmethod
+    def output_options(cls) -> Tuple[ComponentOutputTypeOption, ...]:
+        return (ComponentOutputTypeOption(name="data", type=ComponentIOType.BYTES),)
+
+    @classmethod
+    def execute(cls, size: int) -> Dict[str, Any]:
+        return {"data": b"x" * size}
+
+
+class SplitComponent(RagnarokComponent):
+    DESCRIPTION = "split the data in halves"
+    ENABLE_HINT_CHECK = True
+
+    @classmethod
+    def input_options(cls) -> Tuple[ComponentInputTypeOption, ...]:
+        return (ComponentInputTypeOption(name="data", allowed_types={ComponentIOType.BYTES}, required=True),)
+
+    @classmethod
+    def output_options(cls) -> Tuple[ComponentOutputTypeOption, ...]:
+        return (ComponentOutputTypeOption(name="parts", type=ComponentIOType.BYTES_LIST),)
+
+    @classmethod
+    def execute(cls, data: bytes) -> Dict[str, Any]:
+        half = len(data) // 2
+        return {"parts": [data[:half], data[half:]]}
+
+
+class JoinComponent(RagnarokComponent):
+    DESCRIPTION = "join the parts back, report the size"
+    ENABLE_HINT_CHECK = True
+
+    @classmethod
+    def input_options(cls) -> Tuple[ComponentInputTypeOption, ...]:
+        return (ComponentInputTypeOption(name="parts", allowed_types={ComponentIOType.BYTES_LIST}, required=True),)
+
+    @classmethod
+    def output_options(cls) -> Tuple[ComponentOutputTypeOption, ...]:
+        return (ComponentOutputTypeOption(name="num", type=ComponentIOType.INT),)
+
+    @classmethod
+    def execute(cls, parts: List[bytes]) -> Dict[str, Any]:
+        return {"num": len(b"".join(parts))}
+
+
+class CountComponent(RagnarokComponent):
+    DESCRIPTION = "count the parts"
+    ENABLE_HINT_CHECK = True
+
+    @classmethod
+    def input_options(cls) -> Tuple[ComponentInputTypeOption, ...]:
+        return (ComponentInputTypeOption(name="parts", allowed_types={ComponentIOType.BYTES_LIST}, required=True),)
+
+    @classmethod
+    def output_options(cls) -> Tuple[ComponentOutputTypeOption, ...]:
+        return (ComponentOutputTypeOption(name="num", type=ComponentIOType.INT),)
+
+    @classmethod
+    def execute(cls, parts: List[bytes]) -> Dict[str, Any]:
+        return {"num": len(parts)}
+
+
+class CompareComponent(RagnarokComponent):
+    DESCRIPTION = "compare the data with its parts"
+    ENABLE_HINT_CHECK = True
+
+    @classmethod
+    def input_options(cls) -> Tuple[ComponentInputTypeOption, ...]:
+        return (
+            ComponentInputTypeOption(name="data", allowed_types={ComponentIOType.BYTES}, required=True),
+            ComponentInputTypeOption(name="parts", allowed_types={ComponentIOType.BYTES_LIST}, required=True),
+        )
+
+    @classmethod
+    def output_options(cls) -> Tuple[ComponentOutputTypeOption, ...]:
+        return (ComponentOutputTypeOption(name="same", type=ComponentIOType.INT),)
+
+    @classmethod
+    def execute(cls, data: bytes, parts: List[bytes]) -> Dict[str, Any]:
+        return {"same": int(data == b"".join(parts))}
+
+
+def build_pipeline(last: Type[RagnarokComponent] = CountComponent) -> PipelineEntity:
+    # read -> split -> count
+    return PipelineEntity(
+        {
+            "read": PipelineNode(
+                node_id="read",
+                component=ReadComponent,
+                forward_node_info=(
+                    PipelineNode.NodeConnection(
+                        from_node_id="read", from_node_output_name="data", to_node_id="split", to_node_input_name="data"
+                    ),
+                ),
+            ),
+            "split": PipelineNode(
+                node_id="split",
+                component=SplitComponent,
+                forward_node_info=(
+                    PipelineNode.NodeConnection(
+                        from_node_id="split",
+                        from_node_output_name="parts",
+                        to_node_id="count",
+                        to_node_input_name="parts",
+                    ),
+                ),
+            ),
+            "count": PipelineNode(node_id="count", component=last, forward_node_info=(), output_name="res"),
+        },
+        {"size": ("read", "size")},
+    )
+
+
+@pytest.mark.asyncio
+async def test_peak_output_bytes_estimate():
+    pipeline = build_pipeline()
+    infos = [info async for info in pipeline.run_async(size=1000, trace=True)]
+    trace = next(info for info in infos if info.type == "trace_info").data["trace"]
+    assert {span["node_id"]: span["output_bytes"] for span in trace["spans"]} == {
+        "read": 1000,
+        "split": 1000,
+        "count": 8,
+    }
+    # the data is released once split has read it, before the parts are made
+    assert trace["peak_output_bytes_estimate"] == 1000
+
+
+@pytest.mark.asyncio
+async def test_peak_output_bytes_estimate_with_skipped_branch():
+    # read -> split -> count, and read -> compare <- split, whose parts are never passed on
+    pipeline = PipelineEntity(
+        {
+            "read": PipelineNode(
+                node_id="read",
+                component=ReadComponent,
+                forward_node_info=(
+                    PipelineNode.NodeConnection(
+                        from_node_id="read", from_node_output_name="data", to_node_id="split", to_node_input_name="data"
+                    ),
+                    PipelineNode.NodeConnection(
+                        from_node_id="read",
+                        from_node_output_name="data",
+                        to_node_id="compare",
+                        to_node_input_name="data",
+                    ),
+                ),
+            ),
+            "split": PipelineNode(
+                node_id="split",
+                component=SplitComponent,
+                forward_node_info=(
+                    PipelineNode.NodeConnection(
+                        from_node_id="split",
+                        from_node_output_name="parts",
+                        to_node_id="count",
+                        to_node_input_name="parts",
+                    ),
+                    PipelineNode.NodeConnection(
+                        from_node_id="split",
+                        from_node_output_name="parts",
+                        to_node_id="compare",
+                        to_node_input_name="parts",
+                        condition_output_name="parts",
+                        condition_value=None,
+                    ),
+                ),
+            ),
+            "count": PipelineNode(node_id="count", component=CountComponent, forward_node_info=(), output_name="res"),
+            "compare": PipelineNode(node_id="compare", component=CompareComponent, forward_node_info=()),
+        },
+        {"size": ("read", "size")},
+    )
+    # not traced, the peak is reported by the end_info of every run
+    infos = [info async for info in pipeline.run_async(size=1000)]
+    assert [info.node_id for info in infos if info.type == "skip_info"] == ["compare"]
+    # the data written into the skipped node is released along with it, before the parts are made
+    assert infos[-1].type == "end_info"
+    assert infos[-1].data["peak_output_bytes_estimate"] == 1000
+
+
+@pytest.mark.asyncio
+async def test_outputs_verbosity():
+    pipeline = build_pipeline()
+    infos = [info async for info in pipeline.run_async(size=1000, verbosity=EventVerbosity.OUTPUTS)]
+    assert [info.data for info in infos if info.type == "output_info"] == [{"res": {"num": 2}}]
+
+
+@pytest.mark.asyncio
+async def test_peak_memory():
+    pipeline = build_pipeline(JoinComponent)
+    size = 8 * 1024 * 1024
+    tracemalloc.start()
+    try:
+        infos = [info async for info in pipeline.run_async(size=size, verbosity=EventVerbosity.OUTPUTS)]
+        _, peak_bytes = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert [info.data for info in infos if info.type == "output_info"] == [{"res": {"num": size}}]
+    # measured rather than estimated, the data is freed before the parts are joined,
+    # so at most two copies of the payload are alive at a time rather than three
+    assert peak_bytes < 2.5 * size
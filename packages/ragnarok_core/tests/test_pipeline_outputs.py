@@ -0,0 +1,84 @@
+from typing import Any, Dict, Optional, Tuple
+
+import pytest
+from ragnarok_core.pipeline.pipeline_entity import PipelineEntity
+from ragnarok_core.pipeline.pipeline_node import PipelineNode
+from ragnarok_toolkit.component import (
+    ComponentInputTypeOption,
+    ComponentIOType,
+    ComponentOutputTypeOption,
+    RagnarokComponent,
+)
+
+executed = []
+
+
+class AppendComponent(RagnarokComponent):
+    DESCRIPTION = "append a letter to the text"
+    ENABLE_HINT_CHECK = True
+
+    @classmethod
+    def input_options(cls) -> Tuple[ComponentInputTypeOption, ...]:
+        return (ComponentInputTypeOption(name="text", allowed_types={ComponentIOType.STRING}, required=False),)
+
+    @classmethod
+    def output_options(cls) -> Tuple[ComponentOutputTypeOption, ...]:
+        return (ComponentOutputTypeOption(name="text", type=ComponentIOType.STRING),)
+
+    @classmethod
+    def execute(cls, text: Optional[str]) -> Dict[str, Any]:
+        executed.append(text)
+        return {"text": (text or "") + "a"}
+
+
+def node(node_id: str, *to_node_ids: str, output_name: Optional[str] = None) -> PipelineNode:
+    return PipelineNode(
+        node_id=node_id,
+        component=AppendComponent,
+        forward_node_info=tuple(
+            PipelineNode.NodeConnection(
+                from_node_id=node_id, from_node_output_name="text", to_node_id=to_node_id, to_node_input_name="text"
+            )
+            for to_node_id in to_node_ids
+        ),
+        output_name=output_name,
+    )
+
+
+def build_pipeline() -> PipelineEntity:
+    # 1 -> 2 -> 3 (answer_res), 1 -> 4 (side_res)
+    return PipelineEntity(
+        {
+            "1": node("1", "2", "4"),
+            "2": node("2", "3"),
+            "3": node("3", output_name="answer_res"),
+            "4": node("4", output_name="side_res"),
+        },
+        {"text": ("1", "text")},
+    )
+
+
+@pytest.mark.asyncio
+async def test_requested_outputs_only():
+    pipeline = build_pipeline()
+    assert pipeline.select_nodes(["answer_res"]) == (True, True, True, False)
+
+    executed.clear()
+    infos = [info async for info in pipeline.run_async(text="", outputs=["answer_res"])]
+    assert [info.node_id for info in infos if info.type == "process_info"] == ["1", "2", "3"]
+    assert [info.data for info in infos if info.type == "output_info"] == [{"answer_res": {"text": "aaa"}}]
+    assert infos[-1].type == "end_info"
+    assert len(executed) == 3
+
+    results = [result async for result in pipeline.run_batch([{"text": ""}], outputs=["side_res"])]
+    assert results[0].outputs == {"side_res": {"text": "aa"}}
+
+
+@pytest.mark.asyncio
+async def test_all_outputs_by_default():
+    pipeline = build_pipeline()
+    infos = [info async for info in pipeline.run_async(text="")]
+    assert sorted(info.node_id for info in infos if info.type == "process_info") == ["1", "2", "3", "4"]
+
+    with pytest.raises(ValueError, match="no_res"):
+        pipeline.select_nodes(["no_res"])
@@ -0,0 +1,73 @@
+import json
+from contextlib import aclosing
+from typing import AsyncGenerator
+
+import pytest
+from ragnarok_core.pipeline.pipeline_entity import PipelineEntity, PipelineExecutionInfo
+from ragnarok_core.pipeline.result_cache import ResultCache
+
+
+async def fake_run(fail: bool = False) -> AsyncGenerator[PipelineExecutionInfo, None]:
+    yield PipelineExecutionInfo("1", "output_info", {"res": "answer"})
+    yield PipelineExecutionInfo("1", "process_info", {"text": "answer"})
+    if fail:
+        yield PipelineExecutionInfo("", "error_info", {"error": "boom"})
+    else:
+        yield PipelineExecutionInfo("", "end_info", {})
+
+
+def test_key():
+    assert ResultCache.key("h", {"a": 1, "b": 2}, verbosity="full") == ResultCache.key(
+        "h", {"b": 2, "a": 1}, verbosity="full"
+    )
+    assert ResultCache.key("h", {"a": 1}) != ResultCache.key("h", {"a": 2})
+    assert ResultCache.key("h", {"a": 1}) != ResultCache.key("g", {"a": 1})
+    assert ResultCache.key("h", {"a": 1}, verbosity="full") != ResultCache.key("h", {"a": 1}, verbosity="summary")
+    assert ResultCache.key("h", {"a": object()}) is None
+
+
+@pytest.mark.asyncio
+async def test_record_and_replay():
+    cache = ResultCache(maxsize=4, ttl=60)
+    events = [event async for event in cache.record("k", fake_run(), frozenset({"res"}))]
+    assert cache.get("k") is not None
+
+    replayed = [event async for event in cache.replay(cache.get("k"))]
+    assert [(event.node_id, event.type, event.data) for event in replayed[:-1]] == [
+        (event.node_id, event.type, event.data) for event in events[:-1]
+    ]
+    assert replayed[-1].data == {"result_cache_hit": True}
+    assert cache.stats() == {"size": 1, "hits": 2, "misses": 0}
+
+    # failed runs are not cached
+    _ = [event async for event in cache.record("failed", fake_run(fail=True), frozenset({"res"}))]
+    assert cache.get("failed") is None
+
+
+@pytest.mark.asyncio
+async def test_record_closed_after_answer():
+    cache = ResultCache(maxsize=4, ttl=60)
+    # closed right after the answer, the rest of the run is drained and cached
+    async with aclosing(cache.record("answered", fake_run(), frozenset({"res"}))) as events:
+        async for event in events:
+            assert event.type == "output_info"
+            break
+    assert [event[1] for event in cache.get("answered")] == ["output_info", "process_info", "end_info"]
+
+    # closed before all the outputs are reported, nothing is cached
+    async with aclosing(cache.record("partial", fake_run(), frozenset({"res", "other_res"}))) as events:
+        async for _ in events:
+            break
+    assert cache.get("partial") is None
+
+
+def test_cache_results_flag():
+    data = {
+        "nodes": [{"node_id": "1", "component": "StrComponent", "position": None, "output_name": "res"}],
+        "connections": [],
+        "inject_input_mapping": {"text": ["1", "input"]},
+    }
+    assert not PipelineEntity.from_json_str(json.dumps(data)).cache_results
+    pipeline = PipelineEntity.from_json_str(json.dumps({**data, "cache_results": True}))
+    assert pipeline.cache_results
+    assert json.loads(pipeline.to_json_str())["cache_results"] is True
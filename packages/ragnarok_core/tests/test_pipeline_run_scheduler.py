@@ -0,0 +1,60 @@
+import asyncio
+from typing import AsyncGenerator, List
+
+import pytest
+from ragnarok_core.pipeline.run_scheduler import RunLane, RunScheduler
+
+
+async def fake_run(name: str, order: List[str]) -> AsyncGenerator[str, None]:
+    order.append(name)
+    await asyncio.sleep(0.01)
+    yield name
+
+
+@pytest.mark.asyncio
+async def test_fair_across_principals():
+    scheduler = RunScheduler(max_runs=1, max_runs_per_principal=1)
+    order: List[str] = []
+
+    async def consume(name: str, principal: str, lane: RunLane = RunLane.BATCH) -> None:
+        async for _ in scheduler.admit(fake_run(name, order), principal, lane):
+            pass
+
+    # the bulk principal queues its runs first
+    tasks = [asyncio.create_task(consume(f"bulk_{i}", "bulk")) for i in range(4)]
+    await asyncio.sleep(0)
+    tasks.append(asyncio.create_task(consume("other", "other")))
+    tasks.append(asyncio.create_task(consume("chat", "bulk", RunLane.INTERACTIVE)))
+    await asyncio.gather(*tasks)
+
+    # the interactive run weighs more, it goes first, then the other principal, ahead of the queued bulk runs
+    assert order[:3] == ["bulk_0", "chat", "other"]
+    stats = scheduler.stats()
+    assert (stats["running_num"], stats["queue_depth"]) == (0, 0)
+    assert stats["wait_time_p99"] > 0
+
+
+@pytest.mark.asyncio
+async def test_per_principal_run_limit_and_close():
+    scheduler = RunScheduler(max_runs=4, max_runs_per_principal=1)
+    gate = asyncio.Event()
+
+    async def blocked_run() -> AsyncGenerator[int, None]:
+        yield 0
+        await gate.wait()
+        yield 1
+
+    first = scheduler.admit(blocked_run(), "user:1")
+    assert await first.__anext__() == 0
+    second = asyncio.create_task(scheduler.admit(blocked_run(), "user:1").__anext__())
+    other = scheduler.admit(blocked_run(), "user:2")
+    assert await other.__anext__() == 0
+    await asyncio.sleep(0)
+    assert scheduler.stats()["queue_depth"] == 1
+    assert not second.done()
+
+    # closing an admitted run releases its admission
+    await first.aclose()
+    assert await second == 0
+    await other.aclose()
+    assert scheduler.principal_running == {"user:1": 1}
@@ -0,0 +1,162 @@
+import asyncio
+from typing import Any, Dict, Optional, Tuple
+
+import pytest
+from ragnarok_core.pipeline.pipeline_entity import PipelineEntity
+from ragnarok_core.pipeline.pipeline_node import PipelineNode
+from ragnarok_core.pipeline.pipeline_scheduler import NodeScheduler
+from ragnarok_toolkit.component import (
+    ComponentInputTypeOption,
+    ComponentIOType,
+    ComponentOutputTypeOption,
+    RagnarokComponent,
+)
+
+running_num = 0
+max_running_num = 0
+
+
+class SleepComponent(RagnarokComponent):
+    DESCRIPTION = "sleep a while and pass the tag"
+    ENABLE_HINT_CHECK = True
+
+    @classmethod
+    def input_options(cls) -> Tuple[ComponentInputTypeOption, ...]:
+        return (ComponentInputTypeOption(name="tag", allowed_types={ComponentIOType.STRING}, required=False),)
+
+    @classmethod
+    def output_options(cls) -> Tuple[ComponentOutputTypeOption, ...]:
+        return (ComponentOutputTypeOption(name="tag", type=ComponentIOType.STRING),)
+
+    @classmethod
+    async def execute(cls, tag: Optional[str]) -> Dict[str, Any]:
+        global running_num, max_running_num
+        running_num += 1
+        max_running_num = max(max_running_num, running_num)
+        await asyncio.sleep(0.01)
+        running_num -= 1
+        return {"tag": tag}
+
+
+class SlowSleepComponent(SleepComponent):
+    pass
+
+
+def connect(from_node_id: str, to_node_id: str) -> PipelineNode.NodeConnection:
+    return PipelineNode.NodeConnection(
+        from_node_id=from_node_id, to_node_id=to_node_id, from_node_output_name="tag", to_node_input_name="tag"
+    )
+
+
+def reset_counters():
+    global running_num, max_running_num
+    running_num = 0
+    max_running_num = 0
+
+
+@pytest.mark.asyncio
+async def test_per_run_concurrency_limit():
+    reset_counters()
+    width = 20
+    node_map = {
+        "root": PipelineNode(
+            node_id="root",
+            component=SleepComponent,
+            forward_node_info=tuple(connect("root", f"leaf_{i}") for i in range(width)),
+        )
+    }
+    for i in range(width):
+        node_map[f"leaf_{i}"] = PipelineNode(node_id=f"leaf_{i}", component=SleepComponent, forward_node_info=())
+    scheduler = NodeScheduler(max_concurrency=10, max_concurrency_per_run=3)
+    pipeline = PipelineEntity(node_map, {"tag": ("root", "tag")}, scheduler=scheduler)
+
+    process_num = 0
+    async for info in pipeline.run_async(tag="x"):
+        if info.type == "process_info":
+            process_num += 1
+
+    assert process_num == width + 1
+    assert max_running_num == 3
+    assert scheduler.stats()["running_num"] == 0
+
+
+@pytest.mark.asyncio
+async def test_process_wide_concurrency_limit():
+    reset_counters()
+    scheduler = NodeScheduler(max_concurrency=2, max_concurrency_per_run=8)
+    node_map = {str(i): PipelineNode(node_id=str(i), component=SleepComponent, forward_node_info=()) for i in range(4)}
+    pipeline = PipelineEntity(node_map, {f"tag_{i}": (str(i), "tag") for i in range(4)}, scheduler=scheduler)
+
+    async def consume():
+        async for _ in pipeline.run_async():
+            pass
+
+    await asyncio.gather(consume(), consume(), consume())
+    assert max_running_num == 2
+
+
+@pytest.mark.asyncio
+async def test_longest_remaining_path_first():
+    reset_counters()
+    scheduler = NodeScheduler(max_concurrency=1, max_concurrency_per_run=1)
+    scheduler.latency_stats.observe(SlowSleepComponent.__name__, 10.0)
+    node_map = {
+        "root": PipelineNode(
+            node_id="root",
+            component=SleepComponent,
+            forward_node_info=(connect("root", "short"), connect("root", "long")),
+        ),
+        "short": PipelineNode(node_id="short", component=SleepComponent, forward_node_info=()),
+        "long": PipelineNode(node_id="long", component=SleepComponent, forward_node_info=(connect("long", "slow"),)),
+        "slow": PipelineNode(node_id="slow", component=SlowSleepComponent, forward_node_info=()),
+    }
+    pipeline = PipelineEntity(node_map, {"tag": ("root", "tag")}, scheduler=scheduler)
+
+    order = []
+    async for info in pipeline.run_async(tag="x"):
+        if info.type == "process_info":
+            order.append(info.node_id)
+
+    assert order == ["root", "long", "slow", "short"]
+
+
+@pytest.mark.asyncio
+async def test_per_principal_node_budget():
+    scheduler = NodeScheduler(max_concurrency=4, max_concurrency_per_run=4, max_concurrency_per_principal=2)
+    await scheduler.acquire(1, "bulk")
+    await scheduler.acquire(1, "bulk")
+    # over its budget, the bulk principal waits while the others still get the free slots
+    waiting = asyncio.create_task(scheduler.acquire(10, "bulk"))
+    await asyncio.sleep(0)
+    await scheduler.acquire(1, "chat")
+    assert scheduler.stats()["running_num"] == 3
+    assert not waiting.done()
+
+    scheduler.release("bulk")
+    await waiting
+    assert scheduler.principal_running == {"bulk": 2, "chat": 1}
+    for principal in ("bulk", "bulk", "chat"):
+        scheduler.release(principal)
+    assert scheduler.stats()["running_num"] == 0
+
+
+@pytest.mark.asyncio
+async def test_runs_granted_in_turn():
+    scheduler = NodeScheduler(max_concurrency=1)
+    await scheduler.acquire(0, run="long")
+    # the nodes of a long run have the longest remaining paths, a short run still gets its turn
+    order = []
+
+    async def wait(priority: float, run: str) -> None:
+        await scheduler.acquire(priority, run=run)
+        order.append((run, priority))
+
+    tasks = [asyncio.create_task(wait(priority, "long")) for priority in (8, 10, 9)]
+    await asyncio.sleep(0)
+    tasks.append(asyncio.create_task(wait(1, "short")))
+    await asyncio.sleep(0)
+    for _ in tasks:
+        scheduler.release()
+        await asyncio.sleep(0)
+    await asyncio.gather(*tasks)
+    assert order == [("long", 10), ("short", 1), ("long", 9), ("long", 8)]
@@ -0,0 +1,114 @@
+from typing import Any, Dict, List, Tuple
+
+import pytest
+from ragnarok_core.pipeline.checkpoint_store import session_store
+from ragnarok_core.pipeline.pipeline_entity import PipelineEntity
+from ragnarok_core.pipeline.pipeline_node import PipelineNode
+from ragnarok_toolkit.component import (
+    ComponentInputTypeOption,
+    ComponentIOType,
+    ComponentOutputTypeOption,
+    RagnarokComponent,
+)
+
+executed: List[str] = []
+
+
+class RetrieveComponent(RagnarokComponent):
+    DESCRIPTION = "retrieve by the query"
+    ENABLE_HINT_CHECK = True
+
+    @classmethod
+    def input_options(cls) -> Tuple[ComponentInputTypeOption, ...]:
+        return (ComponentInputTypeOption(name="query", allowed_types={ComponentIOType.STRING}, required=True),)
+
+    @classmethod
+    def output_options(cls) -> Tuple[ComponentOutputTypeOption, ...]:
+        return (ComponentOutputTypeOption(name="text", type=ComponentIOType.STRING),)
+
+    @classmethod
+    def execute(cls, query: str) -> Dict[str, Any]:
+        executed.append("retrieve")
+        return {"text": f"doc of {query}"}
+
+
+class AnswerComponent(RagnarokComponent):
+    DESCRIPTION = "answer with the prompt"
+    ENABLE_HINT_CHECK = True
+
+    @classmethod
+    def input_options(cls) -> Tuple[ComponentInputTypeOption, ...]:
+        return (
+            ComponentInputTypeOption(name="text", allowed_types={ComponentIOType.STRING}, required=True),
+            ComponentInputTypeOption(name="prompt", allowed_types={ComponentIOType.STRING}, required=True),
+        )
+
+    @classmethod
+    def output_options(cls) -> Tuple[ComponentOutputTypeOption, ...]:
+        return (ComponentOutputTypeOption(name="answer", type=ComponentIOType.STRING),)
+
+    @classmethod
+    def execute(cls, text: str, prompt: str) -> Dict[str, Any]:
+        executed.append("answer")
+        return {"answer": f"{prompt}: {text}"}
+
+
+def build_pipeline() -> PipelineEntity:
+    # retrieve -> answer
+    return PipelineEntity(
+        {
+            "retrieve": PipelineNode(
+                node_id="retrieve",
+                component=RetrieveComponent,
+                forward_node_info=(
+                    PipelineNode.NodeConnection(
+                        from_node_id="retrieve",
+                        from_node_output_name="text",
+                        to_node_id="answer",
+                        to_node_input_name="text",
+                    ),
+                ),
+            ),
+            "answer": PipelineNode(
+                node_id="answer", component=AnswerComponent, forward_node_info=(), output_name="res"
+            ),
+        },
+        {"query": ("retrieve", "query"), "prompt": ("answer", "prompt")},
+    )
+
+
+async def run(session_id: str, **params: Any) -> Dict[str, Any]:
+    executed.clear()
+    infos = [info async for info in build_pipeline().run_async(session_id=session_id, **params)]
+    assert infos[-1].type == "end_info"
+    return infos[-1].data
+
+
+@pytest.mark.asyncio
+async def test_session_reruns_changed_nodes():
+    await session_store.delete("edit")
+    assert (await run("edit", query="rag", prompt="short"))["checkpoint_hits"] == 0
+    assert executed == ["retrieve", "answer"]
+
+    # only the prompt changed, retrieval is reused
+    assert (await run("edit", query="rag", prompt="long"))["checkpoint_hits"] == 1
+    assert executed == ["answer"]
+
+    # nothing changed, the outputs are kept across the successful runs
+    assert (await run("edit", query="rag", prompt="long"))["checkpoint_hits"] == 2
+    assert executed == []
+
+    # the query changed, so does the retrieval output, both nodes are executed again
+    assert (await run("edit", query="llm", prompt="long"))["checkpoint_hits"] == 0
+    assert executed == ["retrieve", "answer"]
+
+    # another session shares nothing
+    assert (await run("other", query="llm", prompt="long"))["checkpoint_hits"] == 0
+    await session_store.delete("edit")
+    await session_store.delete("other")
+
+
+@pytest.mark.asyncio
+async def test_session_not_resumable():
+    with pytest.raises(ValueError):
+        _ = [info async for info in build_pipeline().run_async(query="rag", prompt="p", run_id="r", session_id="s")]
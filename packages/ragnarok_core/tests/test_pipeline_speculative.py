@@ -0,0 +1,117 @@
+import asyncio
+import json
+from typing import Any, Dict, Tuple
+
+import pytest
+from ragnarok_core.exceptions import InvalidPipelineError
+from ragnarok_core.pipeline.pipeline_entity import PipelineEntity
+from ragnarok_toolkit.component import (
+    ComponentInputTypeOption,
+    ComponentIOType,
+    ComponentOutputTypeOption,
+    RagnarokComponent,
+)
+
+retrieved = []
+
+
+class FakeRewriteComponent(RagnarokComponent):
+    DESCRIPTION = "rewrite the queries starting with 'rewrite'"
+    ENABLE_HINT_CHECK = True
+
+    @classmethod
+    def input_options(cls) -> Tuple[ComponentInputTypeOption, ...]:
+        return (ComponentInputTypeOption(name="query", allowed_types={ComponentIOType.STRING}, required=True),)
+
+    @classmethod
+    def output_options(cls) -> Tuple[ComponentOutputTypeOption, ...]:
+        return (ComponentOutputTypeOption(name="query", type=ComponentIOType.STRING),)
+
+    @classmethod
+    async def execute(cls, query: str) -> Dict[str, Any]:
+        await asyncio.sleep(0.05)
+        if query.startswith("rewrite"):
+            return {"query": query.upper()}
+        return {"query": query}
+
+
+class FakeRetrieveComponent(RagnarokComponent):
+    DESCRIPTION = "retrieve by the query"
+    ENABLE_HINT_CHECK = True
+
+    @classmethod
+    def input_options(cls) -> Tuple[ComponentInputTypeOption, ...]:
+        return (
+            ComponentInputTypeOption(name="query", allowed_types={ComponentIOType.STRING}, required=True),
+            ComponentInputTypeOption(name="top_n", allowed_types={ComponentIOType.INT}, required=True),
+        )
+
+    @classmethod
+    def output_options(cls) -> Tuple[ComponentOutputTypeOption, ...]:
+        return (ComponentOutputTypeOption(name="texts", type=ComponentIOType.STRING_LIST),)
+
+    @classmethod
+    async def execute(cls, query: str, top_n: int) -> Dict[str, Any]:
+        retrieved.append(query)
+        await asyncio.sleep(0.02)
+        return {"texts": [query] * top_n}
+
+
+def pipeline_data(fallback: str = "query") -> Dict[str, Any]:
+    return {
+        "nodes": [
+            {"node_id": "rewrite", "component": "FakeRewriteComponent", "position": None},
+            {"node_id": "retrieve", "component": "FakeRetrieveComponent", "position": None, "output_name": "res"},
+        ],
+        "connections": [
+            {
+                "from_node_id": "rewrite",
+                "from_output_name": "query",
+                "to_node_id": "retrieve",
+                "to_node_input_name": "query",
+                "speculative": {"fallback": fallback},
+            }
+        ],
+        "inject_input_mapping": {"query": ["rewrite", "query"], "top_n": ["retrieve", "top_n"]},
+    }
+
+
+@pytest.fixture(autouse=True)
+def register_components():
+    from ragnarok_core.components import ComponentInfo, component_manager
+
+    for component in (FakeRewriteComponent, FakeRetrieveComponent):
+        component_manager.register_component(
+            ComponentInfo(name=component.__name__, is_official=False, component_class=component),
+            check_duplication=False,
+        )
+
+
+@pytest.mark.asyncio
+async def test_speculation_kept():
+    pipeline = PipelineEntity.from_json_str(json.dumps(pipeline_data()))
+    assert json.loads(pipeline.to_json_str())["connections"][0]["speculative"] == {"fallback": "query"}
+    assert pipeline.speculative_nodes == (1,)
+
+    retrieved.clear()
+    infos = [info async for info in pipeline.run_async(query="what is rag", top_n=2)]
+    # retrieval ran once, with the raw question, while the rewrite was running
+    assert retrieved == ["what is rag"]
+    assert [info.data for info in infos if info.type == "output_info"] == [{"res": {"texts": ["what is rag"] * 2}}]
+    assert infos[-1].data["speculation_hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_speculation_dropped():
+    pipeline = PipelineEntity.from_json_str(json.dumps(pipeline_data()))
+    retrieved.clear()
+    infos = [info async for info in pipeline.run_async(query="rewrite me", top_n=1)]
+    # the speculative retrieval is dropped, retrieval runs again with the rewritten query
+    assert retrieved == ["rewrite me", "REWRITE ME"]
+    assert [info.data for info in infos if info.type == "output_info"] == [{"res": {"texts": ["REWRITE ME"]}}]
+    assert infos[-1].data["speculation_misses"] == 1
+
+
+def test_missing_fallback():
+    with pytest.raises(InvalidPipelineError, match="nope"):
+        PipelineEntity.from_json_str(json.dumps(pipeline_data("nope")))
@@ -0,0 +1,233 @@
+import asyncio
+from typing import Any, AsyncIterator, Dict, List, Tuple
+
+import pytest
+from ragnarok_core.exceptions import InvalidPipelineError
+from ragnarok_core.pipeline.pipeline_entity import PipelineEntity
+from ragnarok_core.pipeline.pipeline_node import PipelineNode
+from ragnarok_toolkit.component import (
+    ComponentInputTypeOption,
+    ComponentIOType,
+    ComponentOutputTypeOption,
+    RagnarokComponent,
+)
+
+events = []
+
+
+class WordStreamComponent(RagnarokComponent):
+    DESCRIPTION = "yield the words of a text one by one"
+    ENABLE_HINT_CHECK = True
+
+    @classmethod
+    def input_options(cls) -> Tuple[ComponentInputTypeOption, ...]:
+        return (ComponentInputTypeOption(name="text", allowed_types={ComponentIOType.STRING}, required=True),)
+
+    @classmethod
+    def output_options(cls) -> Tuple[ComponentOutputTypeOption, ...]:
+        return (
+            ComponentOutputTypeOption(name="words", type=ComponentIOType.STRING_LIST),
+            ComponentOutputTypeOption(name="text", type=ComponentIOType.STRING),
+        )
+
+    @classmethod
+    async def execute(cls, text: str) -> AsyncIterator[Dict[str, Any]]:
+        for word in text.split():
+            events.append(f"produce {word}")
+            yield {"words": [word], "text": word}
+            await asyncio.sleep(0.01)
+
+
+class UpperStreamConsumerComponent(RagnarokComponent):
+    DESCRIPTION = "upper the words as they arrive"
+    ENABLE_HINT_CHECK = True
+
+    @classmethod
+    def input_options(cls) -> Tuple[ComponentInputTypeOption, ...]:
+        return (
+            ComponentInputTypeOption(
+                name="words", allowed_types={ComponentIOType.STRING_LIST}, required=True, streaming=True
+            ),
+        )
+
+    @classmethod
+    def output_options(cls) -> Tuple[ComponentOutputTypeOption, ...]:
+        return (ComponentOutputTypeOption(name="words", type=ComponentIOType.STRING_LIST),)
+
+    @classmethod
+    async def execute(cls, words: AsyncIterator[List[str]]) -> Dict[str, Any]:
+        upper_words = []
+        async for partial_words in words:
+            events.append(f"consume {partial_words[0]}")
+            upper_words.extend(word.upper() for word in partial_words)
+        return {"words": upper_words}
+
+
+class JoinComponent(RagnarokComponent):
+    DESCRIPTION = "join the whole word list"
+    ENABLE_HINT_CHECK = True
+
+    @classmethod
+    def input_options(cls) -> Tuple[ComponentInputTypeOption, ...]:
+        return (ComponentInputTypeOption(name="words", allowed_types={ComponentIOType.STRING_LIST}, required=True),)
+
+    @classmethod
+    def output_options(cls) -> Tuple[ComponentOutputTypeOption, ...]:
+        return (ComponentOutputTypeOption(name="text", type=ComponentIOType.STRING),)
+
+    @classmethod
+    def execute(cls, words: List[str]) -> Dict[str, Any]:
+        return {"text": "-".join(words)}
+
+
+class UpperWithTextComponent(UpperStreamConsumerComponent):
+    DESCRIPTION = "upper the words as they arrive, along with the whole text"
+
+    @classmethod
+    def input_options(cls) -> Tuple[ComponentInputTypeOption, ...]:
+        return super().input_options() + (
+            ComponentInputTypeOption(name="text", allowed_types={ComponentIOType.STRING}, required=True),
+        )
+
+    @classmethod
+    async def execute(cls, words: AsyncIterator[List[str]], text: str) -> Dict[str, Any]:
+        return await super().execute(words)
+
+
+class FirstWordComponent(RagnarokComponent):
+    DESCRIPTION = "take the first word only"
+    ENABLE_HINT_CHECK = True
+
+    @classmethod
+    def input_options(cls) -> Tuple[ComponentInputTypeOption, ...]:
+        return UpperStreamConsumerComponent.input_options()
+
+    @classmethod
+    def output_options(cls) -> Tuple[ComponentOutputTypeOption, ...]:
+        return (ComponentOutputTypeOption(name="word", type=ComponentIOType.STRING),)
+
+    @classmethod
+    async def execute(cls, words: AsyncIterator[List[str]]) -> Dict[str, Any]:
+        async for partial_words in words:
+            return {"word": partial_words[0]}
+        return {"word": ""}
+
+
+def connect(
+    from_node_id: str, to_node_id: str, output_name: str = "words", input_name: str = "words"
+) -> PipelineNode.NodeConnection:
+    return PipelineNode.NodeConnection(
+        from_node_id=from_node_id,
+        to_node_id=to_node_id,
+        from_node_output_name=output_name,
+        to_node_input_name=input_name,
+    )
+
+
+@pytest.mark.asyncio
+async def test_streaming_edges():
+    events.clear()
+    pipeline = PipelineEntity(
+        {
+            "words": PipelineNode(
+                node_id="words",
+                component=WordStreamComponent,
+                forward_node_info=(connect("words", "upper"), connect("words", "join")),
+                output_name="words_res",
+            ),
+            "upper": PipelineNode(
+                node_id="upper", component=UpperStreamConsumerComponent, forward_node_info=(), output_name="upper_res"
+            ),
+            "join": PipelineNode(node_id="join", component=JoinComponent, forward_node_info=(), output_name="join_res"),
+        },
+        {"text": ("words", "text")},
+    )
+
+    infos = [info async for info in pipeline.run_async(text="a b c")]
+
+    # the consumer gets the first word while the producer is still running
+    assert events.index("consume a") < events.index("produce c")
+    streamed = [info.data["words_res"]["text"] for info in infos if info.type == "stream_info"]
+    assert streamed == ["a", "b", "c"]
+    outputs = {info.node_id: info.data for info in infos if info.type == "output_info"}
+    assert outputs["words"] == {"words_res": {"words": ["a", "b", "c"], "text": "abc"}}
+    assert outputs["upper"] == {"upper_res": {"words": ["A", "B", "C"]}}
+    assert outputs["join"] == {"join_res": {"text": "a-b-c"}}
+    assert infos[-1].type == "end_info"
+
+
+@pytest.mark.asyncio
+async def test_streaming_input_of_whole_value():
+    pipeline = PipelineEntity(
+        {"upper": PipelineNode(node_id="upper", component=UpperStreamConsumerComponent, forward_node_info=())},
+        {"words": ("upper", "words")},
+    )
+
+    infos = [info async for info in pipeline.run_async(words=["x", "y"])]
+    assert infos[0].data == {"words": ["X", "Y"]}
+
+    results = [result async for result in pipeline.run_batch([{"words": ["z"]}])]
+    assert results[0].error is None
+
+
+def test_streaming_and_whole_input_from_one_node():
+    # the consumer could only start once the stream ends, which waits on the consumer reading it
+    with pytest.raises(InvalidPipelineError, match="waits for the end of that stream"):
+        PipelineEntity(
+            {
+                "words": PipelineNode(
+                    node_id="words",
+                    component=WordStreamComponent,
+                    forward_node_info=(connect("words", "upper"), connect("words", "upper", "text", "text")),
+                ),
+                "upper": PipelineNode(node_id="upper", component=UpperWithTextComponent, forward_node_info=()),
+            },
+            {"text": ("words", "text")},
+        )
+
+
+def test_streaming_and_whole_input_through_another_node():
+    # words -> join -> upper, upper could only start once join is done with the whole stream of words
+    with pytest.raises(InvalidPipelineError, match="waits for the end of that stream"):
+        PipelineEntity(
+            {
+                "words": PipelineNode(
+                    node_id="words",
+                    component=WordStreamComponent,
+                    forward_node_info=(connect("words", "upper"), connect("words", "join")),
+                ),
+                "join": PipelineNode(
+                    node_id="join",
+                    component=JoinComponent,
+                    forward_node_info=(connect("join", "upper", "text", "text"),),
+                ),
+                "upper": PipelineNode(node_id="upper", component=UpperWithTextComponent, forward_node_info=()),
+            },
+            {"text": ("words", "text")},
+        )
+
+
+@pytest.mark.asyncio
+async def test_consumer_leaving_stream_unread():
+    pipeline = PipelineEntity(
+        {
+            "words": PipelineNode(
+                node_id="words",
+                component=WordStreamComponent,
+                forward_node_info=(connect("words", "first"),),
+                output_name="words_res",
+            ),
+            "first": PipelineNode(
+                node_id="first", component=FirstWordComponent, forward_node_info=(), output_name="first_res"
+            ),
+        },
+        {"text": ("words", "text")},
+    )
+
+    # far more words than the stream queue holds, the producer goes on once the consumer is done
+    text = " ".join(f"w{index}" for index in range(40))
+    infos = [info async for info in pipeline.run_async(text=text, run_timeout=10)]
+    assert infos[-1].type == "end_info"
+    outputs = {info.node_id: info.data for info in infos if info.type == "output_info"}
+    assert outputs["first"] == {"first_res": {"word": "w0"}}
+    assert len(outputs["words"]["words_res"]["words"]) == 40
@@ -0,0 +1,88 @@
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import pytest
+from ragnarok_core.pipeline.pipeline_entity import PipelineEntity
+from ragnarok_core.pipeline.pipeline_node import PipelineNode
+from ragnarok_toolkit.component import (
+    ComponentExecutionClass,
+    ComponentInputTypeOption,
+    ComponentIOType,
+    ComponentOutputTypeOption,
+    RagnarokComponent,
+)
+from ragnarok_toolkit.tracing import trace_call
+
+
+class CallComponent(RagnarokComponent):
+    DESCRIPTION = "make a fake external call"
+    ENABLE_HINT_CHECK = True
+
+    @classmethod
+    def input_options(cls) -> Tuple[ComponentInputTypeOption, ...]:
+        return (ComponentInputTypeOption(name="text", allowed_types={ComponentIOType.STRING}, required=False),)
+
+    @classmethod
+    def output_options(cls) -> Tuple[ComponentOutputTypeOption, ...]:
+        return (ComponentOutputTypeOption(name="text", type=ComponentIOType.STRING),)
+
+    @classmethod
+    def execute(cls, text: Optional[str]) -> Dict[str, Any]:
+        with trace_call("fake.call"):
+            time.sleep(0.01)
+        return {"text": (text or "") + "abc"}
+
+
+class ThreadCallComponent(CallComponent):
+    EXECUTION_CLASS = ComponentExecutionClass.THREAD
+
+
+@pytest.mark.asyncio
+async def test_trace_spans():
+    pipeline = PipelineEntity(
+        {
+            "1": PipelineNode(
+                node_id="1",
+                component=CallComponent,
+                forward_node_info=(
+                    PipelineNode.NodeConnection(
+                        from_node_id="1", from_node_output_name="text", to_node_id="2", to_node_input_name="text"
+                    ),
+                ),
+            ),
+            "2": PipelineNode(node_id="2", component=ThreadCallComponent, forward_node_info=()),
+        },
+        {"text": ("1", "text")},
+    )
+
+    infos = [info async for info in pipeline.run_async(text="x", trace=True)]
+    assert [info.type for info in infos[-2:]] == ["trace_info", "end_info"]
+    trace = infos[-2].data
+
+    spans = {span["node_id"]: span for span in trace["trace"]["spans"]}
+    assert spans["1"]["output_bytes"] == 4
+    assert spans["2"]["output_bytes"] == 7
+    assert spans["2"]["start_time"] >= spans["1"]["end_time"]
+    # the thread offloaded node records its calls too
+    for span in spans.values():
+        assert [call["name"] for call in span["external_calls"]] == ["fake.call"]
+
+    chrome_events = trace["chrome_trace"]["traceEvents"]
+    assert {event["name"] for event in chrome_events if event["ph"] == "X"} >= {
+        "CallComponent",
+        "ThreadCallComponent",
+        "fake.call",
+    }
+
+    otel_spans = trace["otel"]["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    assert len(otel_spans) == 5
+    assert len({span["traceId"] for span in otel_spans}) == 1
+
+
+@pytest.mark.asyncio
+async def test_untraced_run():
+    pipeline = PipelineEntity(
+        {"1": PipelineNode(node_id="1", component=CallComponent, forward_node_info=())}, {"text": ("1", "text")}
+    )
+    infos = [info async for info in pipeline.run_async(text="x")]
+    assert [info.type for info in infos] == ["process_info", "end_info"]
@@ -0,0 +1,100 @@
+import json
+from typing import Any, Dict, List, Tuple
+
+import pytest
+from ragnarok_core.exceptions import InvalidPipelineError
+from ragnarok_core.pipeline.pipeline_entity import PipelineEntity
+
+
+def chain_json(
+    node_num: int, extra_connections: List[Tuple[int, int]] = (), component: str = "TestComponent3", **kwargs: Any
+) -> str:
+    nodes = [
+        {"node_id": str(i), "component": component, "position": {"x": i, "y": 0}, "output_name": None}
+        for i in range(node_num)
+    ]
+    connections = [
+        {
+            "from_node_id": str(from_index),
+            "from_output_name": "component3_output_1",
+            "to_node_id": str(to_index),
+            "to_node_input_name": "component3_input_1",
+        }
+        for from_index, to_index in [(i, i + 1) for i in range(node_num - 1)] + list(extra_connections)
+    ]
+    data: Dict[str, Any] = {
+        "nodes": nodes,
+        "connections": connections,
+        "inject_input_mapping": {"text": ["0", "component3_input_1"]},
+    }
+    data.update(kwargs)
+    return json.dumps(data)
+
+
+@pytest.mark.asyncio
+async def test_large_chain():
+    pipeline = PipelineEntity.from_json_str(chain_json(500))
+    assert pipeline.topological_order == tuple(range(500))
+
+    process_num = 0
+    async for info in pipeline.run_async(text="x"):
+        assert info.type != "error_info"
+        process_num += info.type == "process_info"
+    assert process_num == 500
+
+
+@pytest.mark.parametrize(
+    "content, reason",
+    [
+        (chain_json(3, [(2, 1)]), "cycle"),
+        (chain_json(2, component="NoSuchComponent"), "not found"),
+        (chain_json(2, inject_input_mapping={"text": ["9", "component3_input_1"]}), "missing node 9"),
+        (chain_json(2, inject_input_mapping={}), "no beginning node"),
+        # the inject names may not shadow the run options
+        (chain_json(2, inject_input_mapping={"outputs": ["0", "component3_input_1"]}), "reserved"),
+        (chain_json(2, inject_input_mapping={"principal": ["0", "component3_input_1"]}), "reserved"),
+        (
+            json.dumps(
+                {
+                    "nodes": [{"node_id": "0", "component": "TestComponent3", "position": None}],
+                    "connections": [
+                        {
+                            "from_node_id": "0",
+                            "from_output_name": "component3_output_1",
+                            "to_node_id": "1",
+                            "to_node_input_name": "component3_input_1",
+                        }
+                    ],
+                    "inject_input_mapping": {},
+                }
+            ),
+            "missing node 1",
+        ),
+        (chain_json(2, inject_input_mapping={"text": ["0", "wrong_input"]}), "wrong_input"),
+    ],
+)
+def test_invalid_pipeline(content: str, reason: str):
+    with pytest.raises(InvalidPipelineError, match=reason):
+        PipelineEntity.from_json_str(content)
+
+
+@pytest.mark.asyncio
+async def test_dead_nodes_pruned():
+    # node 2 waits for node 1, which waits for an input never injected
+    content = json.loads(chain_json(3))
+    content["connections"] = content["connections"][1:]
+    content["nodes"].append({"node_id": "3", "component": "TestComponent3", "position": None})
+    content["connections"].append(
+        {
+            "from_node_id": "0",
+            "from_output_name": "component3_output_1",
+            "to_node_id": "3",
+            "to_node_input_name": "component3_input_1",
+        }
+    )
+    pipeline = PipelineEntity.from_json_str(json.dumps(content))
+    assert pipeline.live_nodes == (True, False, False, True)
+
+    infos = [info async for info in pipeline.run_async(text="x", run_timeout=5)]
+    assert [info.node_id for info in infos if info.type == "process_info"] == ["0", "3"]
+    assert infos[-1].type == "end_info"
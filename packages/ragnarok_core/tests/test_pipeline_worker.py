@@ -0,0 +1,89 @@
+import os
+from typing import Any, Dict, List, Tuple
+
+import pytest
+from ragnarok_core.pipeline.pipeline_entity import PipelineEntity
+from ragnarok_core.pipeline.pipeline_executor import ComponentExecutor
+from ragnarok_core.pipeline.pipeline_node import PipelineNode
+from ragnarok_core.pipeline.pipeline_worker import (
+    SharedPayload,
+    WorkerPool,
+    restore,
+    share,
+)
+from ragnarok_toolkit.component import (
+    ComponentExecutionClass,
+    ComponentInputTypeOption,
+    ComponentIOType,
+    ComponentOutputTypeOption,
+    RagnarokComponent,
+)
+
+
+class DoubleComponent(RagnarokComponent):
+    DESCRIPTION = "double a vector and a blob in another process"
+    ENABLE_HINT_CHECK = True
+    EXECUTION_CLASS = ComponentExecutionClass.PROCESS
+
+    @classmethod
+    def input_options(cls) -> Tuple[ComponentInputTypeOption, ...]:
+        return (
+            ComponentInputTypeOption(name="vector", allowed_types={ComponentIOType.FLOAT_LIST}, required=True),
+            ComponentInputTypeOption(name="blob", allowed_types={ComponentIOType.BYTES}, required=True),
+        )
+
+    @classmethod
+    def output_options(cls) -> Tuple[ComponentOutputTypeOption, ...]:
+        return (
+            ComponentOutputTypeOption(name="vector", type=ComponentIOType.FLOAT_LIST),
+            ComponentOutputTypeOption(name="blob", type=ComponentIOType.BYTES),
+            ComponentOutputTypeOption(name="pid", type=ComponentIOType.INT),
+        )
+
+    @classmethod
+    def execute(cls, vector: List[float], blob: bytes) -> Dict[str, Any]:
+        if not blob:
+            raise ValueError("empty blob")
+        return {"vector": [value * 2 for value in vector], "blob": blob * 2, "pid": os.getpid()}
+
+
+def test_share_restore():
+    blocks = []
+    value = {"blob": b"x" * 100, "vectors": [[0.5] * 10] * 3, "small": [1.0], "text": "abc"}
+    shared = share(value, 64, blocks)
+    assert isinstance(shared["blob"], SharedPayload)
+    assert isinstance(shared["vectors"], SharedPayload)
+    assert shared["small"] == [1.0]
+    assert len(blocks) == 2
+    for block in blocks:
+        block.close()
+    assert restore(shared, unlink=True) == value
+
+
+@pytest.mark.asyncio
+async def test_worker_backend():
+    executor = ComponentExecutor(process_pool_size=2, process_backend="workers")
+    executor.get_worker_pool().shm_threshold = 64
+    pipeline = PipelineEntity(
+        {"1": PipelineNode(node_id="1", component=DoubleComponent, forward_node_info=(), output_name="res")},
+        {"vector": ("1", "vector"), "blob": ("1", "blob")},
+        executor=executor,
+    )
+    try:
+        infos = [info async for info in pipeline.run_async(vector=[0.25] * 100, blob=b"ab" * 100)]
+        outputs = next(info.data["res"] for info in infos if info.type == "output_info")
+        assert outputs["vector"] == [0.5] * 100
+        assert outputs["blob"] == b"ab" * 200
+        assert outputs["pid"] != os.getpid()
+
+        infos = [info async for info in pipeline.run_async(vector=[0.25], blob=b"")]
+        assert infos[-1].type == "error_info"
+        assert "empty blob" in infos[-1].data["error"]
+    finally:
+        executor.shutdown()
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        ComponentExecutor(process_backend="nope")
+    assert WorkerPool(1).workers == []
@@ -0,0 +1,52 @@
+from types import SimpleNamespace
+from typing import Any, List
+
+import pytest
+from ragnarok_core.components.official_components.vector_database_component import (
+    RetrieveComponent,
+)
+from ragnarok_toolkit.vdb.qdrant_client import QdrantClient
+
+
+class FakeAsyncQdrantClient:
+    """answers each query with the texts of its first top_k points, the first value of the vector as their tag"""
+
+    def __init__(self) -> None:
+        # collection name of each batch request
+        self.calls: List[str] = []
+
+    async def query_batch_points(self, collection_name: str, requests: List[Any]) -> List[Any]:
+        self.calls.append(collection_name)
+        return [
+            SimpleNamespace(
+                points=[
+                    SimpleNamespace(payload={"text": f"{collection_name}:{request.query[0]}:{index}"})
+                    for index in range(request.limit)
+                ]
+            )
+            for request in requests
+        ]
+
+
+@pytest.fixture
+def fake_client(monkeypatch) -> FakeAsyncQdrantClient:
+    client = FakeAsyncQdrantClient()
+    monkeypatch.setattr(QdrantClient, "qdrant_client", client)
+    return client
+
+
+@pytest.mark.asyncio
+async def test_single_and_batched_search(fake_client: FakeAsyncQdrantClient):
+    inputs_list = [
+        {"vector_database_name": "a", "query_vector": [1.0], "top_k": 2, "payload_filters": None},
+        {"vector_database_name": "b", "query_vector": [2.0], "top_k": None, "payload_filters": [{"doc_id": "x"}]},
+        {"vector_database_name": "a", "query_vector": [3.0], "top_k": 1, "payload_filters": None},
+    ]
+    singles = [await RetrieveComponent.execute(**inputs) for inputs in inputs_list]
+    assert singles[0] == {"piece_ids": ["a:1.0:0", "a:1.0:1"]}
+    assert len(singles[1]["piece_ids"]) == 10
+
+    # batched or not, the node gives the same results, from one request per vector database
+    fake_client.calls.clear()
+    assert await RetrieveComponent.execute_batch(inputs_list) == singles
+    assert fake_client.calls == ["a", "b"]
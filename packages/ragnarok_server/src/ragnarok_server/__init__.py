@@ -3,6 +3,7 @@ import asyncio
 import uvicorn
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from ragnarok_core.pipeline import component_executor, job_manager
 from ragnarok_server.exceptions import (
     CustomRuntimeError,
     HTTPException,
@@ -46,6 +47,12 @@ async def ping():
     return "pong"
 
 
+@app.on_event("shutdown")
+async def shutdown_component_executor():
+    await job_manager.shutdown()
+    component_executor.shutdown(wait=False)
+
+
 # TODO register permission handler
 
 
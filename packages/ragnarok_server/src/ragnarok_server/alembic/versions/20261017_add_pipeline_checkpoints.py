@@ -0,0 +1,35 @@
+"""add pipeline_checkpoints
+
+Revision ID: 20261017_add_pipeline_checkpoints
+Revises: 20250605_add_avatar_url
+Create Date: 2026-10-17 10:00:00
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "20261017_add_pipeline_checkpoints"
+down_revision = "20250605_add_avatar_url"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "pipeline_checkpoints",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("run_id", sa.String(), nullable=False),
+        sa.Column("node_id", sa.String(), nullable=False),
+        sa.Column("input_hash", sa.String(), nullable=False),
+        sa.Column("outputs", sa.LargeBinary(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), server_default=sa.text("now()"), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("run_id", "node_id", name="_run_node_uc"),
+    )
+    op.create_index(op.f("ix_pipeline_checkpoints_run_id"), "pipeline_checkpoints", ["run_id"], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f("ix_pipeline_checkpoints_run_id"), table_name="pipeline_checkpoints")
+    op.drop_table("pipeline_checkpoints")
@@ -4,7 +4,7 @@ import logging
 from datetime import datetime, timedelta
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from jose import JWTError, jwt
 from pydantic import BaseModel
@@ -20,6 +20,11 @@ logger = logging.getLogger(__name__)
 router = APIRouter(tags=["auth.py"])
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth.py/token")
+# for the routes open to anonymous callers, the token is only used to tell who is calling
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth.py/token", auto_error=False)
+
+# principal of the calls without a token, followed by the client address when it is known
+ANONYMOUS_PRINCIPAL = "anonymous"
 
 
 class Token(BaseModel):
@@ -104,6 +109,34 @@ async def decode_access_token(token: str = Depends(oauth2_scheme)) -> TokenData:
         raise credentials_exception
 
 
+async def decode_optional_access_token(token: Optional[str] = Depends(optional_oauth2_scheme)) -> Optional[TokenData]:
+    """
+    Like decode_access_token, but None if the call has no token.
+    An invalid token is still rejected with 401.
+    """
+    if token is None:
+        return None
+    return await decode_access_token(token)
+
+
+def principal_key(token_data: Optional[TokenData], client_host: Optional[str] = None) -> str:
+    """
+    key of the caller in the per-principal quotas, like "user:1".
+    anonymous callers are told apart by their address, like "anonymous:10.0.0.1",
+    so that one of them flooding the server does not use up the budget of all the others
+    """
+    if token_data is None:
+        return f"{ANONYMOUS_PRINCIPAL}:{client_host}" if client_host else ANONYMOUS_PRINCIPAL
+    return f"{token_data.principal_type}:{token_data.principal_id}"
+
+
+async def get_caller_principal(
+    request: Request, token_data: Optional[TokenData] = Depends(decode_optional_access_token)
+) -> str:
+    """principal key of the caller, for the routes open to anonymous callers"""
+    return principal_key(token_data, request.client.host if request.client else None)
+
+
 # New get_current_user function
 async def get_current_user(
         token: str = Depends(oauth2_scheme),
@@ -6,6 +6,7 @@ from sqlalchemy import (
     DateTime,
     ForeignKey,
     Integer,
+    LargeBinary,
     Sequence,
     String,
     UniqueConstraint,
@@ -178,6 +179,28 @@ class Pipeline(Base):
     components: Mapped[str | None] = mapped_column(String, nullable=True)
     path:       Mapped[str | None] = mapped_column(String, nullable=True)
 
+
+class PipelineCheckpoint(Base):
+    """
+    PipelineCheckpoint: the saved outputs of a node in a resumable pipeline run.
+    Fields:
+      - run_id, node_id: the run and the node, unique together
+      - input_hash: hash of the node inputs the outputs were computed from
+      - outputs: pickled node outputs
+    """
+
+    __tablename__ = "pipeline_checkpoints"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    run_id: Mapped[str] = mapped_column(String, nullable=False, index=True)
+    node_id: Mapped[str] = mapped_column(String, nullable=False)
+    input_hash: Mapped[str] = mapped_column(String, nullable=False)
+    outputs: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    created_at: Mapped[DateTime] = mapped_column(DateTime, server_default=func.now(), nullable=False)
+
+    __table_args__ = (UniqueConstraint("run_id", "node_id", name="_run_node_uc"),)
+
+
 class CreatorType(str, Enum):
     TENANT = "tenant"
     USER = "user"
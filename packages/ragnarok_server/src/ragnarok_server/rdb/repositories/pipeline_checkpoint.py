@@ -0,0 +1,34 @@
+from typing import Optional
+
+from ragnarok_server.rdb.engine import get_async_session
+from ragnarok_server.rdb.models import PipelineCheckpoint
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert
+
+
+class PipelineCheckpointRepository:
+    @classmethod
+    async def get_checkpoint(cls, run_id: str, node_id: str) -> Optional[PipelineCheckpoint]:
+        async with get_async_session() as session:
+            stmt = select(PipelineCheckpoint).where(
+                PipelineCheckpoint.run_id == run_id, PipelineCheckpoint.node_id == node_id
+            )
+            result = await session.execute(stmt)
+        return result.scalar_one_or_none()
+
+    @classmethod
+    async def save_checkpoint(cls, run_id: str, node_id: str, input_hash: str, outputs: bytes) -> None:
+        async with get_async_session() as session:
+            stmt = (
+                insert(PipelineCheckpoint)
+                .values(run_id=run_id, node_id=node_id, input_hash=input_hash, outputs=outputs)
+                .on_conflict_do_update(constraint="_run_node_uc", set_={"input_hash": input_hash, "outputs": outputs})
+            )
+            await session.execute(stmt)
+
+    @classmethod
+    async def remove_run_checkpoints(cls, run_id: str) -> int:
+        async with get_async_session() as session:
+            stmt = delete(PipelineCheckpoint).where(PipelineCheckpoint.run_id == run_id)
+            result = await session.execute(stmt)
+        return result.rowcount
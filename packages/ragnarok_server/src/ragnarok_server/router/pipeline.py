@@ -1,16 +1,20 @@
-from typing import Any, AsyncGenerator, Dict, Optional
+from contextlib import aclosing
+from typing import Any, AsyncGenerator, Dict, List, Optional
 
 from pydantic import BaseModel
-from ragnarok_core.pipeline.pipeline_entity import PipelineExecutionInfo
+from ragnarok_core.pipeline.pipeline_entity import PipelineBatchResult, PipelineExecutionInfo
+from ragnarok_core.pipeline import job_manager, node_scheduler, run_scheduler
+from ragnarok_core.pipeline.pipeline_event import EventEncoding, EventVerbosity, available_encodings
+from ragnarok_core.pipeline.pipeline_job import JobStatus
 from ragnarok_server import HTTPException
 from ragnarok_server.common import Response, ResponseCode
 from ragnarok_server.router.base import CustomAPIRouter, PipelineDetailModel
 from ragnarok_server.service.pipeline import pipeline_service
-from ragnarok_server.auth import TokenData, decode_access_token
+from ragnarok_server.auth import TokenData, decode_access_token, get_caller_principal
 from starlette.responses import StreamingResponse
-from fastapi import Depends
+from fastapi import Depends, Header
 from ragnarok_server.common import ListResponseData
-from pydantic import BaseModel, field_validator
+from pydantic import field_validator
 import json
 
 router = CustomAPIRouter(prefix="/pipelines", tags=["Pipeline"])
@@ -31,6 +35,39 @@ class PipelineCreateResponse(BaseModel):
 class PipelineExecuteRequest(BaseModel):
     pipeline_id: int
     params: Dict[str, Any]
+    # report the node spans in a trace_info event at the end of the stream
+    trace: bool = False
+    # how much node data the events carry, outputs / summary / full
+    verbosity: EventVerbosity = EventVerbosity.FULL
+    # wire format of the events, msgpack streams concatenated msgpack objects instead of sse
+    encoding: EventEncoding = EventEncoding.JSON
+    # id of a resumable run, executing it again after a failure skips the nodes already done
+    run_id: Optional[str] = None
+
+class PipelineJobSubmitRequest(BaseModel):
+    pipeline_id: int
+    params: Dict[str, Any]
+    trace: bool = False
+    verbosity: EventVerbosity = EventVerbosity.FULL
+    # run only the nodes needed by these output names, all the nodes if not given
+    outputs: Optional[List[str]] = None
+    run_id: Optional[str] = None
+
+class PipelineJobResponse(BaseModel):
+    job_id: str
+    status: JobStatus
+    error: Optional[str] = None
+    # offsets of the oldest event still kept and of the next event, older events are dropped
+    start_offset: int
+    end_offset: int
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+class PipelineExecuteBatchRequest(BaseModel):
+    pipeline_id: int
+    params_list: List[Dict[str, Any]]
+    batch_size: Optional[int] = None
 
 class PipelineCompletionRequest(BaseModel):
     pipeline_id: int
@@ -40,6 +77,9 @@ class PipelineCompletionRequest(BaseModel):
 class PipelineTestRequest(BaseModel):
     pipeline_content: str
     params: Dict[str, Any]
+    trace: bool = False
+    # id of the editing session, its test runs only execute the nodes changed since the former run
+    session_id: Optional[str] = None
 
 class PipelineRemoveRequest(BaseModel):
     pipeline_id: int
@@ -118,10 +158,19 @@ async def create_pipeline(request: PipelineCreateRequest,token: TokenData = Depe
 
 
 @router.post("/execute")
-async def execute_pipeline(request: PipelineExecuteRequest) -> StreamingResponse:
+async def execute_pipeline(
+    request: PipelineExecuteRequest, principal: str = Depends(get_caller_principal)
+) -> StreamingResponse:
     async def sse_wrapper(ori_gen: AsyncGenerator[PipelineExecutionInfo, None]) -> AsyncGenerator[str, None]:
         async for pipeline_execution_info in ori_gen:
-            yield "data: " + pipeline_execution_info.to_json() + "\n\n"
+            yield "data: " + pipeline_execution_info.encode(request.encoding) + "\n\n"
+
+    async def msgpack_wrapper(ori_gen: AsyncGenerator[PipelineExecutionInfo, None]) -> AsyncGenerator[bytes, None]:
+        async for pipeline_execution_info in ori_gen:
+            yield pipeline_execution_info.encode(EventEncoding.MSGPACK)
+
+    if request.encoding not in available_encodings():
+        raise HTTPException(status_code=400, content=f"encoding {request.encoding} is not available")
 
     # 1. get pipeline model
     pipeline = await pipeline_service.get_pipeline_by_id(request.pipeline_id)
@@ -129,8 +178,113 @@ async def execute_pipeline(request: PipelineExecuteRequest) -> StreamingResponse
         raise HTTPException(status_code=400, content=f"pipeline with id {request.pipeline_id} not found")
 
     # 2. execute
+    ori_gen = await pipeline_service.execute_pipeline(
+        pipeline.content,
+        request.params,
+        request.trace,
+        verbosity=request.verbosity,
+        run_id=request.run_id,
+        principal=principal,
+    )
+    if request.encoding == EventEncoding.MSGPACK:
+        return StreamingResponse(msgpack_wrapper(ori_gen), media_type="application/x-msgpack")
+    return StreamingResponse(sse_wrapper(ori_gen), media_type="text/event-stream")
+
+
+@router.post("/jobs", response_model=Response[PipelineJobResponse])
+async def submit_pipeline_job(
+    request: PipelineJobSubmitRequest, principal: str = Depends(get_caller_principal)
+) -> Response[PipelineJobResponse]:
+    pipeline = await pipeline_service.get_pipeline_by_id(request.pipeline_id)
+    if pipeline is None:
+        raise HTTPException(status_code=400, content=f"pipeline with id {request.pipeline_id} not found")
+
+    job = await pipeline_service.submit_pipeline_job(
+        pipeline.content,
+        request.params,
+        request.trace,
+        outputs=request.outputs,
+        verbosity=request.verbosity,
+        run_id=request.run_id,
+        principal=principal,
+    )
+    return ResponseCode.OK.to_response(data=PipelineJobResponse(**job.to_dict()))
+
+
+@router.get("/jobs/{job_id}", response_model=Response[PipelineJobResponse])
+async def get_pipeline_job(
+    job_id: str, principal: str = Depends(get_caller_principal)
+) -> Response[PipelineJobResponse]:
+    # the jobs of the other principals are not found
+    job = job_manager.get(job_id, principal)
+    if job is None:
+        raise HTTPException(status_code=404, content="Pipeline job not found")
+    return ResponseCode.OK.to_response(data=PipelineJobResponse(**job.to_dict()))
+
+
+@router.get("/jobs/{job_id}/events")
+async def stream_pipeline_job(
+    job_id: str,
+    offset: int = 0,
+    encoding: EventEncoding = EventEncoding.JSON,
+    last_event_id: Optional[str] = Header(default=None),
+    principal: str = Depends(get_caller_principal),
+) -> StreamingResponse:
+    """
+    follow the events of a job from the offset on until the job ends, the sse id of each event is its offset,
+    so a reconnecting EventSource resumes right after the last event it got
+    """
+    async def sse_wrapper(offset: int) -> AsyncGenerator[str, None]:
+        async for event_offset, pipeline_execution_info in job.events(offset):
+            yield f"id: {event_offset}\ndata: " + pipeline_execution_info.encode(encoding) + "\n\n"
+
+    if encoding == EventEncoding.MSGPACK or encoding not in available_encodings():
+        raise HTTPException(status_code=400, content=f"encoding {encoding} is not available")
+    job = job_manager.get(job_id, principal)
+    if job is None:
+        raise HTTPException(status_code=404, content="Pipeline job not found")
+    if last_event_id is not None and last_event_id.isdigit():
+        offset = int(last_event_id) + 1
+    return StreamingResponse(sse_wrapper(offset), media_type="text/event-stream")
+
+
+@router.delete("/jobs/{job_id}")
+async def cancel_pipeline_job(job_id: str, principal: str = Depends(get_caller_principal)) -> Response:
+    if not await job_manager.cancel(job_id, principal):
+        raise HTTPException(status_code=404, content="Pipeline job not found")
+    return ResponseCode.OK.to_response()
+
+
+@router.get("/scheduler")
+async def get_scheduler_stats() -> Response[Dict[str, Any]]:
+    """queue depth and wait time of the run admission, and the node slots in use"""
+    return ResponseCode.OK.to_response(data={"runs": run_scheduler.stats(), "nodes": node_scheduler.stats()})
+
+
+@router.post("/execute_batch")
+async def execute_pipeline_batch(
+    request: PipelineExecuteBatchRequest, principal: str = Depends(get_caller_principal)
+) -> StreamingResponse:
+    async def sse_wrapper(ori_gen: AsyncGenerator[PipelineBatchResult, None]) -> AsyncGenerator[str, None]:
+        async for pipeline_batch_result in ori_gen:
+            # encoded like the events of /execute, bytes are tagged base64
+            yield "data: " + pipeline_batch_result.to_json() + "\n\n"
+
+    if request.batch_size is not None and request.batch_size <= 0:
+        raise HTTPException(status_code=400, content="batch_size must be positive")
+
+    # 1. get pipeline model
+    pipeline = await pipeline_service.get_pipeline_by_id(request.pipeline_id)
+    if pipeline is None:
+        raise HTTPException(status_code=400, content=f"pipeline with id {request.pipeline_id} not found")
+
+    # 2. execute over all the param sets
     return StreamingResponse(
-        sse_wrapper(await pipeline_service.execute_pipeline(pipeline.content, request.params)),
+        sse_wrapper(
+            await pipeline_service.execute_pipeline_batch(
+                pipeline.content, request.params_list, request.batch_size, principal=principal
+            )
+        ),
         media_type="text/event-stream",
     )
 
@@ -153,7 +307,9 @@ def decode_bytes(data):
         return data
 
 @router.post("/test")
-async def pipeline_test(request: PipelineTestRequest) -> StreamingResponse:
+async def pipeline_test(
+    request: PipelineTestRequest, principal: str = Depends(get_caller_principal)
+) -> StreamingResponse:
     async def sse_wrapper(ori_gen: AsyncGenerator[PipelineExecutionInfo, None]) -> AsyncGenerator[str, None]:
         async for pipeline_execution_info in ori_gen:
             # 获取 json_data，并处理其中的字节数据
@@ -170,7 +326,15 @@ async def pipeline_test(request: PipelineTestRequest) -> StreamingResponse:
 
     # 2. execute pipeline
     return StreamingResponse(
-        sse_wrapper(await pipeline_service.execute_pipeline(request.pipeline_content, request.params)),
+        sse_wrapper(
+            await pipeline_service.execute_pipeline(
+                request.pipeline_content,
+                request.params,
+                request.trace,
+                session_id=request.session_id,
+                principal=principal,
+            )
+        ),
         media_type="text/event-stream",
     )
 
@@ -254,43 +418,61 @@ async def reset_pipeline(
 
 
 @router.post("/completion")
-async def completion_pipeline(request: PipelineCompletionRequest) -> StreamingResponse:
+async def completion_pipeline(
+    request: PipelineCompletionRequest, principal: str = Depends(get_caller_principal)
+) -> StreamingResponse:
     async def sse_wrapper(ori_gen: AsyncGenerator[PipelineExecutionInfo, None]) -> AsyncGenerator[str, None]:
-        async for pipeline_execution_info in ori_gen:
-            if pipeline_execution_info.type == "output_info":
-                for key, value in pipeline_execution_info.data.items():
-                    if key.endswith('_res'):
-                        # 处理字节数据
-                        value = decode_bytes(value)  # 解码字节数据
+        # closed on the early return below, which cancels the nodes still running
+        async with aclosing(ori_gen):
+            async for pipeline_execution_info in ori_gen:
+                if pipeline_execution_info.type == "output_info":
+                    for key, value in pipeline_execution_info.data.items():
+                        if key.endswith('_res'):
+                            # 处理字节数据
+                            value = decode_bytes(value)  # 解码字节数据
                         
-                        content = json.dumps(value)
-                        updated_info = {
-                            "node_id": pipeline_execution_info.node_id,
-                            "type": pipeline_execution_info.type,
-                            "data": {
-                                "content": content
-                            },
-                            "timestamp": pipeline_execution_info.timestamp.isoformat()  # 确保时间戳可序列化
-                        }
-                        yield "data: " + json.dumps(updated_info) + "\n\n"
-                        return  
-
-            else:
-                # 处理 pipeline_execution_info.data 字段
-                pipeline_execution_info.data = decode_bytes(pipeline_execution_info.data)  # 解码字节数据
-
-                content = f"node {pipeline_execution_info.node_id} running, output: {pipeline_execution_info.data}"
-
-                updated_info = {
-                    "node_id": pipeline_execution_info.node_id,
-                    "type": pipeline_execution_info.type,
-                    "data": {
-                        "content": content
-                    },
-                    "timestamp": pipeline_execution_info.timestamp.isoformat()  # 确保时间戳可序列化
-                }
-
-                yield "data: " + json.dumps(updated_info) + "\n\n"
+                            content = json.dumps(value)
+                            updated_info = {
+                                "node_id": pipeline_execution_info.node_id,
+                                "type": pipeline_execution_info.type,
+                                "data": {
+                                    "content": content
+                                },
+                                "timestamp": pipeline_execution_info.timestamp.isoformat()  # 确保时间戳可序列化
+                            }
+                            yield "data: " + json.dumps(updated_info) + "\n\n"
+                            return  
+
+                elif pipeline_execution_info.type == "stream_info":
+                    # partial answer of a streaming node, forwarded as soon as it is produced
+                    for key, value in pipeline_execution_info.data.items():
+                        if key.endswith('_res'):
+                            updated_info = {
+                                "node_id": pipeline_execution_info.node_id,
+                                "type": pipeline_execution_info.type,
+                                "data": {
+                                    "content": json.dumps(decode_bytes(value))
+                                },
+                                "timestamp": pipeline_execution_info.timestamp.isoformat()
+                            }
+                            yield "data: " + json.dumps(updated_info) + "\n\n"
+
+                else:
+                    # 处理 pipeline_execution_info.data 字段
+                    pipeline_execution_info.data = decode_bytes(pipeline_execution_info.data)  # 解码字节数据
+
+                    content = f"node {pipeline_execution_info.node_id} running, output: {pipeline_execution_info.data}"
+
+                    updated_info = {
+                        "node_id": pipeline_execution_info.node_id,
+                        "type": pipeline_execution_info.type,
+                        "data": {
+                            "content": content
+                        },
+                        "timestamp": pipeline_execution_info.timestamp.isoformat()  # 确保时间戳可序列化
+                    }
+
+                    yield "data: " + json.dumps(updated_info) + "\n\n"
 
 
     pipeline = await pipeline_service.get_pipeline_by_id(request.pipeline_id)
@@ -299,6 +481,16 @@ async def completion_pipeline(request: PipelineCompletionRequest) -> StreamingRe
 
 
     return StreamingResponse(
-        sse_wrapper(await pipeline_service.execute_pipeline(pipeline.content, request.params)),
+        sse_wrapper(
+            await pipeline_service.execute_pipeline(
+                pipeline.content,
+                request.params,
+                # only the nodes leading to the answer are run
+                outputs=pipeline_service.get_answer_outputs(pipeline.content),
+                # the progress messages only show a summary of the node outputs
+                verbosity=EventVerbosity.SUMMARY,
+                principal=principal,
+            )
+        ),
         media_type="text/event-stream",
     )
\ No newline at end of file
@@ -1,19 +1,70 @@
+import json
 import logging
-from typing import Any, AsyncGenerator, Dict, Optional, List
+import pickle
+from typing import Any, AsyncGenerator, Dict, List, Optional, Tuple
 
-from ragnarok_core.pipeline.pipeline_entity import PipelineEntity, PipelineExecutionInfo
+from ragnarok_core.pipeline import (
+    checkpoint_store,
+    job_manager,
+    pipeline_cache,
+    result_cache,
+    run_scheduler,
+)
+from ragnarok_core.pipeline.checkpoint_store import CheckpointStore
+from ragnarok_core.pipeline.pipeline_entity import (
+    PipelineBatchResult,
+    PipelineExecutionInfo,
+)
+from ragnarok_core.pipeline.pipeline_event import EventVerbosity
+from ragnarok_core.pipeline.pipeline_job import PipelineJob
+from ragnarok_core.pipeline.run_scheduler import RunLane
+from ragnarok_server.auth import ANONYMOUS_PRINCIPAL
 from ragnarok_server.rdb.models import Pipeline
 from ragnarok_server.rdb.repositories.pipeline import PipelineRepository
-import json
+from ragnarok_server.rdb.repositories.pipeline_checkpoint import (
+    PipelineCheckpointRepository,
+)
+from ragnarok_toolkit.config import PIPELINE_CHECKPOINT_STORE
 
 logger = logging.getLogger(__name__)
 
 
+class RDBCheckpointStore(CheckpointStore):
+    """
+    node checkpoints of the resumable runs kept in the pipeline_checkpoints table,
+    shared by all the server processes
+    """
+
+    async def get(self, run_id: str, node_id: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        checkpoint = await PipelineCheckpointRepository.get_checkpoint(run_id, node_id)
+        if checkpoint is None:
+            return None
+        try:
+            return checkpoint.input_hash, pickle.loads(checkpoint.outputs)
+        except Exception as e:
+            logger.warning(f"broken checkpoint of node {node_id} in run {run_id}: {e!r}")
+            return None
+
+    async def set(self, run_id: str, node_id: str, input_hash: str, outputs: Dict[str, Any]) -> None:
+        try:
+            data = pickle.dumps(outputs)
+        except Exception as e:
+            logger.warning(f"outputs of node {node_id} could not be checkpointed: {e!r}")
+            return
+        await PipelineCheckpointRepository.save_checkpoint(run_id, node_id, input_hash, data)
+
+    async def delete(self, run_id: str) -> None:
+        await PipelineCheckpointRepository.remove_run_checkpoints(run_id)
+
+
 class PipelineService:
     pipeline_repo: PipelineRepository
 
     def __init__(self) -> None:
         self.pipeline_repo = PipelineRepository()
+        self.checkpoint_store: CheckpointStore = (
+            RDBCheckpointStore() if PIPELINE_CHECKPOINT_STORE == "rdb" else checkpoint_store
+        )
 
     def validate_pipeline_str(self, content: str) -> bool:
         """
@@ -22,7 +73,7 @@ class PipelineService:
         """
         # TODO consider add error msg as return value
         try:
-            _ = PipelineEntity.from_json_str(content)
+            _ = pipeline_cache.get_or_compile(content)
         except Exception as e:
             logger.warning(f"Failed to create pipeline from string: {content}, err: {e}")
             return False
@@ -31,8 +82,8 @@ class PipelineService:
     async def create_pipeline(
         self,
         name: str,
-        principal_id: int,          
-        principal_type: str,        
+        principal_id: int,
+        principal_type: str,
         content: str,
         description: Optional[str] = None,
         avatar: Optional[str] = None,
@@ -40,8 +91,8 @@ class PipelineService:
     ) -> Pipeline:
         pipeline = Pipeline(
             name=name,
-            principal_id=principal_id,        
-            principal_type=principal_type,    
+            principal_id=principal_id,
+            principal_type=principal_type,
             content=content,
             description=description,
             avatar=avatar,
@@ -53,12 +104,106 @@ class PipelineService:
         return await self.pipeline_repo.get_pipeline_by_id(pipeline_id)
 
     async def execute_pipeline(
-        self, content: str, params: Dict[str, Any]
+        self,
+        content: str,
+        params: Dict[str, Any],
+        trace: bool = False,
+        outputs: Optional[List[str]] = None,
+        verbosity: EventVerbosity = EventVerbosity.FULL,
+        run_id: Optional[str] = None,
+        session_id: Optional[str] = None,
+        principal: str = ANONYMOUS_PRINCIPAL,
+        lane: RunLane = RunLane.INTERACTIVE,
     ) -> AsyncGenerator[PipelineExecutionInfo, None]:
-        pipeline_entity = PipelineEntity.from_json_str(content)
-        return pipeline_entity.run_async(**params)
-    
+        """
+        run the pipeline, only the nodes needed by the given output names if any.
+        a run with a run_id is resumable, running it again after a failure skips the nodes already done.
+        the test runs of an editing session reuse the node outputs of its former runs, unless changed.
+        a run waits for its admission in the fair queue of the run scheduler, in the lane of its principal.
+        the pipelines caching their results replay the events of a former successful run of the same params
+        """
+        pipeline_entity = pipeline_cache.get_or_compile(content)
+        # only the inject names are passed, the other params could never shadow a run option
+        params = {name: value for name, value in params.items() if name in pipeline_entity.inject_input_mapping}
+        key = None
+        # traced, resumable and session runs are about this very execution, they are never served from the cache
+        if pipeline_entity.cache_results and not trace and run_id is None and session_id is None:
+            key = result_cache.key(
+                pipeline_cache.content_hash(content),
+                params,
+                outputs=sorted(outputs) if outputs is not None else None,
+                verbosity=verbosity,
+            )
+        if key is not None:
+            cached = result_cache.get(key)
+            if cached is not None:
+                return result_cache.replay(cached)
+
+        events = pipeline_entity.run_async(
+            **params,
+            trace=trace,
+            outputs=outputs,
+            verbosity=verbosity,
+            run_id=run_id,
+            checkpoint_store=self.checkpoint_store,
+            session_id=session_id,
+            principal=principal,
+        )
+        # a replayed run takes no admission, it executes nothing
+        events = run_scheduler.admit(events, principal, lane)
+        if key is None:
+            return events
+        output_names = frozenset(outputs) if outputs is not None else pipeline_entity.output_names
+        return result_cache.record(key, events, output_names)
+
+    async def submit_pipeline_job(
+        self,
+        content: str,
+        params: Dict[str, Any],
+        trace: bool = False,
+        outputs: Optional[List[str]] = None,
+        verbosity: EventVerbosity = EventVerbosity.FULL,
+        run_id: Optional[str] = None,
+        principal: str = ANONYMOUS_PRINCIPAL,
+    ) -> PipelineJob:
+        """run the pipeline in the background, the events are read back from the job by any num of requests"""
+        events = await self.execute_pipeline(
+            content, params, trace, outputs, verbosity, run_id, principal=principal, lane=RunLane.BATCH
+        )
+        return job_manager.submit(events, principal)
+
+    def get_answer_outputs(self, content: str) -> Optional[List[str]]:
+        """
+        the output names holding the answer of a pipeline, those ending with _res,
+        None if there is none so that the whole pipeline is run
+        """
+        pipeline_entity = pipeline_cache.get_or_compile(content)
+        outputs = sorted(name for name in pipeline_entity.output_names if name.endswith("_res"))
+        return outputs or None
+
+    async def execute_pipeline_batch(
+        self,
+        content: str,
+        params_list: List[Dict[str, Any]],
+        batch_size: Optional[int] = None,
+        principal: str = ANONYMOUS_PRINCIPAL,
+    ) -> AsyncGenerator[PipelineBatchResult, None]:
+        """run the pipeline over the param sets, admitted as a batch weighing as much as its num of rows"""
+        pipeline_entity = pipeline_cache.get_or_compile(content)
+        if batch_size is None:
+            results = pipeline_entity.run_batch(params_list, principal=principal)
+        else:
+            results = pipeline_entity.run_batch(params_list, batch_size=batch_size, principal=principal)
+        return run_scheduler.admit(results, principal, RunLane.BATCH, cost=max(len(params_list), 1))
+
+    async def _invalidate_compiled(self, pipeline_id: int, new_content: Optional[str] = None) -> None:
+        """drop the compiled plan of a pipeline whose content is about to change"""
+        pipeline = await self.pipeline_repo.get_pipeline_by_id(pipeline_id)
+        if pipeline is not None and pipeline.content != new_content:
+            pipeline_cache.invalidate(pipeline.content)
+
     async def remove_pipeline(self, pipeline_id: int) -> bool:
+        await self._invalidate_compiled(pipeline_id)
         return await self.pipeline_repo.remove_pipeline(pipeline_id)
 
     async def update_pipeline(
@@ -72,15 +217,21 @@ class PipelineService:
         components: Optional[str] = None,
         path: Optional[str] = None,
     ) -> bool:
+        if content is not None:
+            await self._invalidate_compiled(pipeline_id, content)
         return await self.pipeline_repo.update_pipeline(
-            pipeline_id, name=name, content=content, description=description, avatar=avatar,params=json.dumps(params) if params is not None else None,components=components, path=path
-        )
-    
-    async def get_pipeline_list_by_creator(
-        self, principal_id: int, principal_type: str
-    ) -> List[Pipeline]:
-        return await self.pipeline_repo.get_pipeline_list_by_creator(
-            principal_id, principal_type
+            pipeline_id,
+            name=name,
+            content=content,
+            description=description,
+            avatar=avatar,
+            params=json.dumps(params) if params is not None else None,
+            components=components,
+            path=path,
         )
 
+    async def get_pipeline_list_by_creator(self, principal_id: int, principal_type: str) -> List[Pipeline]:
+        return await self.pipeline_repo.get_pipeline_list_by_creator(principal_id, principal_type)
+
+
 pipeline_service = PipelineService()
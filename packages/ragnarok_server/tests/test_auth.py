@@ -0,0 +1,44 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from ragnarok_core.pipeline.run_scheduler import RunScheduler
+from ragnarok_server.auth import (
+    ANONYMOUS_PRINCIPAL,
+    TokenData,
+    get_caller_principal,
+    principal_key,
+)
+
+
+def test_principal_key():
+    token_data = TokenData(principal_id=1, principal_type="user", exp=datetime(2030, 1, 1))
+    assert principal_key(token_data, "10.0.0.1") == "user:1"
+    assert principal_key(None, "10.0.0.1") == f"{ANONYMOUS_PRINCIPAL}:10.0.0.1"
+    assert principal_key(None) == ANONYMOUS_PRINCIPAL
+
+
+def test_anonymous_caller_principal():
+    app = FastAPI()
+
+    @app.get("/whoami")
+    async def whoami(principal: str = Depends(get_caller_principal)):
+        return {"principal": principal}
+
+    # the test client calls from the "testclient" host
+    assert TestClient(app).get("/whoami").json() == {"principal": f"{ANONYMOUS_PRINCIPAL}:testclient"}
+
+
+@pytest.mark.asyncio
+async def test_anonymous_callers_have_own_budget():
+    scheduler = RunScheduler(max_runs=4, max_runs_per_principal=1)
+    await scheduler.acquire(principal_key(None, "10.0.0.1"))
+    # another anonymous address is admitted at once, the same one waits
+    await asyncio.wait_for(scheduler.acquire(principal_key(None, "10.0.0.2")), 1)
+    waiting = asyncio.create_task(scheduler.acquire(principal_key(None, "10.0.0.1")))
+    await asyncio.sleep(0)
+    assert not waiting.done()
+    scheduler.release(principal_key(None, "10.0.0.1"))
+    await asyncio.wait_for(waiting, 1)
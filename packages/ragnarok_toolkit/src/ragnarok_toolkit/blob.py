@@ -0,0 +1,57 @@
+import mmap
+import os
+import weakref
+from typing import Any, Dict, Optional, Tuple
+
+
+class BlobRef:
+    """
+    handle of a binary payload, kept in memory or spilled to a file, passed between the pipeline nodes
+    in place of the payload. view() reads it as a zero-copy memoryview, and the events only carry its size.
+    a spilled file is removed once its owning handle is garbage collected
+    """
+
+    __slots__ = ("blob_id", "size", "path", "_data", "_mmap", "__weakref__")
+
+    def __init__(self, blob_id: str, size: int, data: Optional[bytes] = None, path: Optional[str] = None) -> None:
+        self.blob_id = blob_id
+        self.size = size
+        # file of a spilled payload, None if the payload is in memory
+        self.path = path
+        self._data = data
+        self._mmap: Optional[mmap.mmap] = None
+
+    @property
+    def spilled(self) -> bool:
+        return self.path is not None
+
+    def own_file(self) -> None:
+        """remove the spilled file along with this handle"""
+        weakref.finalize(self, os.remove, self.path)
+
+    def view(self) -> memoryview:
+        """the payload, read only, a spilled one is mapped rather than read"""
+        if self._data is not None:
+            return memoryview(self._data)
+        if self.size == 0:
+            return memoryview(b"")
+        if self._mmap is None:
+            with open(self.path, "rb") as file:
+                self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        return memoryview(self._mmap)
+
+    def __bytes__(self) -> bytes:
+        return bytes(self.view())
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        # a copy sent to another process shares the spilled file, it never removes it
+        return BlobRef, (self.blob_id, self.size, self._data, self.path)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"blob_id": self.blob_id, "size": self.size, "spilled": self.spilled}
+
+    def __repr__(self) -> str:
+        return f"BlobRef({self.blob_id!r}, size={self.size}, spilled={self.spilled})"
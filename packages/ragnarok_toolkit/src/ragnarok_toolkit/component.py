@@ -1,9 +1,11 @@
 from abc import ABC, abstractmethod
+from collections import abc
 from enum import StrEnum
 from typing import (
     Any,
     Dict,
     List,
+    NotRequired,
     Optional,
     Set,
     Tuple,
@@ -12,6 +14,7 @@ from typing import (
     get_type_hints,
 )
 
+from ragnarok_toolkit.blob import BlobRef
 from ragnarok_toolkit.vdb.qdrant_client import QdrantPoint, SearchPayloadDict
 
 
@@ -32,6 +35,10 @@ class ComponentIOType(StrEnum):
     SEARCH_PAYLOAD_DICT = "SEARCH_PAYLOAD_DICT"
     SEARCH_PAYLOAD_DICT_LIST = "SEARCH_PAYLOAD_DICT_LIST"
     DICT = "DICT"
+    DICT_LIST = "DICT_LIST"
+    # handle of a large binary payload, see BlobRef
+    BLOB = "BLOB"
+    BLOB_LIST = "BLOB_LIST"
 
     @property
     def python_type(self):
@@ -52,15 +59,31 @@ TYPE_MAPPING = {
     ComponentIOType.SEARCH_PAYLOAD_DICT: SearchPayloadDict,
     ComponentIOType.SEARCH_PAYLOAD_DICT_LIST: List[SearchPayloadDict],
     ComponentIOType.DICT: dict,
+    ComponentIOType.DICT_LIST: List[dict],
+    ComponentIOType.BLOB: BlobRef,
+    ComponentIOType.BLOB_LIST: List[BlobRef],
 }
 
 
+class ComponentExecutionClass(StrEnum):
+    """where the pipeline engine runs the execute function of a component"""
+
+    # on the event loop, for non-blocking async functions and trivial sync functions
+    INLINE = "INLINE"
+    # in the engine thread pool, for blocking io
+    THREAD = "THREAD"
+    # in the engine process pool, for cpu-bound work, inputs and outputs must be picklable
+    PROCESS = "PROCESS"
+
+
 class ComponentInputTypeOption(TypedDict):
     """represent an input variable options"""
 
     name: str
     allowed_types: Set[ComponentIOType]
     required: bool
+    # receive an async iterator over the partial values of the upstream output, instead of the whole value
+    streaming: NotRequired[bool]
 
 
 class ComponentOutputTypeOption(TypedDict):
@@ -82,6 +105,29 @@ class RagnarokComponent(ABC):
     # whether to enable type annotation check for identification
     ENABLE_HINT_CHECK: bool = True
 
+    # where the pipeline engine runs the execute function
+    EXECUTION_CLASS: ComponentExecutionClass = ComponentExecutionClass.INLINE
+
+    # deadline of one execution in seconds, None means the engine default
+    EXECUTION_TIMEOUT: Optional[float] = None
+
+    # whether the outputs depend on the inputs only, so that the engine could reuse the outputs of the same inputs
+    CACHEABLE: bool = False
+
+    # version of the execute logic, bump it to invalidate the cached outputs after a behavior change
+    VERSION: str = "1"
+
+    # whether execute_batch is implemented, batched pipeline runs then call it once for many input sets
+    SUPPORT_BATCH: bool = False
+
+    # whether a sync inline execute does trivial work, the engine then runs a linear chain of such components
+    # as a single scheduled step rather than one task per node
+    LIGHTWEIGHT: bool = False
+
+    # whether the engine holds a process-wide slot while the component runs, false for the components
+    # only waiting on the sub-pipeline runs they start, whose nodes take the slots instead
+    SCHEDULED: bool = True
+
     @classmethod
     @abstractmethod
     def input_options(cls) -> Tuple[ComponentInputTypeOption, ...]:
@@ -98,10 +144,28 @@ class RagnarokComponent(ABC):
     @abstractmethod
     def execute(cls, *args, **kwargs) -> Dict[str, Any]:
         """
-        execute the component function, could be either sync or async
+        execute the component function, could be either sync or async.
+        an async generator function makes a streaming component, each yielded dict holds partial outputs,
+        which are merged by output type (STRING concatenated, *_LIST extended, others replaced) into the whole outputs
         """
         pass
 
+    @classmethod
+    def execute_batch(cls, inputs_list: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        execute the component over many input sets in one call, could be either sync or async.
+        returns one output dict per input set, in the same order
+        """
+        raise NotImplementedError(f"{cls.__name__} does not support batch execution")
+
+    @classmethod
+    def accept_speculative(cls, input_name: str, speculative_value: Any, value: Any) -> bool:
+        """
+        whether the outputs of an execution started with the fallback value of an input stand for the actual value,
+        the engine then keeps them rather than executing again
+        """
+        return speculative_value == value
+
     @classmethod
     def get_detail(cls) -> Dict[str, Tuple[ComponentInputTypeOption, ...] | tuple[ComponentOutputTypeOption, ...]]:
         return {
@@ -128,6 +192,12 @@ class RagnarokComponent(ABC):
             hint_type = execute_params.get(param_name)
             allowed_types = {io_type.python_type for io_type in input_option.get("allowed_types")}
 
+            # a streaming input receives an async iterator over the partial values
+            if input_option.get("streaming"):
+                if getattr(hint_type, "__origin__", None) not in (abc.AsyncIterator, abc.AsyncIterable):
+                    return False
+                continue
+
             if input_option.get("required"):
                 if hint_type not in allowed_types:
                     return False
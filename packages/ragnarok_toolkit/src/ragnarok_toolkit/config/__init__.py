@@ -30,6 +30,79 @@ RDB_PASSWORD = os.environ.get("RDB_PASSWORD", "123456")
 # ─── Permission manager ───────────────────────────────────────────────────────
 PERMISSION_CACHE_SIZE = int(os.environ.get("PERMISSION_CACHE_SIZE", "1000"))
 
+# ─── Pipeline engine ──────────────────────────────────────────────────────────
+# max num of compiled pipelines kept in memory, keyed by content hash
+PIPELINE_CACHE_SIZE = int(os.environ.get("PIPELINE_CACHE_SIZE", "128"))
+# max num of the pipeline run results kept for the pipelines caching their results
+PIPELINE_RESULT_CACHE_SIZE = int(os.environ.get("PIPELINE_RESULT_CACHE_SIZE", "256"))
+# seconds a pipeline run result stays cached
+PIPELINE_RESULT_CACHE_TTL = float(os.environ.get("PIPELINE_RESULT_CACHE_TTL", "600"))
+# max num of nodes executing at the same time, across all the runs of the process
+PIPELINE_MAX_CONCURRENCY = int(os.environ.get("PIPELINE_MAX_CONCURRENCY", "64"))
+# max num of nodes executing at the same time, in a single run
+PIPELINE_RUN_MAX_CONCURRENCY = int(os.environ.get("PIPELINE_RUN_MAX_CONCURRENCY", "16"))
+# max num of nodes executing at the same time, across all the runs of one principal, 0 means unlimited
+PIPELINE_PRINCIPAL_MAX_NODES = int(os.environ.get("PIPELINE_PRINCIPAL_MAX_NODES", "32"))
+# max num of runs admitted at the same time, across all the principals, the others wait in a fair queue
+PIPELINE_MAX_RUNS = int(os.environ.get("PIPELINE_MAX_RUNS", "64"))
+# max num of runs admitted at the same time, for one principal
+PIPELINE_PRINCIPAL_MAX_RUNS = int(os.environ.get("PIPELINE_PRINCIPAL_MAX_RUNS", "16"))
+# share of the interactive runs in the fair queue, relative to the batch runs of weight 1
+PIPELINE_INTERACTIVE_WEIGHT = float(os.environ.get("PIPELINE_INTERACTIVE_WEIGHT", "4"))
+# num of workers running the THREAD execution class components
+PIPELINE_THREAD_POOL_SIZE = int(os.environ.get("PIPELINE_THREAD_POOL_SIZE", "8"))
+# num of workers running the PROCESS execution class components
+PIPELINE_PROCESS_POOL_SIZE = int(os.environ.get("PIPELINE_PROCESS_POOL_SIZE", str(os.cpu_count() or 2)))
+# backend of the PROCESS execution class components, "pool" for a ProcessPoolExecutor,
+# "workers" for long lived worker processes passing the large bytes and vectors by shared memory
+PIPELINE_PROCESS_BACKEND = os.environ.get("PIPELINE_PROCESS_BACKEND", "pool")
+# min num of bytes of a bytes or float vector value passed to the worker processes by shared memory
+PIPELINE_SHM_THRESHOLD = int(os.environ.get("PIPELINE_SHM_THRESHOLD", str(64 * 1024)))
+# default deadline of a node execution in seconds, 0 means no deadline
+PIPELINE_NODE_TIMEOUT = float(os.environ.get("PIPELINE_NODE_TIMEOUT", "300"))
+# default deadline of a whole pipeline run in seconds, 0 means no deadline
+PIPELINE_RUN_TIMEOUT = float(os.environ.get("PIPELINE_RUN_TIMEOUT", "1800"))
+# num of input sets run together by a batched pipeline run
+PIPELINE_BATCH_SIZE = int(os.environ.get("PIPELINE_BATCH_SIZE", "32"))
+# max num of partial outputs buffered between a streaming node and each of its streaming consumers
+PIPELINE_STREAM_QUEUE_SIZE = int(os.environ.get("PIPELINE_STREAM_QUEUE_SIZE", "16"))
+# whether linear chains of lightweight components are fused into a single scheduled step
+PIPELINE_FUSE_LIGHTWEIGHT = os.environ.get("PIPELINE_FUSE_LIGHTWEIGHT", "true").lower() == "true"
+# default max num of the sub-pipeline runs of a map node in flight at the same time
+PIPELINE_MAP_CONCURRENCY = int(os.environ.get("PIPELINE_MAP_CONCURRENCY", "4"))
+# max total bytes of the node outputs kept by the in-process cache of the cacheable components, by estimated size
+PIPELINE_NODE_CACHE_BYTES = int(os.environ.get("PIPELINE_NODE_CACHE_BYTES", str(256 * 1024**2)))
+# node inputs carrying more bytes than this are hashed in a thread rather than on the event loop
+PIPELINE_NODE_HASH_OFFLOAD_BYTES = int(os.environ.get("PIPELINE_NODE_HASH_OFFLOAD_BYTES", str(1024**2)))
+# seconds a node output stays in the in-process cache
+PIPELINE_NODE_CACHE_TTL = float(os.environ.get("PIPELINE_NODE_CACHE_TTL", "3600"))
+# directory of the on-disk node output cache, which replaces the in-process one if set
+PIPELINE_NODE_CACHE_DIR = os.environ.get("PIPELINE_NODE_CACHE_DIR", "")
+# max total bytes of the on-disk node output cache, the least recently used entries are evicted beyond it
+PIPELINE_NODE_CACHE_DISK_BYTES = int(os.environ.get("PIPELINE_NODE_CACHE_DISK_BYTES", str(1024**3)))
+# directory of the node checkpoints of the resumable runs, a directory under the system temp one if empty
+PIPELINE_CHECKPOINT_DIR = os.environ.get("PIPELINE_CHECKPOINT_DIR", "")
+# where the server keeps the node checkpoints, "local" for PIPELINE_CHECKPOINT_DIR or "rdb" for the database
+PIPELINE_CHECKPOINT_STORE = os.environ.get("PIPELINE_CHECKPOINT_STORE", "local")
+# max num of the editing sessions whose node outputs are kept for their next test runs
+PIPELINE_SESSION_SIZE = int(os.environ.get("PIPELINE_SESSION_SIZE", "64"))
+# seconds the node outputs of an idle editing session are kept
+PIPELINE_SESSION_TTL = float(os.environ.get("PIPELINE_SESSION_TTL", "1800"))
+# payloads of the BLOB outputs larger than this num of bytes are spilled to files rather than kept in memory
+PIPELINE_BLOB_SPILL_SIZE = int(os.environ.get("PIPELINE_BLOB_SPILL_SIZE", str(8 * 1024 * 1024)))
+# directory of the spilled payloads, the system temp directory by default
+PIPELINE_BLOB_DIR = os.environ.get("PIPELINE_BLOB_DIR") or None
+# max num of items kept per list or dict in the summarized node data of the pipeline events
+PIPELINE_EVENT_SUMMARY_ITEMS = int(os.environ.get("PIPELINE_EVENT_SUMMARY_ITEMS", "8"))
+# max num of characters kept per string in the summarized node data of the pipeline events
+PIPELINE_EVENT_SUMMARY_CHARS = int(os.environ.get("PIPELINE_EVENT_SUMMARY_CHARS", "256"))
+# num of pipeline jobs run at the same time, the others wait in submission order
+PIPELINE_JOB_WORKERS = int(os.environ.get("PIPELINE_JOB_WORKERS", "4"))
+# max num of the latest events kept per pipeline job for its readers
+PIPELINE_JOB_BUFFER_SIZE = int(os.environ.get("PIPELINE_JOB_BUFFER_SIZE", "1024"))
+# seconds a finished pipeline job stays available
+PIPELINE_JOB_TTL = float(os.environ.get("PIPELINE_JOB_TTL", "3600"))
+
 # ─── JWT / Authentication settings ────────────────────────────────────────────
 # Secret key for signing tokens. Must be kept safe!
 SECRET_KEY = os.environ.get("SECRET_KEY", "your-default-dev-secret-key-please-change")  # never use this in prod
@@ -3,6 +3,7 @@ from typing import List
 
 import aiohttp
 from ragnarok_toolkit import config
+from ragnarok_toolkit.tracing import traced_call
 
 # embedding model leaderboard:
 # https://huggingface.co/spaces/mteb/leaderboard
@@ -51,6 +52,7 @@ class EmbeddingModel:
     TIMEOUT = 30
 
     @classmethod
+    @traced_call("hf.embedding")
     async def embedding(
         cls, texts: List[str], model: EmbeddingModelEnum = EmbeddingModelEnum.ALL_MINI_LM_L6_V2
     ) -> List[List[float]]:
@@ -3,8 +3,9 @@ import os
 from typing import Any, Dict
 
 from aiobotocore.session import get_session
-from ragnarok_toolkit import config
 from botocore.exceptions import ClientError
+from ragnarok_toolkit import config
+from ragnarok_toolkit.tracing import traced_call
 
 logger = logging.getLogger(__name__)
 
@@ -24,6 +25,7 @@ class MinioClient:
         )
 
     @classmethod
+    @traced_call("minio.create_bucket")
     async def create_bucket(cls, bucket_name: str):
         async with await cls._create_client() as minio_client:
             existing_buckets = await minio_client.list_buckets()
@@ -36,18 +38,21 @@ class MinioClient:
                 logger.info(f"Bucket '{bucket_name}' created.")
 
     @classmethod
+    @traced_call("minio.delete_bucket")
     async def delete_bucket(cls, bucket_name: str):
         async with await cls._create_client() as minio_client:
             await minio_client.delete_bucket(Bucket=bucket_name)
             logger.info(f"Bucket '{bucket_name}' deleted.")
 
     @classmethod
+    @traced_call("minio.list_buckets")
     async def list_buckets(cls):
         async with await cls._create_client() as minio_client:
             buckets = await minio_client.list_buckets()
             return buckets
 
     @classmethod
+    @traced_call("minio.upload_object")
     async def upload_object(cls, bucket_name: str, key: str, data: bytes, metadata: dict = None):
         async with await cls._create_client() as minio_client:
             kwargs = {"Bucket": bucket_name, "Key": key, "Body": data}
@@ -57,18 +62,21 @@ class MinioClient:
             logger.info(f"Uploaded {key} to {bucket_name}")
 
     @classmethod
+    @traced_call("minio.download_object")
     async def download_object(cls, bucket_name: str, key: str) -> Dict[str, Any]:
         async with await cls._create_client() as minio_client:
             response = await minio_client.get_object(Bucket=bucket_name, Key=key)
             return {"content": await response["Body"].read(), "metadata": response.get("Metadata", {})}
 
     @classmethod
+    @traced_call("minio.delete_object")
     async def delete_object(cls, bucket_name: str, key: str):
         async with await cls._create_client() as minio_client:
             await minio_client.delete_object(Bucket=bucket_name, Key=key)
             logger.info(f"Deleted {key} from {bucket_name}")
 
     @classmethod
+    @traced_call("minio.check_file_exists")
     async def check_file_exists(cls, bucket_name: str, key: str) -> bool:
         async with await cls._create_client() as minio_client:
             # response = await minio_client.head_object(Bucket=bucket_name, Key=key)
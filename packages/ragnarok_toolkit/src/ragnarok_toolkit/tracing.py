@@ -0,0 +1,66 @@
+import functools
+import inspect
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+
+@dataclass
+class ExternalCall:
+    """an external service call made by a component, times are unix timestamps in seconds"""
+
+    name: str
+    start_time: float
+    end_time: float
+    error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+# the external call records of the pipeline node running in the current context, None if not traced
+current_external_calls: ContextVar[Optional[List[ExternalCall]]] = ContextVar("current_external_calls", default=None)
+
+
+@contextmanager
+def trace_call(name: str) -> Iterator[None]:
+    """record the enclosed block as an external call of the traced node, a no-op outside a traced node"""
+    records = current_external_calls.get()
+    if records is None:
+        yield
+        return
+
+    start_time = time.time()
+    error = None
+    try:
+        yield
+    except BaseException as e:
+        error = type(e).__name__
+        raise
+    finally:
+        records.append(ExternalCall(name, start_time, time.time(), error))
+
+
+def traced_call(name: str) -> Callable:
+    """decorator version of trace_call, for both sync and async functions"""
+
+    def decorator(func: Callable) -> Callable:
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with trace_call(name):
+                    return await func(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with trace_call(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
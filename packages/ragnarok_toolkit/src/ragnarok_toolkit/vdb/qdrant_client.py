@@ -3,6 +3,7 @@ from typing import List, Literal, Optional, TypedDict
 
 from qdrant_client import AsyncQdrantClient, models
 from qdrant_client.models import Distance, PayloadSchemaType
+from ragnarok_toolkit.tracing import traced_call
 
 
 class PayloadDict(TypedDict):
@@ -22,6 +23,13 @@ class QdrantPoint(TypedDict):
     payload: PayloadDict
 
 
+class SearchQuery(TypedDict, total=False):
+    query_vector: List[float]
+    top_k: int
+    score_threshold: float
+    payload_filters: Optional[List[SearchPayloadDict]]
+
+
 class PayloadIndex(TypedDict):
     filed_name: str
     field_schema: Literal["keyword", "integer", "float", "bool", "geo", "datetime", "text", "uuid"]
@@ -53,6 +61,7 @@ class QdrantClient:
     qdrant_client = AsyncQdrantClient(url="http://81.70.198.42:6333")
 
     @classmethod
+    @traced_call("qdrant.init_collection")
     async def init_collection(cls, name: str, dim: int, distance_map: str = "COSINE") -> bool:
         """
         Initialize the collection
@@ -86,6 +95,7 @@ class QdrantClient:
         return True
 
     @classmethod
+    @traced_call("qdrant.get_collection")
     async def get_collection(cls, name: str):
         collection_info = await cls.qdrant_client.get_collection(collection_name=name)
         if collection_info is None:
@@ -93,6 +103,7 @@ class QdrantClient:
         return collection_info
 
     @classmethod
+    @traced_call("qdrant.delete_collection")
     async def delete_collection(cls, name: str) -> None:
         """
         Delete the collection
@@ -104,6 +115,7 @@ class QdrantClient:
         await cls.qdrant_client.delete_collection(collection_name=name)
 
     @classmethod
+    @traced_call("qdrant.create_pyload_indexes")
     async def create_pyload_indexes(cls, name: str, payload_indexes: List[PayloadIndex]) -> None:
         """
         Create a payload index
@@ -121,6 +133,7 @@ class QdrantClient:
             )
 
     @classmethod
+    @traced_call("qdrant.insert_vectors")
     async def insert_vectors(cls, name: str, points: List[QdrantPoint]) -> None:
         """
         Insert vectors into the collection
@@ -144,6 +157,7 @@ class QdrantClient:
             )
 
     @classmethod
+    @traced_call("qdrant.search")
     async def search(
         cls,
         collection_name: str,
@@ -167,17 +181,7 @@ class QdrantClient:
             query=query_vector,
             limit=top_k,
             score_threshold=score_threshold,
-            query_filter=models.Filter(
-                should=[
-                    models.Filter(
-                        must=[
-                            models.FieldCondition(key=key, match=models.MatchValue(value=value))
-                            for key, value in payload_filter.items()
-                        ]
-                    )
-                    for payload_filter in (payload_filters or [])
-                ]
-            ),
+            query_filter=cls.build_filter(payload_filters),
         )
 
         texts = []
@@ -186,6 +190,48 @@ class QdrantClient:
         return texts
 
     @classmethod
+    @traced_call("qdrant.search_batch")
+    async def search_batch(cls, collection_name: str, queries: List[SearchQuery]) -> List[List[str]]:
+        """
+        Search for many query vectors in the collection with a single request
+        Args:
+            collection_name: name of the collection
+            queries (List[SearchQuery]): Query vectors and their search options
+        Returns:
+            List[List[str]]: texts of the results, one list per query in the same order
+        """
+        search_results = await cls.qdrant_client.query_batch_points(
+            collection_name=collection_name,
+            requests=[
+                models.QueryRequest(
+                    query=query["query_vector"],
+                    limit=query.get("top_k", 10),
+                    score_threshold=query.get("score_threshold", 0),
+                    filter=cls.build_filter(query.get("payload_filters")),
+                    with_payload=True,
+                )
+                for query in queries
+            ],
+        )
+        return [[point.payload["text"] for point in search_result.points] for search_result in search_results]
+
+    @staticmethod
+    def build_filter(payload_filters: Optional[List[SearchPayloadDict]]) -> models.Filter:
+        """payload filters with OR logic between the dicts and AND logic inside a dict"""
+        return models.Filter(
+            should=[
+                models.Filter(
+                    must=[
+                        models.FieldCondition(key=key, match=models.MatchValue(value=value))
+                        for key, value in payload_filter.items()
+                    ]
+                )
+                for payload_filter in (payload_filters or [])
+            ]
+        )
+
+    @classmethod
+    @traced_call("qdrant.delete_vectors")
     async def delete_vectors(cls, name: str, ids: List[int]) -> None:
         """
         Delete a vector from the collection
@@ -198,6 +244,7 @@ class QdrantClient:
         await cls.qdrant_client.delete(collection_name=name, points_selector=ids)
 
     @classmethod
+    @traced_call("qdrant.delete_vectors_by_payload")
     async def delete_vectors_by_payload(cls, name: str, payload_filters: List[SearchPayloadDict]) -> None:
         """
         Delete vectors from the collection by payload with AND logic